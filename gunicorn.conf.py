@@ -0,0 +1,70 @@
+"""
+Gunicorn settings.
+
+Workers write Prometheus metrics to files of PROMETHEUS_MULTIPROC_DIR,
+the /metrics view sums the files of all workers. Under ASGI workers
+(-k uvicorn.workers.UvicornWorker task_manager.asgi) with
+TASK_EVENTS_STREAM=1 task pages connect to the stream of task events, with
+TASK_EVENTS_BACKEND=socket events go between workers through sockets of
+TASK_EVENTS_SOCKET_DIR.
+
+The application is loaded and warmed up in the master before workers fork,
+they share compiled templates, URL patterns and catalogs copy-on-write.
+GUNICORN_PRELOAD=0 loads it in every worker instead, as needed to reload
+code on HUP. Each worker connects to databases after the fork, connections
+are never shared between processes.
+"""
+import contextlib
+import glob
+import os
+import shutil
+import tempfile
+
+multiproc_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR',
+    os.path.join(tempfile.gettempdir(), 'task-manager-metrics'),
+)
+events_socket_dir = os.environ.setdefault(
+    'TASK_EVENTS_SOCKET_DIR',
+    os.path.join(tempfile.gettempdir(), 'task-manager-events'),
+)
+
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') == '1'
+
+
+def on_starting(server):
+    """
+    Start with no metrics and event sockets left by a previous run.
+    Args:
+        server:
+    """
+    for directory in (multiproc_dir, events_socket_dir):
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+
+
+def child_exit(server, worker):
+    """
+    Drop live gauges and the event socket of an exited worker.
+    Args:
+        server:
+        worker:
+    """
+    from prometheus_client import multiprocess  # noqa: WPS433
+    multiprocess.mark_process_dead(worker.pid)
+    pattern = os.path.join(events_socket_dir, '{pid}-*.sock'.format(
+        pid=worker.pid,
+    ))
+    for path in glob.glob(pattern):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+
+def post_worker_init(worker):
+    """
+    Connect a worker before it accepts requests.
+    Args:
+        worker:
+    """
+    from task_manager import warmup  # noqa: WPS433
+    warmup.warm_worker()
@@ -1,7 +1,10 @@
 """
-ASGI config for templates project.
+ASGI config for task_manager project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+The stream of task events is served in front of Django, see
+task_manager.tasks.events. The process is warmed up once the application is
+loaded, see task_manager.warmup.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
@@ -11,6 +14,12 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'templates.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from task_manager import warmup  # noqa: E402, I001
+from task_manager.tasks.events import EventsRouter  # noqa: E402, I001
+
+application = EventsRouter(django_application)
+warmup.warm_up()
@@ -0,0 +1,151 @@
+from typing import Any, Dict, List
+
+from django import forms
+from django.db.models import Q
+from django.http import JsonResponse
+from django.urls import reverse_lazy
+from django.views.generic import View
+from task_manager.mixins import CustomLoginRequiredMixin
+
+
+class AutocompleteView(CustomLoginRequiredMixin, View):
+    """JSON choices matched by prefix, paged without COUNT."""
+
+    model = None
+    search_fields: List[str] = []
+    ordering: List[str] = []
+    page_size = 20
+
+    def get_queryset(self, query: str) -> Any:
+        """
+        Get rows whose search fields start with the query.
+        Args:
+            query: typed prefix
+        Returns:
+            Any:
+        """
+        queryset = self.model.objects.order_by(*self.ordering)
+        if not query:
+            return queryset
+        condition = Q()
+        for field in self.search_fields:
+            lookup = '{field}__istartswith'.format(field=field)
+            condition |= Q(**{lookup: query})
+        return queryset.filter(condition)
+
+    def get_page(self) -> int:
+        """
+        Get requested page number.
+        Returns:
+            int:
+        """
+        try:
+            return max(int(self.request.GET.get('page', 1)), 1)
+        except ValueError:
+            return 1
+
+    def get(self, request, *args, **kwargs) -> JsonResponse:
+        """
+        Return one page of choices.
+        Args:
+            request:
+        Returns:
+            JsonResponse:
+        """
+        offset = (self.get_page() - 1) * self.page_size
+        queryset = self.get_queryset(request.GET.get('q', '').strip())
+        rows = list(queryset[offset:offset + self.page_size + 1])
+        return JsonResponse({
+            'results': [
+                self.serialize(row) for row in rows[:self.page_size]
+            ],
+            'more': len(rows) > self.page_size,
+        })
+
+    def serialize(self, row) -> Dict[str, Any]:
+        """
+        Represent a row as a choice.
+        Args:
+            row:
+        Returns:
+            Dict:
+        """
+        return {'id': row.pk, 'text': str(row)}
+
+
+class AutocompleteWidgetMixin(object):
+    """Render only the selected choices, the rest is loaded on demand."""
+
+    def __init__(self, url_name: str, attrs=None, **kwargs):
+        """
+        Init widget.
+        Args:
+            url_name: name of the AutocompleteView url
+            attrs: html attributes
+            kwargs:
+        """
+        super().__init__(attrs, **kwargs)
+        self.url_name = url_name
+
+    def get_context(self, name, value, attrs) -> Dict[str, Any]:
+        """
+        Add autocomplete url to the html attributes.
+        Args:
+            name:
+            value:
+            attrs:
+        Returns:
+            Dict:
+        """
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-autocomplete-url'] = reverse_lazy(
+            self.url_name,
+        )
+        return context
+
+    def optgroups(self, name, value, attrs=None) -> List:
+        """
+        Build options of the empty choice and the selected rows only.
+
+        Fields of cached lookup tables give their rows without a query.
+        Args:
+            name:
+            value:
+            attrs:
+        Returns:
+            List:
+        """
+        field = self.choices.field
+        options = []
+        if not self.allow_multiple_selected and field.empty_label is not None:
+            options.append(self.create_option(
+                name, '', field.empty_label, not any(value), 0, attrs=attrs,
+            ))
+        pks = [pk for pk in value if str(pk).isdigit()]
+        rows = []
+        if pks and hasattr(field, 'selected_rows'):
+            rows = field.selected_rows(pks)
+        elif pks:
+            rows = self.choices.queryset.filter(pk__in=pks)
+        for row in rows:
+            option_value, label = self.choices.choice(row)
+            options.append(self.create_option(
+                name, option_value, label, True, len(options), attrs=attrs,
+            ))
+        return [(None, [option], index) for index, option in enumerate(options)]
+
+    class Media(object):
+        """Widget assets."""
+
+        js = ('js/autocomplete.js',)
+
+
+class AutocompleteSelect(AutocompleteWidgetMixin, forms.Select):
+    """Select loading choices from an AutocompleteView."""
+
+
+class AutocompleteSelectMultiple(
+    AutocompleteWidgetMixin,
+    forms.SelectMultiple,
+):
+    """Multiple select loading choices from an AutocompleteView."""
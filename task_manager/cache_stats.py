@@ -0,0 +1,114 @@
+"""
+Hit and miss counters of process caches.
+
+Counters of the current process are kept in memory, totals of all
+processes are kept in the default cache. A process adds its counts to
+the totals at most every FLUSH_SECONDS, not on every request. Totals are
+summed across workers with a shared cache (SHARED_CACHE) only.
+"""
+import threading
+import time
+from typing import Dict
+
+from django.core.cache import cache
+
+FLUSH_SECONDS = 10
+
+
+class CacheStats(object):
+    """Counters of hits and misses of one cache."""
+
+    def __init__(self, name: str):
+        """
+        Init counters.
+        Args:
+            name: prefix of the keys of the totals
+        """
+        self.name = name
+        self.keys = {
+            counter: '{name}:stats:{counter}'.format(
+                name=name, counter=counter,
+            )
+            for counter in ('hits', 'misses')
+        }
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._pending = {'hits': 0, 'misses': 0}
+        self._flush_at = 0.0
+
+    def record(self, hits: int = 0, misses: int = 0):
+        """
+        Add hits and misses.
+        Args:
+            hits:
+            misses:
+        """
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self._pending['hits'] += hits
+            self._pending['misses'] += misses
+            due = time.monotonic() >= self._flush_at
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Add counts of the process to the totals."""
+        with self._lock:
+            pending = self._pending
+            self._pending = {'hits': 0, 'misses': 0}
+            self._flush_at = time.monotonic() + FLUSH_SECONDS
+        for counter, amount in pending.items():
+            if amount:
+                cache.add(self.keys[counter], 0, timeout=None)
+                cache.incr(self.keys[counter], amount)
+
+    def as_dict(self) -> Dict[str, float]:
+        """
+        Get counters of the current process and hit ratio.
+        Returns:
+            Dict:
+        """
+        with self._lock:
+            return with_ratio(self.hits, self.misses)
+
+    def totals(self) -> Dict[str, float]:
+        """
+        Get counters of all processes and hit ratio.
+
+        Counts of other processes may lag by FLUSH_SECONDS.
+        Returns:
+            Dict:
+        """
+        self.flush()
+        counters = cache.get_many(self.keys.values())
+        return with_ratio(
+            counters.get(self.keys['hits'], 0),
+            counters.get(self.keys['misses'], 0),
+        )
+
+    def reset(self):
+        """Reset counters."""
+        with self._lock:
+            self.hits = self.misses = 0
+            self._pending = {'hits': 0, 'misses': 0}
+            self._flush_at = 0.0
+        cache.delete_many(self.keys.values())
+
+
+def with_ratio(hits: int, misses: int) -> Dict[str, float]:
+    """
+    Build counters with hit ratio.
+    Args:
+        hits:
+        misses:
+    Returns:
+        Dict:
+    """
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
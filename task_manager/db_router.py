@@ -0,0 +1,173 @@
+"""
+Read replica routing.
+
+Reads of the views in REPLICA_READ_VIEWS go to a random alias of
+DATABASE_REPLICAS, everything else goes to default. Once a request writes,
+its later reads go to default and the response sets a cookie keeping the
+client on default for REPLICA_STICKY_SECONDS, so users read their own
+writes while replicas catch up.
+"""
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+STICKY_COOKIE = 'db_primary_until'
+
+
+class RoutingState(object):
+    """Routing of the current request."""
+
+    def __init__(self, pinned: bool = False):
+        """
+        Init state.
+        Args:
+            pinned: whether the client wrote recently
+        """
+        self.pinned = pinned
+        self.replica_reads = False
+        self.written = False
+
+
+_state: ContextVar[Optional[RoutingState]] = ContextVar(
+    'db_routing_state', default=None,
+)
+
+
+def get_replica() -> Optional[str]:
+    """
+    Get a replica alias for a read of the current request.
+    Returns:
+        Optional: None to read from default
+    """
+    state = _state.get()
+    replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+    if state is None or not replicas:
+        return None
+    if state.pinned or state.written or not state.replica_reads:
+        return None
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return None
+    return random.choice(replicas)  # noqa: S311
+
+
+class PrimaryReplicaRouter(object):
+    """Send writes to default and reads of replica views to replicas."""
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        """
+        Pick a replica when the request allows it.
+        Args:
+            model:
+            hints:
+        Returns:
+            Optional:
+        """
+        return get_replica()
+
+    def db_for_write(self, model, **hints) -> str:
+        """
+        Write to default and keep the request there.
+        Args:
+            model:
+            hints:
+        Returns:
+            str:
+        """
+        state = _state.get()
+        if state is not None:
+            state.written = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        """
+        Relate rows read from default and replicas, they hold the same data.
+        Args:
+            obj1:
+            obj2:
+            hints:
+        Returns:
+            bool:
+        """
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool:
+        """
+        Migrate default only, replicas get the schema by replication.
+        Args:
+            db:
+            app_label:
+            model_name:
+            hints:
+        Returns:
+            bool:
+        """
+        return db not in getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+class ReplicaRoutingMiddleware(object):
+    """Track writes of a request and keep recent writers on default."""
+
+    def __init__(self, get_response):
+        """
+        Init middleware.
+        Args:
+            get_response:
+        """
+        self.get_response = get_response
+
+    def __call__(self, request) -> Any:
+        """
+        Handle request.
+        Args:
+            request:
+        Returns:
+            Any:
+        """
+        state = RoutingState(pinned=self.is_pinned(request))
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.written:
+            sticky_seconds = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(int(time.time() + sticky_seconds)),
+                max_age=sticky_seconds,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def is_pinned(self, request) -> bool:
+        """
+        Check the client wrote within the sticky window.
+        Args:
+            request:
+        Returns:
+            bool:
+        """
+        try:
+            until = int(request.COOKIES.get(STICKY_COOKIE, 0))
+        except ValueError:
+            return False
+        return until > time.time()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """
+        Allow replica reads in the views of REPLICA_READ_VIEWS.
+        Args:
+            request:
+            view_func:
+            view_args:
+            view_kwargs:
+        """
+        state = _state.get()
+        match = request.resolver_match
+        if state is not None and match is not None:
+            state.replica_reads = match.url_name in settings.REPLICA_READ_VIEWS
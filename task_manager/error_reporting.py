@@ -0,0 +1,405 @@
+"""
+Background error reporting.
+
+ErrorReportingMiddleware turns an exception of a view into a small report
+on the request thread and hands it to ErrorReporter. The report keeps
+the formatted traceback only, not the traceback object holding frames
+and their locals. A worker thread sends
+waiting reports in batches through a sink: Rollbar, a JSON lines file or
+none. An exception raised again within the dedupe window is only
+counted and the count goes with its next report. The queue is bounded,
+reports over it are dropped and counted.
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied, SuspiciousOperation
+from django.http import Http404
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+IGNORED_EXCEPTIONS = (Http404, PermissionDenied, SuspiciousOperation)
+
+
+class ErrorReport(object):
+    """Exception of a request waiting to be sent, formatted as strings."""
+
+    def __init__(self, exc_info, request_data: Dict[str, Any]):
+        """
+        Init report.
+        Args:
+            exc_info: exception type, value and traceback
+            request_data: method, path and url name of the request
+        """
+        self.exception = exc_info[0].__qualname__
+        self.message = str(exc_info[1])
+        self.traceback = ''.join(traceback.format_exception(*exc_info))
+        self.request_data = request_data
+        self.fingerprint = get_fingerprint(exc_info)
+        self.occurrences = 1
+        self.created = time.time()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Represent the report as plain data.
+        Returns:
+            Dict:
+        """
+        return {
+            'time': self.created,
+            'exception': self.exception,
+            'message': self.message,
+            'traceback': self.traceback,
+            'occurrences': self.occurrences,
+            'request': self.request_data,
+        }
+
+
+def get_fingerprint(exc_info) -> Tuple:
+    """
+    Get what identical exceptions have in common.
+    Args:
+        exc_info:
+    Returns:
+        Tuple:
+    """
+    frames = tuple(
+        (frame.f_code.co_filename, lineno)
+        for frame, lineno in traceback.walk_tb(exc_info[2])
+    )
+    return (exc_info[0].__module__, exc_info[0].__qualname__, frames)
+
+
+class NullSink(object):
+    """Drop reports, exceptions of requests are logged by Django anyway."""
+
+    def send(self, reports: List[ErrorReport]):
+        """
+        Drop reports.
+        Args:
+            reports:
+        """
+
+
+class MemorySink(object):
+    """Keep the last sent reports in memory, for tests."""
+
+    def __init__(self, max_reports: int = 100):
+        """
+        Init sink.
+        Args:
+            max_reports: reports kept, older ones are dropped
+        """
+        self.reports: Deque[ErrorReport] = deque(maxlen=max_reports)
+
+    def send(self, reports: List[ErrorReport]):
+        """
+        Keep reports.
+        Args:
+            reports:
+        """
+        self.reports.extend(reports)
+
+
+class FileSink(object):
+    """Append reports to a JSON lines file."""
+
+    def __init__(self, path: str):
+        """
+        Init sink.
+        Args:
+            path: file to append to
+        """
+        self.path = path
+
+    def send(self, reports: List[ErrorReport]):
+        """
+        Write reports with one write.
+        Args:
+            reports:
+        """
+        lines = ''.join(
+            json.dumps(report.as_dict(), default=str) + '\n'
+            for report in reports
+        )
+        with open(self.path, 'a', encoding='utf-8') as stream:
+            stream.write(lines)
+
+
+class RollbarSink(object):
+    """
+    Send reports to Rollbar, one message item per report.
+
+    The item carries the formatted traceback as extra data and is grouped
+    by the fingerprint of the exception, not by its message.
+    """
+
+    def __init__(self):
+        """Init sink, Rollbar is initialized by init or the first send."""
+        self.initialized = False
+
+    def init(self):
+        """Initialize Rollbar once, sending synchronously."""
+        import rollbar  # noqa: WPS433
+        if not self.initialized:
+            rollbar.init(**{**settings.ROLLBAR, 'handler': 'blocking'})
+            self.initialized = True
+
+    def send(self, reports: List[ErrorReport]):
+        """
+        Send reports synchronously from the worker thread.
+        Args:
+            reports:
+        """
+        import rollbar  # noqa: WPS433
+        self.init()
+        for report in reports:
+            rollbar.report_message(
+                '{exception}: {message}'.format(
+                    exception=report.exception, message=report.message,
+                ),
+                level='error',
+                extra_data={
+                    'occurrences': report.occurrences,
+                    'traceback': report.traceback,
+                },
+                payload_data={
+                    'request': report.request_data,
+                    'context': report.request_data.get('url_name'),
+                    'fingerprint': hashlib.sha1(  # noqa: S303
+                        repr(report.fingerprint).encode(),
+                    ).hexdigest(),
+                },
+            )
+
+
+class ErrorReporter(object):
+    """Queue reports and send them in batches from a worker thread."""
+
+    def __init__(
+        self,
+        sink,
+        dedupe_seconds: float = 60,
+        batch_size: int = 20,
+        flush_seconds: float = 1,
+        max_queue: int = 1000,
+    ):
+        """
+        Init reporter.
+        Args:
+            sink: object with send(reports)
+            dedupe_seconds: identical exceptions are sent once per window
+            batch_size: reports sent at once
+            flush_seconds: time a report waits for others of its batch
+            max_queue: reports waiting to be sent before new ones are dropped
+        """
+        self.sink = sink
+        self.dedupe_seconds = dedupe_seconds
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_queue = max_queue
+        self.queue: queue.Queue = queue.Queue(max_queue)
+        self.dropped = 0
+        self._windows: Dict[Tuple, List] = {}
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+
+    def report(self, exc_info, request_data: Dict[str, Any]) -> bool:
+        """
+        Queue an exception unless it was reported within the window.
+        Args:
+            exc_info: exception type, value and traceback
+            request_data: method, path and url name of the request
+        Returns:
+            bool: whether a report was queued
+        """
+        error_report = ErrorReport(exc_info, request_data)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(error_report.fingerprint)
+            if window is not None and now < window[0]:
+                window[1] += 1
+                return False
+            if window is not None:
+                error_report.occurrences += window[1]
+            if len(self._windows) >= self.max_queue:
+                self._drop_expired_windows(now)
+            self._windows[error_report.fingerprint] = [
+                now + self.dedupe_seconds, 0,
+            ]
+        self.start()
+        try:
+            self.queue.put_nowait(error_report)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _drop_expired_windows(self, now: float):
+        """
+        Forget windows which have ended, all of them if none has.
+        Args:
+            now:
+        """
+        expired = [
+            fingerprint for fingerprint, window in self._windows.items()
+            if window[0] <= now
+        ]
+        for fingerprint in expired or list(self._windows):
+            self._windows.pop(fingerprint)
+
+    def start(self):
+        """Start the worker thread, again in a forked worker."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            threading.Thread(
+                target=self.run, name='error-reporter', daemon=True,
+            ).start()
+            self._pid = os.getpid()
+
+    def run(self):
+        """Send batches of waiting reports forever."""
+        while True:  # noqa: WPS457
+            batch = self.next_batch()
+            try:
+                self.sink.send(batch)
+            except Exception:  # noqa: B902
+                logger.exception('Failed to send %s error reports', len(batch))
+            finally:
+                for _report in batch:
+                    self.queue.task_done()
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                logger.warning('Dropped %s error reports', dropped)
+
+    def next_batch(self) -> List[ErrorReport]:
+        """
+        Wait for a report and the ones coming within flush time.
+        Returns:
+            List:
+        """
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self):
+        """Wait until every queued report is sent."""
+        self.queue.join()
+
+
+def build_sink(config: Dict[str, Any]) -> Any:
+    """
+    Build the sink of ERROR_REPORTING.
+    Args:
+        config: ERROR_REPORTING setting
+    Returns:
+        Any:
+    """
+    sink = config.get('SINK', 'none')
+    if sink == 'rollbar':
+        return RollbarSink()
+    if sink == 'file':
+        return FileSink(config['FILE'])
+    if sink == 'none':
+        return NullSink()
+    return import_string(sink)()
+
+
+_reporter: Optional[ErrorReporter] = None
+_reporter_lock = threading.Lock()
+
+
+def get_reporter() -> ErrorReporter:
+    """
+    Get the reporter configured by ERROR_REPORTING.
+    Returns:
+        ErrorReporter:
+    """
+    global _reporter  # noqa: WPS420
+    if _reporter is None:
+        with _reporter_lock:
+            if _reporter is None:
+                config = getattr(settings, 'ERROR_REPORTING', {})
+                _reporter = ErrorReporter(  # noqa: WPS122, WPS442
+                    build_sink(config),
+                    dedupe_seconds=config.get('DEDUPE_SECONDS', 60),
+                    batch_size=config.get('BATCH_SIZE', 20),
+                    flush_seconds=config.get('FLUSH_SECONDS', 1),
+                    max_queue=config.get('MAX_QUEUE', 1000),
+                )
+    return _reporter
+
+
+def get_request_data(request) -> Dict[str, Any]:
+    """
+    Copy what a report needs of the request.
+    Args:
+        request:
+    Returns:
+        Dict:
+    """
+    match = getattr(request, 'resolver_match', None)
+    user = getattr(request, 'user', None)
+    return {
+        'method': request.method,
+        'url': request.get_full_path(),
+        'url_name': match.url_name if match is not None else None,
+        'user_id': getattr(user, 'pk', None),
+    }
+
+
+class ErrorReportingMiddleware(object):
+    """Report exceptions of views in the background."""
+
+    def __init__(self, get_response):
+        """
+        Init middleware.
+        Args:
+            get_response:
+        """
+        self.get_response = get_response
+
+    def __call__(self, request) -> Any:
+        """
+        Handle request.
+        Args:
+            request:
+        Returns:
+            Any:
+        """
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        """
+        Queue a report, the response is left to Django.
+        Args:
+            request:
+            exception:
+        """
+        if isinstance(exception, IGNORED_EXCEPTIONS):
+            return
+        get_reporter().report(
+            (type(exception), exception, exception.__traceback__),
+            get_request_data(request),
+        )
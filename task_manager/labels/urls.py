@@ -1,5 +1,6 @@
 from django.urls import path
 from task_manager.labels.views import (
+    LabelAutocompleteView,
     LabelCreateView,
     LabelDeleteView,
     LabelListView,
@@ -9,6 +10,11 @@ from task_manager.labels.views import (
 urlpatterns = [
     path('', LabelListView.as_view(), name='labels'),
     path('create/', LabelCreateView.as_view(), name='create_label'),
+    path(
+        'autocomplete/',
+        LabelAutocompleteView.as_view(),
+        name='autocomplete_labels',
+    ),
     path('<int:pk>/update/', LabelUpdateView.as_view(), name='update_label'),
     path('<int:pk>/delete/', LabelDeleteView.as_view(), name='delete_label'),
 ]
@@ -12,6 +12,7 @@ from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
 from django.views.generic.edit import CreateView, DeleteView, UpdateView
 from django.views.generic.list import ListView
+from task_manager.autocomplete import AutocompleteView
 from task_manager.labels.forms import LabelForm
 from task_manager.labels.models import Label
 from task_manager.mixins import CustomLoginRequiredMixin
@@ -27,6 +28,14 @@ class LabelListView(CustomLoginRequiredMixin, ListView):
     template_name = 'labels/index.html'
 
 
+class LabelAutocompleteView(AutocompleteView):
+    """Label choices by name prefix."""
+
+    model = Label
+    search_fields = ['name']
+    ordering = ['name']
+
+
 class LabelCreateView(
     CustomLoginRequiredMixin,
     SuccessMessageMixin,
@@ -0,0 +1,167 @@
+"""
+Structured, non-blocking logging.
+
+JsonFormatter writes one JSON object per record. BackgroundStreamHandler
+puts records on a bounded queue and a thread writes them, so requests
+never wait for the stream; when the queue is full records are dropped and
+counted. SqlSampleFilter thins out the records of django.db.backends.
+"""
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+SQL_RECORD_FIELDS = ('duration', 'sql', 'alias')
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as JSON lines."""
+
+    def format(self, record) -> str:  # noqa: A003
+        """
+        Format a record.
+        Args:
+            record:
+        Returns:
+            str:
+        """
+        entry: Dict[str, Any] = {
+            'time': datetime.fromtimestamp(
+                record.created, timezone.utc,
+            ).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+        }
+        for field in SQL_RECORD_FIELDS:
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        if getattr(record, 'status_code', None) is not None:
+            entry['status_code'] = record.status_code
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SqlSampleFilter(logging.Filter):
+    """Pass slow statements and a share of the others."""
+
+    def __init__(
+        self, percent: float = 100, slow_ms: Optional[float] = None,
+    ):
+        """
+        Init filter.
+        Args:
+            percent: share of statements passed, 0 to 100
+            slow_ms: statements at least this slow always pass
+        """
+        super().__init__()
+        self.rate = percent / 100
+        self.slow = None if slow_ms is None else slow_ms / 1000
+
+    def filter(self, record) -> bool:  # noqa: A003
+        """
+        Decide whether the record is logged.
+        Args:
+            record:
+        Returns:
+            bool:
+        """
+        duration = getattr(record, 'duration', None)
+        if self.slow is not None and duration is not None:
+            if duration >= self.slow:
+                return True
+        return self.rate >= 1 or random.random() < self.rate  # noqa: S311
+
+
+class BackgroundStreamHandler(QueueHandler):
+    """Write records to a stream from a background thread."""
+
+    def __init__(self, stream=None, maxsize: int = 10000):
+        """
+        Init handler.
+        Args:
+            stream: stream to write, stderr by default
+            maxsize: records waiting to be written before new ones are dropped
+        """
+        super().__init__(queue.Queue(maxsize))
+        self.target = logging.StreamHandler(stream)
+        self.dropped = 0
+        self._listener: Optional[QueueListener] = None
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+
+    def setFormatter(self, fmt):  # noqa: N802
+        """
+        Set formatter used by the background thread.
+        Args:
+            fmt:
+        """
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record) -> Any:
+        """
+        Pass the record as is, it is formatted by the background thread.
+        Args:
+            record:
+        Returns:
+            Any:
+        """
+        return record
+
+    def enqueue(self, record):
+        """
+        Put a record on the queue, drop it when the queue is full.
+        Args:
+            record:
+        """
+        self.start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped:
+            summary = logging.makeLogRecord({
+                'name': __name__,
+                'levelno': logging.WARNING,
+                'levelname': logging.getLevelName(logging.WARNING),
+                'msg': 'Dropped %s log records, the queue was full.',
+                'args': (self.dropped,),
+            })
+            try:
+                self.queue.put_nowait(summary)
+            except queue.Full:
+                return
+            self.dropped = 0
+
+    def start(self):
+        """Start the writing thread, again in a forked worker."""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._listener = QueueListener(self.queue, self.target)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def close(self):
+        """Write waiting records and stop the thread."""
+        if not self.queue.empty():
+            self.start()
+        if self._listener is not None and self._pid == os.getpid():
+            try:
+                self._listener.stop()
+            except queue.Full:
+                self.dropped += 1
+            self._listener = None
+        self.target.close()
+        super().close()
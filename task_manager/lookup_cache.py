@@ -0,0 +1,338 @@
+"""
+Process-local cache of small lookup tables.
+
+Every process keeps all rows of Status and Label in memory together with
+the version stamp they were read at. The stamp is kept in the default
+cache and bumped when a row is saved or deleted and again when the change
+commits, so each worker reads the table again on its next lookup after a
+change anywhere. A lookup costs one cache read of the stamp instead of a
+query. This needs a cache shared by the workers (SHARED_CACHE), with a
+local one lookups are plain primary key queries and pages load the rows
+they show with the usual query or select_related.
+
+Rows are read from default, a replica lagging behind could otherwise
+leave old rows cached under the new stamp.
+"""
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from django import forms
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from task_manager.cache_stats import CacheStats
+
+LOOKUP_MODELS = ('statuses.Status', 'labels.Label')
+
+stats = CacheStats('lookup')
+
+
+class LookupCache(object):
+    """All rows of a lookup table, keyed by primary key."""
+
+    def __init__(self, model):
+        """
+        Init cache.
+        Args:
+            model: lookup model
+        """
+        self.model = model
+        self.key = 'lookup:version:{label}'.format(
+            label=model._meta.label_lower,  # noqa: WPS437
+        )
+        self._rows: Dict[Any, Any] = {}
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get_version(self) -> int:
+        """
+        Read the shared stamp, starting it if missing.
+        Returns:
+            int:
+        """
+        version = cache.get(self.key)
+        if version is None:
+            cache.add(self.key, time.time_ns(), timeout=None)
+            version = cache.get(self.key)
+        return version
+
+    def bump(self) -> None:
+        """Make every process read the table again."""
+        if not settings.SHARED_CACHE:
+            return
+        cache.set(self.key, time.time_ns(), timeout=None)
+
+    def rows(self) -> Dict[Any, Any]:
+        """
+        Get rows in model ordering, reading them again if the stamp moved.
+
+        The stamp is read before the rows, a change committed meanwhile
+        bumps it again and the next lookup reads the table once more.
+        Without a shared cache the rows are read every time. Reads with a
+        current stamp count as hits, reads of the table as misses.
+        Returns:
+            Dict:
+        """
+        if not settings.SHARED_CACHE:
+            queryset = self.model.objects.using(DEFAULT_DB_ALIAS)
+            return {row.pk: row for row in queryset.all()}
+        version = self.get_version()
+        hit = version == self._version
+        if not hit:
+            with self._lock:
+                if version != self._version:
+                    queryset = self.model.objects.using(DEFAULT_DB_ALIAS)
+                    self._rows = {row.pk: row for row in queryset.all()}
+                    self._version = version
+        stats.record(hits=int(hit), misses=int(not hit))
+        return self._rows
+
+    def get(self, pk) -> Optional[Any]:
+        """
+        Get a row, queried by primary key without a shared cache.
+        Args:
+            pk: primary key
+        Returns:
+            Optional:
+        """
+        if not settings.SHARED_CACHE:
+            return self.model.objects.filter(pk=pk).first()
+        return self.rows().get(pk)
+
+    def filter(self, pks: Iterable) -> List[Any]:
+        """
+        Get rows of primary keys in model ordering, unknown keys are skipped.
+
+        Without a shared cache the rows are queried by primary key.
+        Args:
+            pks: primary keys or their strings
+        Returns:
+            List:
+        """
+        if not settings.SHARED_CACHE:
+            return list(self.model.objects.filter(pk__in=[
+                pk for pk in pks if str(pk).isdigit()
+            ]))
+        return select_rows(self.rows(), pks)
+
+
+def select_rows(rows: Dict[Any, Any], pks: Iterable) -> List[Any]:
+    """
+    Get rows of primary keys in the order of rows, unknown keys are skipped.
+    Args:
+        rows: rows by primary key
+        pks: primary keys or their strings
+    Returns:
+        List:
+    """
+    wanted = {str(pk) for pk in pks}
+    return [row for pk, row in rows.items() if str(pk) in wanted]
+
+
+_caches: Dict[str, LookupCache] = {}
+_caches_lock = threading.Lock()
+
+
+def for_model(model) -> Optional[LookupCache]:
+    """
+    Get the cache of a lookup model.
+    Args:
+        model:
+    Returns:
+        Optional: None if the model is not in LOOKUP_MODELS
+    """
+    label = model._meta.label  # noqa: WPS437
+    if label not in LOOKUP_MODELS:
+        return None
+    if label not in _caches:
+        with _caches_lock:
+            _caches.setdefault(label, LookupCache(apps.get_model(label)))
+    return _caches[label]
+
+
+def attach(objects: Iterable, field_name: str) -> None:
+    """
+    Set a foreign key to a lookup model from the cache.
+
+    Rows missing from the cache, and every row without a shared cache, are
+    left to the usual query or select_related.
+    Args:
+        objects: model instances
+        field_name: name of the foreign key
+    """
+    objects = list(objects)
+    if not objects or not settings.SHARED_CACHE:
+        return
+    field = objects[0]._meta.get_field(field_name)  # noqa: WPS437
+    rows = for_model(field.related_model).rows()
+    for instance in objects:
+        row = rows.get(getattr(instance, field.attname))
+        if row is not None:
+            field.set_cached_value(instance, row)
+
+
+def attach_many(objects: Iterable, field_name: str) -> None:
+    """
+    Set a many to many field to a lookup model from the cache.
+
+    Costs one query of the through table for all objects, its result is
+    used by field.all() like prefetch_related. Objects related to rows
+    missing from the cache, and all objects without a shared cache, are
+    left to the usual query.
+    Args:
+        objects: model instances
+        field_name: name of the many to many field
+    """
+    objects = list(objects)
+    if not objects or not settings.SHARED_CACHE:
+        return
+    field = objects[0]._meta.get_field(field_name)  # noqa: WPS437
+    lookup_rows = for_model(field.related_model).rows()
+    through = field.remote_field.through
+    source = field.m2m_field_name()
+    target = field.m2m_reverse_field_name()
+    related: Dict[Any, set] = {instance.pk: set() for instance in objects}
+    links = through.objects.filter(**{
+        '{source}__in'.format(source=source): list(related),
+    }).values_list(
+        '{source}_id'.format(source=source),
+        '{target}_id'.format(target=target),
+    )
+    for instance_pk, related_pk in links:
+        related[instance_pk].add(related_pk)
+    for instance in objects:
+        rows = select_rows(lookup_rows, related[instance.pk])
+        if len(rows) != len(related[instance.pk]):
+            continue
+        manager = getattr(instance, field_name)
+        queryset = manager.get_queryset()
+        queryset._result_cache = rows  # noqa: WPS437
+        queryset._prefetch_done = True  # noqa: WPS437
+        prefetched = instance.__dict__.setdefault(  # noqa: WPS609
+            '_prefetched_objects_cache', {},
+        )
+        prefetched[field.name] = queryset
+
+
+class CachedChoiceMixin(object):
+    """Validate choices of a lookup model against the cache."""
+
+    @property
+    def lookup(self) -> LookupCache:
+        """
+        Get the cache of the queryset model.
+        Returns:
+            LookupCache:
+        """
+        return for_model(self.queryset.model)
+
+    def selected_rows(self, pks: Iterable) -> List[Any]:
+        """
+        Get rows of selected values to render.
+        Args:
+            pks:
+        Returns:
+            List:
+        """
+        return self.lookup.filter(pks)
+
+    def get_row(self, value, rows: Optional[Dict[Any, Any]] = None) -> Any:
+        """
+        Get the row of a value, rows missing from the cache are queried.
+
+        Without a shared cache the value is queried by primary key.
+        Args:
+            value:
+            rows: rows of the cache, read if not given
+        Returns:
+            Any:
+        Raises:
+            ValidationError: if there is no such row
+        """
+        if isinstance(value, self.queryset.model):
+            return value
+        try:
+            pk = self.queryset.model._meta.pk.to_python(value)  # noqa: WPS437
+        except forms.ValidationError:
+            pk = None
+        row = None
+        if settings.SHARED_CACHE:
+            if rows is None:
+                rows = self.lookup.rows()
+            row = rows.get(pk)
+        if row is None and pk is not None:
+            row = self.queryset.filter(pk=pk).first()
+        if row is None:
+            raise forms.ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return row
+
+
+class CachedModelChoiceField(CachedChoiceMixin, forms.ModelChoiceField):
+    """ModelChoiceField of a lookup model, the queryset is not filtered."""
+
+    def to_python(self, value) -> Any:
+        """
+        Get the row of the value from the cache.
+        Args:
+            value:
+        Returns:
+            Any:
+        """
+        if value in self.empty_values:
+            return None
+        return self.get_row(value)
+
+
+class CachedModelMultipleChoiceField(
+    CachedChoiceMixin,
+    forms.ModelMultipleChoiceField,
+):
+    """ModelMultipleChoiceField of a lookup model, cleans to a list."""
+
+    def _check_values(self, value) -> List[Any]:  # noqa: WPS120
+        """
+        Get rows of the values from the cache, or with one query without it.
+        Args:
+            value:
+        Returns:
+            List:
+        Raises:
+            ValidationError: if value is not a list
+        """
+        if not settings.SHARED_CACHE:
+            return list(super()._check_values(value))
+        if not isinstance(value, (list, tuple)):
+            raise forms.ValidationError(
+                self.error_messages['invalid_list'], code='invalid_list',
+            )
+        lookup_rows = self.lookup.rows()
+        rows = [self.get_row(pk, lookup_rows) for pk in value]
+        return list({row.pk: row for row in rows}.values())
+
+
+@receiver(post_save, sender='statuses.Status')
+@receiver(post_delete, sender='statuses.Status')
+@receiver(post_save, sender='labels.Label')
+@receiver(post_delete, sender='labels.Label')
+def bump_lookup_cache(sender, instance, **kwargs):
+    """
+    Make every process read the changed lookup table again.
+
+    The stamp is bumped again on commit, a process reading the table
+    before the commit would keep the old rows otherwise.
+    Args:
+        sender:
+        instance:
+        kwargs:
+    """
+    lookup = for_model(sender)
+    lookup.bump()
+    transaction.on_commit(lookup.bump, using=kwargs.get('using'))
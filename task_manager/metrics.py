@@ -0,0 +1,209 @@
+"""
+Prometheus metrics of requests.
+
+Metrics are kept by prometheus_client. With PROMETHEUS_MULTIPROC_DIR set,
+as gunicorn.conf.py does, every worker writes its values to files of that
+directory and the metrics view sums the files of all workers. The view
+is open to the clients allowed by the METRICS setting only.
+"""
+import os
+import time
+from typing import Any
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from task_manager import lookup_cache
+from task_manager.tasks import row_cache
+
+MULTIPROC_DIR_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+UNKNOWN_VIEW = 'unknown'
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+request_duration = Histogram(
+    'task_manager_request_duration_seconds',
+    'Time to build the response by url name and method.',
+    ['url_name', 'method'],
+    buckets=LATENCY_BUCKETS,
+)
+request_db_duration = Histogram(
+    'task_manager_request_db_duration_seconds',
+    'SQL time per request by url name and method.',
+    ['url_name', 'method'],
+    buckets=LATENCY_BUCKETS,
+)
+request_queries = Histogram(
+    'task_manager_request_queries',
+    'SQL queries per request by url name and method.',
+    ['url_name', 'method'],
+    buckets=QUERY_BUCKETS,
+)
+template_render_duration = Histogram(
+    'task_manager_template_render_duration_seconds',
+    'Time to render the template of a response by url name.',
+    ['url_name'],
+    buckets=LATENCY_BUCKETS,
+)
+response_size = Histogram(
+    'task_manager_response_size_bytes',
+    'Size of not streamed responses by url name and method.',
+    ['url_name', 'method'],
+    buckets=SIZE_BUCKETS,
+)
+
+
+class CacheCollector(object):
+    """
+    Hits, misses and hit ratio of process caches of all workers.
+
+    The task row and lookup caches are used with a shared cache only
+    (SHARED_CACHE), without one nothing is reported.
+    """
+
+    caches = (
+        ('task_row', 'task rows', row_cache.stats),
+        ('lookup', 'statuses and labels', lookup_cache.stats),
+    )
+
+    def collect(self) -> Any:
+        """
+        Read counters kept in the cache.
+        Yields:
+            Any:
+        """
+        if not settings.SHARED_CACHE:
+            return
+        for prefix, rows, stats in self.caches:
+            totals = stats.totals()
+            for name in ('hits', 'misses'):
+                yield CounterMetricFamily(
+                    'task_manager_{prefix}_cache_{name}'.format(
+                        prefix=prefix, name=name,
+                    ),
+                    'Cache {name} of {rows}.'.format(name=name, rows=rows),
+                    value=totals[name],
+                )
+            yield GaugeMetricFamily(
+                'task_manager_{prefix}_cache_hit_ratio'.format(prefix=prefix),
+                'Share of {rows} read from the cache.'.format(rows=rows),
+                value=totals['hit_ratio'],
+            )
+
+
+cache_registry = CollectorRegistry(auto_describe=True)
+cache_registry.register(CacheCollector())
+
+
+def render_metrics() -> bytes:
+    """
+    Render metrics of all workers in the text exposition format.
+    Returns:
+        bytes:
+    """
+    registry = REGISTRY
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry) + generate_latest(cache_registry)
+
+
+def can_read_metrics(request) -> bool:
+    """
+    Check the client may read metrics, see the METRICS setting.
+
+    Address and token are checked first, they need no query.
+    Args:
+        request:
+    Returns:
+        bool:
+    """
+    config = settings.METRICS
+    if request.META.get('REMOTE_ADDR') in config['ALLOWED_IPS']:
+        return True
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    if config['TOKEN'] and constant_time_compare(
+        authorization, 'Bearer {token}'.format(token=config['TOKEN']),
+    ):
+        return True
+    return request.user.is_staff
+
+
+def get_url_name(request) -> str:
+    """
+    Get url name of a request, UNKNOWN_VIEW for unresolved ones.
+    Args:
+        request:
+    Returns:
+        str:
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.url_name:
+        return UNKNOWN_VIEW
+    return match.url_name
+
+
+class MetricsMiddleware(object):
+    """Observe latency, SQL time, render time and size of responses."""
+
+    def __init__(self, get_response):
+        """
+        Init middleware.
+        Args:
+            get_response:
+        """
+        self.get_response = get_response
+
+    def __call__(self, request) -> Any:
+        """
+        Handle request.
+
+        Streamed content is sent after the response is returned, so it is
+        not part of the latency and the size.
+        Args:
+            request:
+        Returns:
+            Any:
+        """
+        start = time.perf_counter()
+        response = self.get_response(request)
+        labels = (get_url_name(request), request.method)
+        request_duration.labels(*labels).observe(time.perf_counter() - start)
+        recorder = getattr(request, 'query_recorder', None)
+        if recorder is not None:
+            request_db_duration.labels(*labels).observe(recorder.duration)
+            request_queries.labels(*labels).observe(recorder.count)
+        if not response.streaming:
+            response_size.labels(*labels).observe(len(response.content))
+        return response
+
+    def process_template_response(self, request, response) -> Any:
+        """
+        Observe rendering time of a template response.
+        Args:
+            request:
+            response:
+        Returns:
+            Any:
+        """
+        start = time.perf_counter()
+        url_name = get_url_name(request)
+
+        def observe(rendered):
+            template_render_duration.labels(url_name).observe(
+                time.perf_counter() - start,
+            )
+
+        response.add_post_render_callback(observe)
+        return response
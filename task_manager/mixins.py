@@ -3,8 +3,11 @@ from typing import Any
 from django import test
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.urls import reverse_lazy
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse, reverse_lazy
 from django.utils.translation import gettext_lazy as _
+from task_manager import query_budget
 
 
 class CustomLoginRequiredMixin(LoginRequiredMixin):
@@ -28,7 +31,40 @@ class CustomLoginRequiredMixin(LoginRequiredMixin):
 
 
 @test.modify_settings(MIDDLEWARE={'remove': [
-    'rollbar.contrib.django.middleware.RollbarNotifierMiddleware',
+    'task_manager.error_reporting.ErrorReportingMiddleware',
 ]})
 class TestCaseWithoutRollbar(test.TestCase):
-    """Switch off rollbar middleware."""
+    """Switch off error reporting middleware."""
+
+
+class QueryBudgetTestMixin(object):
+    """Check views against QUERY_BUDGETS."""
+
+    def assertQueryBudget(  # noqa: N802
+        self, url_name: str, kwargs=None, method: str = 'get', data=None,
+    ) -> Any:
+        """
+        Request a view and fail when it runs more queries than its budget.
+
+        Streamed content is read, so its queries are counted too.
+        Args:
+            url_name: name of the view url
+            kwargs: url arguments
+            method: http method of the test client
+            data: request data
+        Returns:
+            Any:
+        """
+        request = getattr(self.client, method)
+        with CaptureQueriesContext(connection) as queries:
+            response = request(reverse(url_name, kwargs=kwargs), data)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        budget = query_budget.get_budget(url_name, method)
+        if budget is not None:
+            self.assertLessEqual(
+                len(queries),
+                budget,
+                '\n'.join(query['sql'] for query in queries.captured_queries),
+            )
+        return response
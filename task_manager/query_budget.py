@@ -0,0 +1,255 @@
+"""
+Per-request SQL query budgets.
+
+QueryBudgetMiddleware wraps the execution of queries of each request and
+keeps the number of queries, the total SQL time and the slowest statement
+per url name. A request running more queries than the budget of its url
+name is logged, or raises QueryBudgetExceeded when QUERY_BUDGET_ACTION is
+'raise'.
+
+Queries of streamed content run after the view returns, they are recorded
+while the stream is read and the request is checked once it is exhausted.
+A stream closed early is not recorded.
+"""
+import logging
+import threading
+import time
+from contextlib import ExitStack
+from typing import Any, Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.db import connections
+from django.urls import URLPattern, URLResolver, get_resolver
+
+logger = logging.getLogger(__name__)
+
+LOG = 'log'
+RAISE = 'raise'
+
+
+class QueryBudgetExceeded(Exception):
+    """Request ran more queries than its budget."""
+
+
+class QueryRecorder(object):
+    """Execute wrapper counting and timing the queries of one request."""
+
+    def __init__(self):
+        """Init counters."""
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_sql = ''
+        self.slowest_duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context) -> Any:
+        """
+        Execute a query and record it.
+        Args:
+            execute:
+            sql:
+            params:
+            many:
+            context:
+        Returns:
+            Any:
+        """
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.duration += duration
+            if duration >= self.slowest_duration:
+                self.slowest_duration = duration
+                self.slowest_sql = sql
+
+
+class QueryStats(object):
+    """Query counters of the current process by url name."""
+
+    def __init__(self):
+        """Init counters."""
+        self._lock = threading.Lock()
+        self._views: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, url_name: str, recorder: QueryRecorder):
+        """
+        Add queries of a request.
+        Args:
+            url_name:
+            recorder: queries of the request
+        """
+        with self._lock:
+            view = self._views.setdefault(url_name, {
+                'requests': 0,
+                'queries': 0,
+                'max_queries': 0,
+                'duration': 0.0,
+                'slowest_sql': '',
+                'slowest_duration': 0.0,
+            })
+            view['requests'] += 1
+            view['queries'] += recorder.count
+            view['max_queries'] = max(view['max_queries'], recorder.count)
+            view['duration'] += recorder.duration
+            if recorder.slowest_duration >= view['slowest_duration']:
+                view['slowest_duration'] = recorder.slowest_duration
+                view['slowest_sql'] = recorder.slowest_sql
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get a copy of counters.
+        Returns:
+            Dict:
+        """
+        with self._lock:
+            return {name: dict(view) for name, view in self._views.items()}
+
+    def reset(self):
+        """Reset counters."""
+        with self._lock:
+            self._views.clear()
+
+
+stats = QueryStats()
+
+
+def get_budget(url_name: str, method: str = 'GET') -> Optional[int]:
+    """
+    Get the query budget of a view, None for no budget.
+
+    A budget is a number for all methods or a dict by method.
+    Args:
+        url_name:
+        method: http method of the request
+    Returns:
+        Optional:
+    """
+    default = getattr(settings, 'QUERY_BUDGET_DEFAULT', None)
+    budget = getattr(settings, 'QUERY_BUDGETS', {}).get(url_name, default)
+    if isinstance(budget, dict):
+        return budget.get(method.upper(), default)
+    return budget
+
+
+def url_names(patterns=None) -> List[str]:
+    """
+    Get names of all url patterns of the root urlconf.
+    Args:
+        patterns: patterns to walk, the root ones by default
+    Returns:
+        List:
+    """
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    names = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names.extend(url_names(pattern.url_patterns))
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.append(pattern.name)
+    return names
+
+
+class QueryBudgetMiddleware(object):
+    """Record queries of every request and check the budget of its view."""
+
+    def __init__(self, get_response):
+        """
+        Init middleware.
+        Args:
+            get_response:
+        """
+        self.get_response = get_response
+
+    def __call__(self, request) -> Any:
+        """
+        Handle request.
+        Args:
+            request:
+        Returns:
+            Any:
+        """
+        recorder = QueryRecorder()
+        request.query_recorder = recorder
+        with self.recording(recorder):
+            response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = self.stream(
+                request, response.streaming_content, recorder,
+            )
+        else:
+            self.finish(request, recorder)
+        return response
+
+    def recording(self, recorder: QueryRecorder) -> ExitStack:
+        """
+        Get a context recording queries of every connection.
+        Args:
+            recorder: queries of the request
+        Returns:
+            ExitStack:
+        """
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    def stream(
+        self, request, content: Iterator[bytes], recorder: QueryRecorder,
+    ) -> Iterator[bytes]:
+        """
+        Read streamed content recording its queries.
+        Args:
+            request:
+            content: streamed content of the response
+            recorder: queries of the request
+        Yields:
+            bytes: chunks of the content
+        """
+        with self.recording(recorder):
+            yield from content
+        self.finish(request, recorder)
+
+    def finish(self, request, recorder: QueryRecorder):
+        """
+        Record queries of the request and check its budget.
+        Args:
+            request:
+            recorder: queries of the request
+        """
+        match = request.resolver_match
+        if match is not None and match.url_name:
+            stats.record(match.url_name, recorder)
+            self.check_budget(match.url_name, request.method, recorder)
+
+    def check_budget(
+        self, url_name: str, method: str, recorder: QueryRecorder,
+    ):
+        """
+        Log or raise when the request is over budget.
+        Args:
+            url_name:
+            method: http method of the request
+            recorder: queries of the request
+        Raises:
+            QueryBudgetExceeded: if the action is RAISE
+        """
+        budget = get_budget(url_name, method)
+        if budget is None or recorder.count <= budget:
+            return
+        message = (
+            '{method} {url_name}: {count} queries, budget {budget}, '
+            '{duration:.1f} ms, slowest: {sql}'
+        ).format(
+            method=method,
+            url_name=url_name,
+            count=recorder.count,
+            budget=budget,
+            duration=recorder.duration * 1000,
+            sql=recorder.slowest_sql,
+        )
+        if getattr(settings, 'QUERY_BUDGET_ACTION', LOG) == RAISE:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
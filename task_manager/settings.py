@@ -10,13 +10,14 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 import os
+import tempfile
 import dj_database_url
-import rollbar
 from pathlib import Path
 
 from dotenv import load_dotenv
 from django.utils.log import DEFAULT_LOGGING
 from django.urls import reverse_lazy
+from task_manager.utils import is_shared_cache
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
     'bootstrap4',
     'django_filters',
@@ -55,6 +57,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'task_manager.db_router.ReplicaRoutingMiddleware',
+    'task_manager.metrics.MetricsMiddleware',
+    'task_manager.query_budget.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -62,7 +68,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'rollbar.contrib.django.middleware.RollbarNotifierMiddleware',
+    'task_manager.error_reporting.ErrorReportingMiddleware',
 ]
 
 ROOT_URLCONF = 'task_manager.urls'
@@ -104,6 +110,48 @@ CONN_MAX_AGE = 500
 db_from_env = dj_database_url.config(conn_max_age=CONN_MAX_AGE)
 DATABASES['default'].update(db_from_env)
 
+# Read replicas as comma separated database URLs, for example
+# DATABASE_REPLICA_URLS=sqlite:///replica.sqlite3 next to db.sqlite3.
+# Reads of REPLICA_READ_VIEWS go to a replica unless the client wrote
+# within REPLICA_STICKY_SECONDS. Tests run replicas as mirrors of default.
+DATABASE_REPLICAS = []
+replica_urls = os.getenv('DATABASE_REPLICA_URLS', '')
+for replica_url in filter(None, replica_urls.split(',')):
+    replica_alias = 'replica{index}'.format(index=len(DATABASE_REPLICAS))
+    DATABASES[replica_alias] = dj_database_url.parse(
+        replica_url.strip(), conn_max_age=CONN_MAX_AGE,
+    )
+    DATABASES[replica_alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(replica_alias)
+DATABASE_ROUTERS = ['task_manager.db_router.PrimaryReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '15'))
+REPLICA_READ_VIEWS = frozenset((
+    'tasks',
+    'detail_task',
+    'users',
+    'statuses',
+    'labels',
+))
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# Several gunicorn workers need a shared backend (memcached or redis) so
+# that invalidation done by one worker is seen by the others. Caches of
+# sessions, users, task rows, lookups and conditional GET stamps are only
+# used with one, SHARED_CACHE tells whether CACHE_BACKEND is.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'task-manager'),
+    },
+}
+SHARED_CACHE = is_shared_cache(CACHES['default']['BACKEND'])
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -142,18 +190,42 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.2/howto/static-files/
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATIC_URL = '/static/'
-STATICFILES_DIRS = [
-    os.path.join(BASE_DIR, 'static'),
-]
+# Bootstrap and jQuery are vendored under task_manager/static/vendor.
+# collectstatic writes them with hashed names and gzip and brotli variants,
+# WhiteNoise serves hashed names as immutable with a ten year max-age.
+STATICFILES_STORAGE = 'task_manager.storage.StaticFilesStorage'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# LOG_FORMAT=json writes JSON lines from a background thread, records are
+# dropped instead of blocking requests when LOG_QUEUE_SIZE of them wait.
+# Django logs SQL statements only with DEBUG, SQL_LOG_PERCENT of them are
+# passed and the ones slower than SQL_LOG_SLOW_MS always are.
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+SQL_LOG_PERCENT = float(os.getenv('SQL_LOG_PERCENT', '100'))
+SQL_LOG_SLOW_MS = os.getenv('SQL_LOG_SLOW_MS')
+
 LOGGING = DEFAULT_LOGGING.copy()
 LOGGING.update(
     {
+        'filters': {
+            **DEFAULT_LOGGING['filters'],
+            'sql_sample': {
+                '()': 'task_manager.log.SqlSampleFilter',
+                'percent': SQL_LOG_PERCENT,
+                'slow_ms': float(SQL_LOG_SLOW_MS) if SQL_LOG_SLOW_MS else None,
+            },
+        },
+        'formatters': {
+            **DEFAULT_LOGGING['formatters'],
+            'json': {
+                '()': 'task_manager.log.JsonFormatter',
+            },
+        },
         'handlers': {
             'console': {
                 'level': 'DEBUG',
@@ -179,10 +251,23 @@ LOGGING.update(
                 'level': 'DEBUG',
                 'propagate': False,
                 'handlers': ['console'],
+                'filters': ['sql_sample'],
+            },
+            'task_manager': {
+                'handlers': ['console'],
+                'level': 'INFO',
             },
         },
     }
 )
+if LOG_FORMAT == 'json':
+    for handler in ('console', 'django.server'):
+        LOGGING['handlers'][handler] = {
+            'level': LOGGING['handlers'][handler]['level'],
+            'class': 'task_manager.log.BackgroundStreamHandler',
+            'formatter': 'json',
+            'maxsize': LOG_QUEUE_SIZE,
+        }
 
 LOCALE_PATHS = (os.path.join(BASE_DIR, 'locale/'), )
 
@@ -194,15 +279,138 @@ LANGUAGES = (
 
 AUTH_USER_MODEL = 'users.CustomUser'
 
+# With a shared cache, users of sessions are read from the cache, saving a
+# query per request. A local cache would keep a user logged out or changed
+# by another worker.
+AUTHENTICATION_BACKENDS = [
+    'task_manager.users.backends.CachedModelBackend' if SHARED_CACHE
+    else 'django.contrib.auth.backends.ModelBackend',
+]
+AUTH_USER_CACHE_SECONDS = 300
+
+# With a shared cache, sessions are read from SESSION_CACHE_ALIAS and
+# written through to the database, which keeps them when the cache is
+# cleared. Otherwise they are read from the database, a flushed session
+# must end in every worker.
+SESSION_ENGINE = os.getenv(
+    'SESSION_ENGINE',
+    'django.contrib.sessions.backends.cached_db' if SHARED_CACHE
+    else 'django.contrib.sessions.backends.db',
+)
+SESSION_CACHE_ALIAS = os.getenv('SESSION_CACHE_ALIAS', 'default')
+
 LOGIN_REDIRECT_URL = reverse_lazy('home')
 LOGOUT_REDIRECT_URL = reverse_lazy('home')
 
 FIXTURES_DIR = 'fixtures'
 
+# SQL queries a view may run per request, checked by QueryBudgetMiddleware.
+# Requests over budget are logged, or raise with QUERY_BUDGET_ACTION=raise.
+# A budget is a number or a dict by method, views and methods missing here
+# get QUERY_BUDGET_DEFAULT. None means no budget.
+QUERY_BUDGET_ACTION = os.getenv('QUERY_BUDGET_ACTION', 'log')
+QUERY_BUDGET_DEFAULT = 20
+QUERY_BUDGETS = {
+    'home': 4,
+    'login': {'GET': 4, 'POST': 11},
+    'logout': 4,
+    'users': 6,
+    'create_user': {'GET': 4, 'POST': 4},
+    'autocomplete_users': 5,
+    'update_user': {'GET': 5, 'POST': 7},
+    'delete_user': {'GET': 5, 'POST': 12},
+    'detail_user': 6,
+    'statuses': 6,
+    'create_status': {'GET': 4, 'POST': 6},
+    'autocomplete_statuses': 5,
+    'update_status': {'GET': 5, 'POST': 7},
+    'delete_status': {'GET': 5, 'POST': 7},
+    # Scrapers are let in by address or token, staff by the session.
+    'metrics': 2,
+    'tasks': 7,
+    # Saving a task also writes its search index, sync log and counters.
+    'create_task': {'GET': 4, 'POST': 20},
+    # Per chunk of 500 tasks, reassigning also recounts executors.
+    'bulk_tasks': 24,
+    # Uploads run a fixed number of queries per batch of rows.
+    'import_tasks': {'GET': 4, 'POST': None},
+    'export_tasks': 6,
+    'sync_tasks': 6,
+    'task_events': 2,
+    'update_task': {'GET': 9, 'POST': 22},
+    'delete_task': {'GET': 5, 'POST': 13},
+    'detail_task': 9,
+    'labels': 6,
+    'create_label': {'GET': 4, 'POST': 6},
+    'autocomplete_labels': 5,
+    'update_label': {'GET': 5, 'POST': 7},
+    'delete_label': {'GET': 5, 'POST': 7},
+}
+
+# Keyset pagination of the task list without COUNT(*) and OFFSET. Pages
+# are ordered by creation time, search results lose their ranking.
+TASKS_CURSOR_PAGINATION = str(os.getenv('TASKS_CURSOR_PAGINATION')) == '1'
+
+# Changes of the task sync log younger than this are not handed out yet,
+# transactions committing within it are never skipped by a cursor.
+SYNC_LAG_SECONDS = float(os.getenv('SYNC_LAG_SECONDS', '5'))
+
+# Compile templates, resolve URLs and load catalogs when the WSGI or ASGI
+# application is loaded, and connect workers before they take requests,
+# see task_manager.warmup
+WARMUP = str(os.getenv('WARMUP', '1')) == '1'
+
 ROLLBAR = {
     'access_token': os.getenv('ROLLBAR_ACCESS_TOKEN', 'some_key'),
     'environment': 'development' if DEBUG else 'production',
     'root': BASE_DIR,
 }
 
-rollbar.init(**ROLLBAR)
+# Exceptions of views are sent by a background thread of each worker.
+# SINK is 'rollbar', 'file' (JSON lines written to FILE), 'none' or an
+# import path of a class with send(reports). Without a Rollbar token
+# reports are dropped, Django logs exceptions of requests anyway.
+# Identical exceptions are sent once per DEDUPE_SECONDS, with the number
+# of occurrences.
+ERROR_REPORTING = {
+    'SINK': os.getenv(
+        'ERROR_REPORTING_SINK',
+        'rollbar' if os.getenv('ROLLBAR_ACCESS_TOKEN') else 'none',
+    ),
+    'FILE': os.getenv(
+        'ERROR_REPORTING_FILE', os.path.join(BASE_DIR, 'errors.jsonl'),
+    ),
+    'DEDUPE_SECONDS': 60,
+    'BATCH_SIZE': 20,
+    'FLUSH_SECONDS': 1,
+    'MAX_QUEUE': 1000,
+}
+
+# Task change events streamed to the task pages under ASGI. Pages connect
+# to the stream with STREAM on, set TASK_EVENTS_STREAM=1 when serving
+# task_manager.asgi. BACKEND is 'memory' (one process), 'socket' (unix
+# datagram sockets of SOCKET_DIR, for several workers) or an import path
+# of a Broadcast class. A stream with QUEUE_SIZE events waiting is closed,
+# the browser reconnects.
+TASK_EVENTS = {
+    'STREAM': str(os.getenv('TASK_EVENTS_STREAM')) == '1',
+    'BACKEND': os.getenv('TASK_EVENTS_BACKEND', 'memory'),
+    'SOCKET_DIR': os.getenv(
+        'TASK_EVENTS_SOCKET_DIR',
+        os.path.join(tempfile.gettempdir(), 'task-manager-events'),
+    ),
+    'QUEUE_SIZE': 100,
+    'HEARTBEAT_SECONDS': 15,
+}
+
+# Prometheus metrics are served to clients of ALLOWED_IPS, to requests
+# with the bearer TOKEN and to staff users, others get 403. Set
+# METRICS_ALLOWED_IPS to comma separated addresses of the scrapers.
+METRICS = {
+    'ALLOWED_IPS': frozenset(
+        address.strip()
+        for address in os.getenv('METRICS_ALLOWED_IPS', '').split(',')
+        if address.strip()
+    ),
+    'TOKEN': os.getenv('METRICS_TOKEN', ''),
+}
@@ -0,0 +1,76 @@
+// Load choices of select[data-autocomplete-url] on demand.
+(function () {
+  'use strict';
+
+  var DELAY = 250;
+
+  function setUp(select) {
+    var url = select.getAttribute('data-autocomplete-url');
+    var search = document.createElement('input');
+    var more = document.createElement('a');
+    var state = {query: '', page: 1, timer: null, loaded: false};
+
+    search.type = 'search';
+    search.className = 'form-control form-control-sm mb-1';
+    search.setAttribute('autocomplete', 'off');
+    search.setAttribute('aria-label', select.getAttribute('name'));
+    more.href = '#';
+    more.className = 'small d-none';
+    more.textContent = '…';
+    select.parentNode.insertBefore(search, select);
+    select.parentNode.insertBefore(more, select.nextSibling);
+
+    function keepSelected() {
+      Array.prototype.slice.call(select.options).forEach(function (option) {
+        if (!option.selected && option.value !== '') {
+          select.removeChild(option);
+        }
+      });
+    }
+
+    function load(append) {
+      var params = new URLSearchParams({q: state.query, page: state.page});
+      fetch(url + '?' + params.toString(), {credentials: 'same-origin'})
+        .then(function (response) { return response.json(); })
+        .then(function (data) {
+          if (!append) {
+            keepSelected();
+          }
+          var present = {};
+          Array.prototype.slice.call(select.options).forEach(function (option) {
+            present[option.value] = true;
+          });
+          data.results.forEach(function (choice) {
+            if (!present[String(choice.id)]) {
+              select.appendChild(new Option(choice.text, choice.id));
+            }
+          });
+          more.classList.toggle('d-none', !data.more);
+          state.loaded = true;
+        });
+    }
+
+    search.addEventListener('input', function () {
+      clearTimeout(state.timer);
+      state.timer = setTimeout(function () {
+        state.query = search.value.trim();
+        state.page = 1;
+        load(false);
+      }, DELAY);
+    });
+    select.addEventListener('focus', function () {
+      if (!state.loaded) {
+        load(false);
+      }
+    });
+    more.addEventListener('click', function (event) {
+      event.preventDefault();
+      state.page += 1;
+      load(true);
+    });
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('select[data-autocomplete-url]').forEach(setUp);
+  });
+}());
@@ -0,0 +1,23 @@
+// Show a notice when tasks shown on the page change.
+(function () {
+  'use strict';
+
+  var notice = document.getElementById('task-events');
+  if (!notice || !window.EventSource) {
+    return;
+  }
+  var taskId = Number(notice.getAttribute('data-task-id'));
+  var source = new EventSource(notice.getAttribute('data-url'));
+
+  function show() {
+    notice.classList.remove('d-none');
+  }
+
+  source.addEventListener('tasks', function (message) {
+    var event = JSON.parse(message.data);
+    if (!taskId || event.ids.indexOf(taskId) !== -1) {
+      show();
+    }
+  });
+  source.addEventListener('overflow', show);
+})();
@@ -1,5 +1,6 @@
 from django.urls import path
 from task_manager.statuses.views import (
+    StatusAutocompleteView,
     StatusCreateView,
     StatusDeleteView,
     StatusListView,
@@ -9,6 +10,11 @@ from task_manager.statuses.views import (
 urlpatterns = [
     path('', StatusListView.as_view(), name='statuses'),
     path('create/', StatusCreateView.as_view(), name='create_status'),
+    path(
+        'autocomplete/',
+        StatusAutocompleteView.as_view(),
+        name='autocomplete_statuses',
+    ),
     path('<int:pk>/update/', StatusUpdateView.as_view(), name='update_status'),
     path('<int:pk>/delete/', StatusDeleteView.as_view(), name='delete_status'),
 ]
@@ -10,6 +10,7 @@ from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
 from django.views.generic.edit import CreateView, DeleteView, UpdateView
 from django.views.generic.list import ListView
+from task_manager.autocomplete import AutocompleteView
 from task_manager.statuses.forms import StatusForm
 from task_manager.mixins import CustomLoginRequiredMixin
 from task_manager.statuses.models import Status
@@ -25,6 +26,14 @@ class StatusListView(CustomLoginRequiredMixin, ListView):
     template_name = 'statuses/index.html'
 
 
+class StatusAutocompleteView(AutocompleteView):
+    """Status choices by name prefix."""
+
+    model = Status
+    search_fields = ['name']
+    ordering = ['name']
+
+
 class StatusCreateView(
     CustomLoginRequiredMixin,
     SuccessMessageMixin,
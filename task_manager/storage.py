@@ -0,0 +1,30 @@
+"""
+Storage of collected static files.
+
+collectstatic copies files to STATIC_ROOT under names carrying a hash of
+their content, with gzip and brotli variants next to them, and writes the
+manifest mapping original names to hashed ones. WhiteNoiseMiddleware serves
+hashed names with far-future immutable cache headers and picks the variant
+the client accepts.
+"""
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class StaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """Hashed, precompressed static files."""
+
+    def stored_name(self, name: str) -> str:
+        """
+        Get the hashed name of a file, its own name before collectstatic.
+
+        Without a manifest, as under runserver and in tests, files are
+        served from the app directories by their names. Once collected, a
+        name missing from the manifest raises ValueError.
+        Args:
+            name:
+        Returns:
+            str:
+        """
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
@@ -6,3 +6,16 @@ class TasksConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'task_manager.tasks'
+
+    def ready(self):
+        """Connect signal receivers."""
+        from task_manager import lookup_cache  # noqa: F401, WPS433
+        from task_manager.tasks import (  # noqa: F401, WPS433
+            conditional,
+            counters,
+            events,
+            receivers,
+            row_cache,
+            search,
+            sync,
+        )
@@ -0,0 +1,432 @@
+"""
+Micro-benchmarks of the building blocks of the task list.
+
+Every benchmark is a function run against a seeded dataset: evaluating the
+first page of the list queryset and of TasksFilter for each combination of
+filters, building and rendering TasksForm, rendering tasks/index.html,
+layout.html and the filter_url tags. Like timeit, a function runs in a loop
+long enough to be timed, and the best and median time per call of several
+loops are kept. One more call counts its queries and their time, and one
+runs under tracemalloc for its peak memory and the blocks it leaves
+allocated.
+
+Caches stay warm between calls, as they are between requests. Reports are
+JSON with the commit of the tree, a report saved earlier is the baseline
+another run is compared against.
+"""
+import datetime
+import json
+import statistics
+import time
+import tracemalloc
+from itertools import combinations
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.db import connection
+from django.template import Context, Template
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.utils import translation
+from task_manager.query_budget import QueryRecorder
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.filters import TasksFilter
+from task_manager.tasks.forms import TasksForm
+from task_manager.tasks.loadtest import get_commit
+from task_manager.tasks.models import Tasks
+from task_manager.tasks.row_cache import prepare_rows
+from task_manager.tasks.seeding import Seeder
+from task_manager.tasks.views import TaskListView
+
+FILTER_NAMES = ('status', 'executor', 'label', 'self_tasks', 'q')
+SEARCH = 'report'
+METRICS = ('best_ms', 'peak_kib')
+FILTER_URL_TEMPLATE = (
+    '{% load get_filter_url_label_tags get_filter_url_users_tags %}'
+    '{% for label in labels %}{% filter_url label.id %}{% endfor %}'
+    '{% filter_url_by_user %}{% filter_url_to_user user.id %}'
+)
+
+
+class Fixture(object):
+    """Rows and request the benchmarks run with."""
+
+    def __init__(self, seeder: Seeder):
+        """
+        Init fixture from a seeded dataset.
+        Args:
+            seeder: seeder of the dataset
+        """
+        self.user = get_user_model().objects.get(
+            username=seeder.name('user', 0),
+        )
+        self.status = Status.objects.get(name=seeder.name('status', 0))
+        self.label = Label.objects.filter(
+            name=seeder.name('label', 0),
+        ).first()
+        self.labels = list(Label.objects.filter(
+            name__startswith='{prefix}-'.format(prefix=seeder.prefix),
+        ))
+        self.request = self.get_request()
+
+    def get_request(self, data: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Get a request of the task list by the user.
+        Args:
+            data: query of the request
+        Returns:
+            Any:
+        """
+        request = RequestFactory().get('/tasks/', data or {})
+        request.user = self.user
+        return request
+
+    def filter_data(self, names) -> Dict[str, Any]:
+        """
+        Get the query of a combination of filters.
+        Args:
+            names: names of the filters
+        Returns:
+            Dict:
+        """
+        values = {
+            'status': self.status.pk,
+            'executor': self.user.pk,
+            'label': self.label.pk if self.label else '',
+            'self_tasks': 'on',
+            'q': SEARCH,
+        }
+        return {name: values[name] for name in names}
+
+
+def first_page(queryset) -> list:
+    """
+    Count the queryset and get its first page, as the list view does.
+    Args:
+        queryset:
+    Returns:
+        list:
+    """
+    return list(Paginator(
+        queryset, TaskListView.paginate_by,
+    ).page(1).object_list)
+
+
+def list_queryset(fixture: Fixture) -> Callable:
+    """
+    Get the benchmark of the task list queryset.
+    Args:
+        fixture:
+    Returns:
+        Callable:
+    """
+    return lambda: first_page(TaskListView.queryset.all())
+
+
+def filter_queryset(names) -> Callable:
+    """
+    Get a factory of the benchmark of a combination of filters.
+    Args:
+        names: names of the filters
+    Returns:
+        Callable:
+    """
+    def factory(fixture: Fixture) -> Callable:  # noqa: WPS430
+        request = fixture.get_request(fixture.filter_data(names))
+        return lambda: first_page(TasksFilter(
+            request.GET, queryset=TaskListView.queryset.all(), request=request,
+        ).qs)
+    return factory
+
+
+def build_form(fixture: Fixture) -> Callable:
+    """
+    Get the benchmark of TasksForm instantiation.
+    Args:
+        fixture:
+    Returns:
+        Callable:
+    """
+    return TasksForm
+
+
+def render_form(fixture: Fixture) -> Callable:
+    """
+    Get the benchmark of TasksForm rendering, which builds its choices.
+    Args:
+        fixture:
+    Returns:
+        Callable:
+    """
+    task = Tasks.objects.filter(labels__isnull=False).first()
+    return lambda: TasksForm(instance=task).as_p()
+
+
+def render_index(fixture: Fixture) -> Callable:
+    """
+    Get the benchmark of tasks/index.html of the first page.
+
+    The context comes from the view once, rows of the page are looked up
+    in the row cache on every call as the view does.
+    Args:
+        fixture:
+    Returns:
+        Callable:
+    """
+    response = TaskListView.as_view()(fixture.request)
+    context = response.context_data
+    tasks = context['tasks_list']
+    language = translation.get_language()
+
+    def render():  # noqa: WPS430
+        prepare_rows(tasks, language)
+        return render_to_string('tasks/index.html', context, fixture.request)
+    return render
+
+
+def render_layout(fixture: Fixture) -> Callable:
+    """
+    Get the benchmark of layout.html.
+    Args:
+        fixture:
+    Returns:
+        Callable:
+    """
+    return lambda: render_to_string('layout.html', {}, fixture.request)
+
+
+def render_filter_urls(fixture: Fixture) -> Callable:
+    """
+    Get the benchmark of filter_url tags of every label and a user.
+    Args:
+        fixture:
+    Returns:
+        Callable:
+    """
+    template = Template(FILTER_URL_TEMPLATE)
+    context = Context({'labels': fixture.labels, 'user': fixture.user})
+    return lambda: template.render(context)
+
+
+def get_benchmarks() -> Dict[str, Callable]:
+    """
+    Get factories of benchmarks by name.
+    Returns:
+        Dict:
+    """
+    benchmarks = {'queryset:list': list_queryset}
+    for size in range(1, len(FILTER_NAMES) + 1):
+        for names in combinations(FILTER_NAMES, size):
+            benchmarks['filter:{names}'.format(
+                names='+'.join(names),
+            )] = filter_queryset(names)
+    benchmarks.update({
+        'form:build': build_form,
+        'form:render': render_form,
+        'render:tasks/index.html': render_index,
+        'render:layout.html': render_layout,
+        'render:filter_url': render_filter_urls,
+    })
+    return benchmarks
+
+
+def select(benchmarks: Dict[str, Callable], patterns: List[str]) -> List[str]:
+    """
+    Get names of benchmarks starting with any of the patterns.
+    Args:
+        benchmarks:
+        patterns: prefixes of names, all benchmarks if empty
+    Returns:
+        List:
+    """
+    return [
+        name for name in benchmarks
+        if not patterns or any(name.startswith(prefix) for prefix in patterns)
+    ]
+
+
+def time_loop(function: Callable, number: int) -> float:
+    """
+    Get seconds of number calls.
+    Args:
+        function:
+        number:
+    Returns:
+        float:
+    """
+    began = time.perf_counter()
+    for _index in range(number):
+        function()
+    return time.perf_counter() - began
+
+
+def measure(
+    function: Callable, repeat: int = 5, min_time: float = 0.2,
+) -> Dict[str, Any]:
+    """
+    Time a function and count its memory and queries.
+    Args:
+        function: benchmark taking no arguments
+        repeat: number of timed loops
+        min_time: seconds a loop runs at least
+    Returns:
+        Dict:
+    """
+    function()
+    number = 1
+    elapsed = time_loop(function, number)
+    while elapsed < min_time:
+        number *= 10 if elapsed < min_time / 10 else 2
+        elapsed = time_loop(function, number)
+    timings = [elapsed / number] + [
+        time_loop(function, number) / number for _index in range(repeat - 1)
+    ]
+    queries = QueryRecorder()
+    with connection.execute_wrapper(queries):
+        function()
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    base, _peak = tracemalloc.get_traced_memory()
+    function()
+    _size, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    if not tracing:
+        tracemalloc.stop()
+    return {
+        'number': number,
+        'repeat': repeat,
+        'best_ms': round(min(timings) * 1000, 4),
+        'median_ms': round(statistics.median(timings) * 1000, 4),
+        'queries': queries.count,
+        'sql_ms': round(queries.duration * 1000, 4),
+        'peak_kib': round((peak - base) / 1024, 1),
+        'retained_blocks': sum(
+            stat.count_diff for stat in after.compare_to(before, 'filename')
+        ),
+    }
+
+
+def run_benchmarks(
+    seeder: Seeder,
+    names: List[str],
+    repeat: int = 5,
+    min_time: float = 0.2,
+    progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run benchmarks against a seeded dataset in the default language.
+    Args:
+        seeder: seeder of the dataset
+        names: names of benchmarks to run
+        repeat: number of timed loops
+        min_time: seconds a loop runs at least
+        progress: called with the name and result of every benchmark
+    Returns:
+        Dict:
+    """
+    benchmarks = get_benchmarks()
+    results = {}
+    with translation.override(settings.LANGUAGE_CODE):
+        fixture = Fixture(seeder)
+        for name in names:
+            results[name] = measure(
+                benchmarks[name](fixture), repeat, min_time,
+            )
+            if progress:
+                progress(name, results[name])
+    return results
+
+
+def build_report(
+    results: Dict[str, Dict[str, Any]],
+    config: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Build the report of a run.
+    Args:
+        results: results by benchmark
+        config: options of the run
+    Returns:
+        Dict:
+    """
+    return {
+        'created_at': datetime.datetime.now(
+            datetime.timezone.utc,
+        ).isoformat(),
+        'commit': get_commit(),
+        'config': config,
+        'database': connection.vendor,
+        'tasks_total': Tasks.objects.count(),
+        'benchmarks': results,
+    }
+
+
+def read_report(path: str) -> Dict[str, Any]:
+    """
+    Read a report saved before.
+    Args:
+        path:
+    Returns:
+        Dict:
+    """
+    with open(path) as report_file:
+        return json.load(report_file)
+
+
+def compare(
+    baseline: Dict[str, Any],
+    report: Dict[str, Any],
+    threshold: float,
+) -> List[Dict[str, Any]]:
+    """
+    Compare benchmarks of a report with a baseline.
+
+    A metric regresses when it grew by more than threshold, a share of its
+    baseline value. Benchmarks missing from the baseline are skipped.
+    Args:
+        baseline: report of the baseline
+        report: report of the run
+        threshold: allowed growth, 0.1 for 10%
+    Returns:
+        List: changes of every metric, regressed ones flagged
+    """
+    changes = []
+    for name, result in report['benchmarks'].items():
+        before = baseline['benchmarks'].get(name)
+        if before is None:
+            continue
+        for metric in METRICS:
+            old, new = before[metric], result[metric]
+            change = (new - old) / old if old else 0.0
+            changes.append({
+                'benchmark': name,
+                'metric': metric,
+                'baseline': old,
+                'current': new,
+                'change': round(change, 4),
+                'regressed': change > threshold,
+            })
+    return changes
+
+
+def find_seeder(prefix: str, **options) -> Seeder:
+    """
+    Get the seeder of a benchmark dataset, seeding it the first time.
+
+    A dataset seeded before under the prefix is reused as it is.
+    Args:
+        prefix: prefix of the dataset
+        options: options of Seeder
+    Returns:
+        Seeder:
+    """
+    seeder = Seeder(prefix=prefix, **options)
+    if not seeder.exists():
+        seeder.run()
+    return seeder
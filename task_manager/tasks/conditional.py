@@ -0,0 +1,241 @@
+"""
+Conditional GET of task pages.
+
+Pages are fingerprinted without running their queryset: the task list by
+change stamps and the keys of the requested page, the detail page by
+updated_at of the task. Changes of statuses, labels and users shown on the
+pages set the LOOKUPS stamp, every create, update and deletion of tasks
+sets the TASKS stamp; the receivers at the end of the module set them. The
+page keys are read with one LIMIT query over the primary key, the list is
+never counted or aggregated.
+
+Stamps must be seen by every worker, pages are answered conditionally with
+a shared cache only (SHARED_CACHE).
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
+
+from task_manager.tasks.pagination import paginate_by_cursor
+from task_manager.tasks.signals import tasks_bulk_created, tasks_bulk_updated
+
+LOOKUPS = 'lookups'
+TASKS = 'tasks'
+
+Fingerprint = Tuple[Tuple, datetime]
+
+
+def stamp_key(kind: str) -> str:
+    """
+    Get cache key of a change stamp.
+    Args:
+        kind: LOOKUPS or TASKS
+    Returns:
+        str:
+    """
+    return 'tasks:changed:{kind}'.format(kind=kind)
+
+
+def touch(*kinds: str) -> None:
+    """
+    Record a change now.
+    Args:
+        kinds: LOOKUPS or TASKS
+    """
+    if not settings.SHARED_CACHE:
+        return
+    now = time.time()
+    cache.set_many({stamp_key(kind): now for kind in kinds}, timeout=None)
+
+
+def get_stamps() -> Dict[str, datetime]:
+    """
+    Read change stamps, starting missing ones from now.
+    Returns:
+        Dict:
+    """
+    keys = {kind: stamp_key(kind) for kind in (LOOKUPS, TASKS)}
+    stamps = cache.get_many(keys.values())
+    now = time.time()
+    for key in keys.values():
+        if key not in stamps:
+            cache.add(key, now, timeout=None)
+            stamps[key] = cache.get(key, now)
+    return {
+        kind: datetime.fromtimestamp(stamps[key], timezone.utc)
+        for kind, key in keys.items()
+    }
+
+
+class ConditionalGetMixin(object):
+    """Answer 304 before running the view when the page is unchanged."""
+
+    def get_fingerprint(self) -> Optional[Fingerprint]:
+        """
+        Get values the page depends on and its last change.
+
+        Views override it, without a fingerprint pages are always rendered.
+        Returns:
+            Optional: None to skip the check
+        """
+        return None
+
+    def get(self, request, *args, **kwargs) -> Any:
+        """
+        Return 304 for a matching ETag or Last-Modified.
+
+        Pages with pending messages are always rendered to show them, and
+        every page without a shared cache.
+        Args:
+            request:
+        Returns:
+            Any:
+        """
+        fingerprint = None
+        pending = len(messages.get_messages(request))
+        if settings.SHARED_CACHE and not pending:
+            fingerprint = self.get_fingerprint()
+        if fingerprint is None:
+            return super().get(request, *args, **kwargs)
+        parts, last_modified = fingerprint
+        etag = quote_etag(hashlib.md5(repr((  # noqa: S303
+            request.user.pk, get_language(), request.get_full_path(), parts,
+        )).encode()).hexdigest())
+        timestamp = int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp,
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(timestamp)
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Cookie', 'Accept-Language'))
+        return response
+
+
+class TaskListConditionalMixin(ConditionalGetMixin):
+    """Fingerprint of the filtered task list."""
+
+    def get_fingerprint(self) -> Optional[Fingerprint]:
+        """
+        Combine change stamps with keys of the requested page.
+        Returns:
+            Optional:
+        """
+        filterset = self.get_filterset(self.get_filterset_class())
+        if filterset.is_bound and not filterset.is_valid():
+            return None
+        keys = self.get_page_keys(filterset.qs)
+        if keys is None:
+            return None
+        stamps = get_stamps()
+        parts = (stamps[LOOKUPS], stamps[TASKS], keys)
+        return parts, max(stamps[LOOKUPS], stamps[TASKS])
+
+    def get_page_keys(self, queryset) -> Optional[Tuple[int, ...]]:
+        """
+        Read primary keys of the requested page.
+        Args:
+            queryset: filtered tasks
+        Returns:
+            Optional: None for a page number or cursor to be rendered
+        """
+        page_size = self.get_paginate_by(queryset)
+        if self.use_cursor_pagination():
+            cursor = self.request.GET.get(self.cursor_query_param, '')
+            try:
+                page = paginate_by_cursor(
+                    queryset.select_related(None).only('pk', 'created_at'),
+                    cursor,
+                    page_size,
+                )
+            except ValueError:
+                return None
+            return tuple(row.pk for row in page)
+        try:
+            number = int(self.request.GET.get(self.page_kwarg) or 1)
+        except ValueError:
+            return None
+        if number < 1:
+            return None
+        offset = (number - 1) * page_size
+        keys = queryset.values_list('pk', flat=True)
+        return tuple(keys[offset:offset + page_size])
+
+
+class TaskDetailConditionalMixin(ConditionalGetMixin):
+    """Fingerprint of one task."""
+
+    def get_fingerprint(self) -> Optional[Fingerprint]:
+        """
+        Read updated_at of the task.
+        Returns:
+            Optional:
+        """
+        changed = self.model.objects.filter(
+            pk=self.kwargs[self.pk_url_kwarg],
+        ).values_list('updated_at', flat=True).first()
+        if changed is None:
+            return None
+        lookups = get_stamps()[LOOKUPS]
+        return (changed, lookups), max(changed, lookups)
+
+
+@receiver(post_save, sender='tasks.Tasks')
+def touch_saved_task(sender, instance, created, **kwargs):
+    """
+    Record a new or updated task.
+    Args:
+        sender:
+        instance:
+        created:
+        kwargs:
+    """
+    touch(TASKS)
+
+
+@receiver(post_delete, sender='tasks.Tasks')
+@receiver(tasks_bulk_created)
+@receiver(tasks_bulk_updated)
+def touch_changed_tasks(sender, **kwargs):
+    """
+    Record deletion, bulk creation or bulk update of tasks.
+    Args:
+        sender:
+        kwargs:
+    """
+    touch(TASKS)
+
+
+@receiver(post_save, sender='statuses.Status')
+@receiver(post_delete, sender='statuses.Status')
+@receiver(post_save, sender='labels.Label')
+@receiver(post_delete, sender='labels.Label')
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def touch_lookups(sender, instance, **kwargs):
+    """
+    Record a change of a status, label or user shown on task pages.
+    Args:
+        sender:
+        instance:
+        kwargs:
+    """
+    if kwargs.get('update_fields') == frozenset(('last_login',)):
+        return
+    touch(LOOKUPS)
@@ -0,0 +1,155 @@
+"""
+Per-user task counters.
+
+UserTasksCounter keeps the numbers of tasks created by and assigned to each
+user, so user pages do not count the Tasks table. The receivers below move
+them on every save, deletion and bulk write of tasks. A save knows the
+users stored before it from the loaded row, a bulk update gets them from
+TasksQuerySet.update().
+"""
+from collections import Counter
+
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from task_manager.tasks.models import USER_FIELDS, Tasks, UserTasksCounter
+from task_manager.tasks.signals import tasks_bulk_created, tasks_bulk_updated
+
+
+@receiver(pre_save, sender=Tasks)
+def remember_task_users(sender, instance, **kwargs):
+    """
+    Remember creator and executor stored before a save which can change them.
+
+    Tasks loaded from the database already know them, others are read.
+    Args:
+        sender:
+        instance:
+        kwargs:
+    """
+    previous = None
+    if instance.pk is not None and _saves_users(kwargs['update_fields']):
+        previous = getattr(instance, '_loaded_users', None)
+        if previous is None:
+            previous = sender.objects.filter(pk=instance.pk).values_list(
+                'creator_id', 'executor_id',
+            ).first()
+    instance._previous_users = previous  # noqa: WPS437
+
+
+@receiver(post_save, sender=Tasks)
+def count_saved_task(sender, instance, **kwargs):
+    """
+    Move task counters to the saved creator and executor.
+    Args:
+        sender:
+        instance:
+        kwargs:
+    """
+    if not _saves_users(kwargs['update_fields']):
+        return
+    created, assigned = Counter(), Counter()
+    previous = getattr(instance, '_previous_users', None)
+    if previous is not None:
+        created[previous[0]] -= 1
+        assigned[previous[1]] -= 1
+    created[instance.creator_id] += 1
+    assigned[instance.executor_id] += 1
+    instance._loaded_users = (  # noqa: WPS437
+        instance.creator_id, instance.executor_id,
+    )
+    for user_id in set(created) | set(assigned):
+        UserTasksCounter.objects.adjust(
+            user_id,
+            created=created[user_id],
+            assigned=assigned[user_id],
+        )
+
+
+@receiver(post_delete, sender=Tasks)
+def count_deleted_task(sender, instance, **kwargs):
+    """
+    Drop deleted task from counters.
+    Args:
+        sender:
+        instance:
+        kwargs:
+    """
+    if instance.creator_id == instance.executor_id:
+        UserTasksCounter.objects.adjust(
+            instance.creator_id, created=-1, assigned=-1,
+        )
+        return
+    UserTasksCounter.objects.adjust(instance.creator_id, created=-1)
+    UserTasksCounter.objects.adjust(instance.executor_id, assigned=-1)
+
+
+@receiver(tasks_bulk_created)
+def count_bulk_created_tasks(sender, objs, **kwargs):
+    """
+    Recount users of bulk inserted tasks.
+    Args:
+        sender:
+        objs:
+        kwargs:
+    """
+    user_ids = set()
+    for task in objs:
+        user_ids.update((task.creator_id, task.executor_id))
+    UserTasksCounter.objects.refresh(user_ids)
+
+
+@receiver(tasks_bulk_updated)
+def count_bulk_updated_tasks(sender, pks, values, user_ids, **kwargs):
+    """
+    Recount previous and new users of bulk updated tasks.
+    Args:
+        sender:
+        pks:
+        values:
+        user_ids:
+        kwargs:
+    """
+    fields = USER_FIELDS & values.keys()
+    if not fields:
+        return
+    users = set(user_ids)
+    for field in fields:
+        new_value = values[field]
+        if isinstance(new_value, Model):
+            new_value = new_value.pk
+        if new_value is not None and not isinstance(new_value, int):
+            users.update(_stored_users(sender, pks))
+            break
+        users.add(new_value)
+    UserTasksCounter.objects.refresh(users)
+
+
+def _saves_users(update_fields) -> bool:
+    """
+    Check a save can change creator or executor.
+    Args:
+        update_fields: fields passed to save(), None for all
+    Returns:
+        bool:
+    """
+    return update_fields is None or bool(USER_FIELDS & update_fields)
+
+
+def _stored_users(model, pks, chunk_size=500):
+    """
+    Read creators and executors of tasks in chunks.
+    Args:
+        model:
+        pks:
+        chunk_size:
+    Yields:
+        int:
+    """
+    for start in range(0, len(pks), chunk_size):
+        rows = model.objects.filter(
+            pk__in=pks[start:start + chunk_size],
+        ).values_list('creator_id', 'executor_id')
+        for creator_id, executor_id in rows:
+            yield creator_id
+            yield executor_id
@@ -0,0 +1,542 @@
+"""
+Server-sent events of task changes.
+
+The receivers below publish() send an event once a change of tasks is
+committed. An ASGI worker keeps the open streams of its process as queues
+of its event loop and fans events out to them, so an idle connection costs
+a queue and no thread. Events reach streams through a broadcast backend:
+MemoryBroadcast within one process, SocketBroadcast over unix datagram
+sockets of a shared directory between workers.
+
+EventsRouter serves the stream in front of the Django ASGI application.
+Task pages connect to it only with TASK_EVENTS['STREAM'] on. Under WSGI
+the task_events view answers 204, which tells EventSource not to
+reconnect.
+"""
+import asyncio
+import glob
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from http.cookies import SimpleCookie
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Set
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.db import close_old_connections, router, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from task_manager.tasks.signals import (
+    created_pks,
+    tasks_bulk_created,
+    tasks_bulk_updated,
+)
+
+logger = logging.getLogger(__name__)
+
+CREATED = 'created'
+UPDATED = 'updated'
+DELETED = 'deleted'
+IDS_PER_EVENT = 500
+DATAGRAM_SIZE = 65536
+TASKS = 'tasks.Tasks'
+
+
+class Subscriber(object):
+    """Events waiting to be sent to one stream."""
+
+    def __init__(self, loop, maxsize: int):
+        """
+        Init subscriber.
+        Args:
+            loop: event loop of the stream
+            maxsize: events waiting before the stream is dropped
+        """
+        self.loop = loop
+        self.maxsize = maxsize
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.overflowed = False
+
+    def put(self, event: Dict[str, Any]):
+        """
+        Queue an event, called in the loop of the stream.
+
+        A stream too slow to keep up gets None and is closed, the client
+        reconnects and reloads.
+        Args:
+            event:
+        """
+        if self.overflowed:
+            return
+        if self.queue.qsize() >= self.maxsize:
+            self.overflowed = True
+            self.queue.put_nowait(None)
+            return
+        self.queue.put_nowait(event)
+
+
+class Broadcast(ABC):
+    """Fan events out to the streams of this process."""
+
+    def __init__(self, queue_size: int = 100):
+        """
+        Init broadcast.
+        Args:
+            queue_size: events waiting per stream
+        """
+        self.queue_size = queue_size
+        self.subscribers: Set[Subscriber] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> Subscriber:
+        """
+        Start receiving events, called in the loop of the stream.
+        Returns:
+            Subscriber:
+        """
+        subscriber = Subscriber(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        """
+        Stop receiving events.
+        Args:
+            subscriber:
+        """
+        with self._lock:
+            self.subscribers.discard(subscriber)
+
+    def deliver(self, event: Dict[str, Any]):
+        """
+        Hand an event to every stream of this process, from any thread.
+        Args:
+            event:
+        """
+        with self._lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.put, event)
+            except RuntimeError:
+                self.unsubscribe(subscriber)
+
+    @abstractmethod
+    def publish(self, event: Dict[str, Any]):
+        """
+        Send an event to every stream.
+        Args:
+            event:
+        """
+
+
+class MemoryBroadcast(Broadcast):
+    """Events of one process."""
+
+    def publish(self, event: Dict[str, Any]):
+        """
+        Deliver an event to the streams of this process.
+        Args:
+            event:
+        """
+        self.deliver(event)
+
+
+class SocketBroadcast(Broadcast):
+    """
+    Events of every worker sharing a directory.
+
+    A worker with open streams binds a datagram socket in the directory.
+    Publishing sends the event to every socket there, sockets of exited
+    workers are removed on the way. The publisher gets its own event back
+    through its socket like the others.
+    """
+
+    def __init__(self, directory: str, queue_size: int = 100):
+        """
+        Init broadcast.
+        Args:
+            directory: directory of the sockets
+            queue_size: events waiting per stream
+        """
+        super().__init__(queue_size)
+        self.directory = directory
+        self.path: Optional[str] = None
+        self._receiver: Optional[socket.socket] = None
+        self._sender: Optional[socket.socket] = None
+        self._sender_pid: Optional[int] = None
+        self._pid: Optional[int] = None
+        self._loop = None
+
+    def subscribe(self) -> Subscriber:
+        """
+        Start receiving events, binding the socket of this process first.
+        Returns:
+            Subscriber:
+        """
+        subscriber = super().subscribe()
+        if self._pid != os.getpid():
+            self.listen(subscriber.loop)
+        return subscriber
+
+    def listen(self, loop):
+        """
+        Bind the socket of this process and read it in the loop.
+        Args:
+            loop: event loop of the streams
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, '{pid}-{token}.sock'.format(
+            pid=os.getpid(), token=uuid.uuid4().hex[:8],
+        ))
+        self._receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._receiver.bind(self.path)
+        self._receiver.setblocking(False)
+        loop.add_reader(self._receiver.fileno(), self.read)
+        self._loop = loop
+        self._pid = os.getpid()
+
+    def read(self):
+        """Deliver every datagram waiting on the socket."""
+        while True:  # noqa: WPS457
+            try:
+                datagram = self._receiver.recv(DATAGRAM_SIZE)
+            except BlockingIOError:
+                return
+            self.deliver(json.loads(datagram))
+
+    def publish(self, event: Dict[str, Any]):
+        """
+        Send an event to the socket of every worker.
+        Args:
+            event:
+        """
+        if self._sender_pid != os.getpid():
+            self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._sender.setblocking(False)
+            self._sender_pid = os.getpid()
+        datagram = json.dumps(event).encode()
+        for path in glob.glob(os.path.join(self.directory, '*.sock')):
+            try:
+                self._sender.sendto(datagram, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                _remove(path)
+            except BlockingIOError:
+                logger.warning('Dropped a task event, %s is full', path)
+
+    def close(self):
+        """Stop reading and remove the socket of this process."""
+        if self._receiver is None:
+            return
+        if not self._loop.is_closed():
+            self._loop.remove_reader(self._receiver.fileno())
+        self._receiver.close()
+        _remove(self.path)
+        self._receiver = None
+        self._pid = None
+
+
+def _remove(path: str):
+    """
+    Remove a socket left by an exited worker.
+    Args:
+        path:
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return
+
+
+def build_broadcast(config: Dict[str, Any]) -> Broadcast:
+    """
+    Build the broadcast of TASK_EVENTS.
+    Args:
+        config: TASK_EVENTS setting
+    Returns:
+        Broadcast:
+    """
+    backend = config.get('BACKEND', 'memory')
+    queue_size = config.get('QUEUE_SIZE', 100)
+    if backend == 'memory':
+        return MemoryBroadcast(queue_size)
+    if backend == 'socket':
+        return SocketBroadcast(config['SOCKET_DIR'], queue_size)
+    return import_string(backend)(queue_size=queue_size)
+
+
+class TaskEventsContextMixin(object):
+    """Tell a task page whether to connect to the events stream."""
+
+    def get_context_data(self, **kwargs) -> Dict[str, Any]:
+        """
+        Add task_events, true when the stream is served.
+        Args:
+            kwargs:
+        Returns:
+            Dict:
+        """
+        context = super().get_context_data(**kwargs)
+        context['task_events'] = getattr(
+            settings, 'TASK_EVENTS', {},
+        ).get('STREAM', False)
+        return context
+
+
+_broadcast: Optional[Broadcast] = None
+_broadcast_lock = threading.Lock()
+
+
+def get_broadcast() -> Broadcast:
+    """
+    Get the broadcast configured by TASK_EVENTS.
+    Returns:
+        Broadcast:
+    """
+    global _broadcast  # noqa: WPS420
+    if _broadcast is None:
+        with _broadcast_lock:
+            if _broadcast is None:
+                _broadcast = build_broadcast(  # noqa: WPS122, WPS442
+                    getattr(settings, 'TASK_EVENTS', {}),
+                )
+    return _broadcast
+
+
+def publish(action: str, pks: List[int], using: Optional[str] = None):
+    """
+    Publish a change of tasks when the transaction commits.
+    Args:
+        action: CREATED, UPDATED or DELETED
+        pks: changed tasks
+        using: database of the transaction
+    """
+    pks = [pk for pk in pks if pk is not None]
+
+    def send():  # noqa: WPS430
+        for start in range(0, len(pks), IDS_PER_EVENT):
+            event = {'action': action, 'ids': pks[start:start + IDS_PER_EVENT]}
+            try:
+                get_broadcast().publish(event)
+            except Exception:  # noqa: B902
+                logger.exception('Failed to publish a task event')
+
+    if pks:
+        transaction.on_commit(send, using=using)
+
+
+@receiver(post_save, sender=TASKS)
+def publish_saved_task(sender, instance, created, using, **kwargs):
+    """
+    Publish a created or updated task.
+    Args:
+        sender:
+        instance:
+        created:
+        using:
+        kwargs:
+    """
+    action = CREATED if created else UPDATED
+    publish(action, [instance.pk], using)
+
+
+@receiver(post_delete, sender=TASKS)
+def publish_deleted_task(sender, instance, using, **kwargs):
+    """
+    Publish a deleted task.
+    Args:
+        sender:
+        instance:
+        using:
+        kwargs:
+    """
+    publish(DELETED, [instance.pk], using)
+
+
+@receiver(tasks_bulk_created)
+def publish_bulk_created_tasks(sender, objs, **kwargs):
+    """
+    Publish bulk inserted tasks.
+    Args:
+        sender:
+        objs:
+        kwargs:
+    """
+    publish(CREATED, created_pks(sender, objs), router.db_for_write(sender))
+
+
+@receiver(tasks_bulk_updated)
+def publish_bulk_updated_tasks(sender, pks, **kwargs):
+    """
+    Publish bulk updated tasks, label changes included.
+    Args:
+        sender:
+        pks:
+        kwargs:
+    """
+    publish(UPDATED, pks, router.db_for_write(sender))
+
+
+def format_event(event: Optional[Dict[str, Any]]) -> bytes:
+    """
+    Encode an event for the stream, None is an overflow.
+    Args:
+        event:
+    Returns:
+        bytes:
+    """
+    if event is None:
+        return b'event: overflow\ndata: {}\n\n'
+    return 'event: tasks\ndata: {data}\n\n'.format(
+        data=json.dumps(event),
+    ).encode()
+
+
+def get_user_id(headers: List) -> Optional[int]:
+    """
+    Get the user of the session cookie.
+    Args:
+        headers: ASGI headers of the request
+    Returns:
+        Optional:
+    """
+    cookies = SimpleCookie()
+    for name, header in headers:
+        if name == b'cookie':
+            cookies.load(header.decode('latin-1'))
+    morsel = cookies.get(settings.SESSION_COOKIE_NAME)
+    if morsel is None:
+        return None
+    engine = import_string(
+        '{module}.SessionStore'.format(module=settings.SESSION_ENGINE),
+    )
+    try:
+        user = auth.get_user(SimpleNamespace(session=engine(morsel.value)))
+    finally:
+        close_old_connections()
+    return user.pk if user.is_authenticated else None
+
+
+async def stream(scope, receive, send):
+    """
+    Stream task events until the client disconnects.
+    Args:
+        scope:
+        receive:
+        send:
+    """
+    user_id = await sync_to_async(get_user_id)(scope.get('headers', []))
+    if user_id is None:
+        await send({'type': 'http.response.start', 'status': 403})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+    config = getattr(settings, 'TASK_EVENTS', {})
+    heartbeat = config.get('HEARTBEAT_SECONDS', 15)
+    broadcast = get_broadcast()
+    subscriber = broadcast.subscribe()
+    disconnected = asyncio.ensure_future(_wait_disconnect(receive))
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': b'retry: 5000\n\n',
+            'more_body': True,
+        })
+        await _send_events(subscriber, disconnected, send, heartbeat)
+    finally:
+        broadcast.unsubscribe(subscriber)
+        disconnected.cancel()
+
+
+async def _send_events(subscriber, disconnected, send, heartbeat):
+    """
+    Send queued events and heartbeats.
+    Args:
+        subscriber:
+        disconnected: future done when the client goes away
+        send:
+        heartbeat: seconds between comments keeping the connection open
+    """
+    while True:  # noqa: WPS457
+        getter = asyncio.ensure_future(subscriber.queue.get())
+        done, _pending = await asyncio.wait(
+            {getter, disconnected},
+            timeout=heartbeat,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        if getter not in done:
+            getter.cancel()
+            if disconnected in done:
+                return
+            await send({
+                'type': 'http.response.body',
+                'body': b': ping\n\n',
+                'more_body': True,
+            })
+            continue
+        event = getter.result()
+        await send({
+            'type': 'http.response.body',
+            'body': format_event(event),
+            'more_body': event is not None,
+        })
+        if event is None:
+            return
+
+
+async def _wait_disconnect(receive):
+    """
+    Wait until the client closes the connection.
+    Args:
+        receive:
+    """
+    while True:  # noqa: WPS457
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+class EventsRouter(object):
+    """Serve the task_events url as a stream, the rest with Django."""
+
+    def __init__(self, application):
+        """
+        Init router.
+        Args:
+            application: Django ASGI application
+        """
+        self.application = application
+        self._path: Optional[str] = None
+
+    async def __call__(self, scope, receive, send):
+        """
+        Route a connection.
+        Args:
+            scope:
+            receive:
+            send:
+        """
+        if self._path is None:
+            self._path = reverse('task_events')
+        if scope['type'] == 'http' and scope['path'] == self._path:
+            if scope['method'] == 'GET':
+                await stream(scope, receive, send)
+                return
+        await self.application(scope, receive, send)
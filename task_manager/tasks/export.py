@@ -0,0 +1,163 @@
+"""
+Streaming export of tasks.
+
+Rows are read with QuerySet.iterator(), which uses a server-side cursor on
+PostgreSQL, as plain tuples instead of model instances. Labels are fetched
+with one query per chunk of rows, so memory does not grow with the export.
+"""
+import csv
+import json
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from task_manager.tasks.models import TaskLabelRelated
+
+CSV = 'csv'
+NDJSON = 'ndjson'
+CONTENT_TYPES = {
+    CSV: 'text/csv; charset=utf-8',
+    NDJSON: 'application/x-ndjson; charset=utf-8',
+}
+COLUMNS = (
+    'id',
+    'name',
+    'description',
+    'status',
+    'creator',
+    'executor',
+    'labels',
+    'created_at',
+)
+_SELECTED = (
+    'id',
+    'name',
+    'description',
+    'status__name',
+    'creator__first_name',
+    'creator__last_name',
+    'executor__first_name',
+    'executor__last_name',
+    'created_at',
+)
+
+
+class _Echo(object):
+    """File-like object returning what is written to it."""
+
+    def write(self, line: str) -> str:
+        """
+        Return the written line.
+        Args:
+            line:
+        Returns:
+            str:
+        """
+        return line
+
+
+def _full_name(first_name, last_name) -> str:
+    """
+    Build user name the way CustomUser.get_full_name() does.
+    Args:
+        first_name:
+        last_name:
+    Returns:
+        str:
+    """
+    if first_name is None:
+        return ''
+    return '{first} {last}'.format(first=first_name, last=last_name).strip()
+
+
+def _labels_of(pks: List[int]) -> Dict[int, List[str]]:
+    """
+    Get label names of tasks with one query.
+    Args:
+        pks: primary keys of tasks
+    Returns:
+        Dict:
+    """
+    labels = {}
+    rows = TaskLabelRelated.objects.filter(task_id__in=pks).order_by(
+        'task_id', 'label__name',
+    ).values_list('task_id', 'label__name')
+    for task_id, name in rows:
+        labels.setdefault(task_id, []).append(name)
+    return labels
+
+
+def iter_tasks(queryset, chunk_size: int = 2000) -> Iterator[List[Dict]]:
+    """
+    Read tasks in chunks of plain dicts.
+    Args:
+        queryset: tasks to export
+        chunk_size: rows fetched from the cursor at once
+    Yields:
+        List:
+    """
+    rows = queryset.values_list(*_SELECTED).iterator(chunk_size=chunk_size)
+    while True:
+        chunk: List[Tuple] = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        labels = _labels_of([row[0] for row in chunk])
+        yield [
+            {
+                'id': row[0],
+                'name': row[1],
+                'description': row[2],
+                'status': row[3],
+                'creator': _full_name(row[4], row[5]),
+                'executor': _full_name(row[6], row[7]),
+                'labels': labels.get(row[0], []),
+                'created_at': row[8],
+            } for row in chunk
+        ]
+
+
+def stream_csv(chunks: Iterable[List[Dict]]) -> Iterator[str]:
+    """
+    Render chunks of tasks as CSV, header first.
+    Args:
+        chunks: chunks made by iter_tasks()
+    Yields:
+        str:
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    for chunk in chunks:
+        yield ''.join(writer.writerow(_csv_row(task)) for task in chunk)
+
+
+def _csv_row(task: Dict) -> List:
+    """
+    Flatten a task into CSV cells.
+    Args:
+        task:
+    Returns:
+        List:
+    """
+    row = dict(task)
+    row['labels'] = ', '.join(task['labels'])
+    row['created_at'] = task['created_at'].isoformat()
+    return [row[column] for column in COLUMNS]
+
+
+def stream_ndjson(chunks: Iterable[List[Dict]]) -> Iterator[str]:
+    """
+    Render chunks of tasks as newline delimited JSON.
+    Args:
+        chunks: chunks made by iter_tasks()
+    Yields:
+        str:
+    """
+    for chunk in chunks:
+        yield ''.join(
+            '{line}\n'.format(line=json.dumps(
+                task, cls=DjangoJSONEncoder, ensure_ascii=False,
+            )) for task in chunk
+        )
+
+
+RENDERERS = {CSV: stream_csv, NDJSON: stream_ndjson}
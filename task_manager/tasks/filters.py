@@ -2,18 +2,59 @@ from typing import Any
 
 import django_filters
 from django import forms
+from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
+from task_manager.autocomplete import AutocompleteSelect
 from task_manager.labels.models import Label
+from task_manager.lookup_cache import CachedChoiceMixin
+from task_manager.statuses.models import Status
 from task_manager.tasks.models import Tasks
+from task_manager.tasks.search import search_tasks
+
+
+class CachedModelChoiceField(
+    CachedChoiceMixin,
+    django_filters.fields.ModelChoiceField,
+):
+    """Filter field of a lookup model validated against the cache."""
+
+    def to_python(self, value) -> Any:
+        """
+        Get the row of the value from the cache.
+        Args:
+            value:
+        Returns:
+            Any:
+        """
+        if value in self.empty_values:
+            return None
+        return self.get_row(value)
+
+
+class CachedModelChoiceFilter(django_filters.ModelChoiceFilter):
+    """ModelChoiceFilter of a lookup model."""
+
+    field_class = CachedModelChoiceField
 
 
 class TasksFilter(django_filters.FilterSet):
     """Tasks filter."""
 
-    label = django_filters.ModelChoiceFilter(
+    status = CachedModelChoiceFilter(
+        label=_('Status'),
+        queryset=Status.objects.all(),
+        widget=AutocompleteSelect('autocomplete_statuses'),
+    )
+    executor = django_filters.ModelChoiceFilter(
+        label=_('TaskExecutor'),
+        queryset=get_user_model().objects.all(),
+        widget=AutocompleteSelect('autocomplete_users'),
+    )
+    label = CachedModelChoiceFilter(
         field_name='labels',
         label=_('FilterLabels'),
         queryset=Label.objects.all(),
+        widget=AutocompleteSelect('autocomplete_labels'),
     )
     self_tasks = django_filters.BooleanFilter(
         field_name='creator',
@@ -21,6 +62,10 @@ class TasksFilter(django_filters.FilterSet):
         method='creator_tasks_filter',
         widget=forms.CheckboxInput,
     )
+    q = django_filters.CharFilter(
+        label=_('FilterSearch'),
+        method='search_filter',
+    )
 
     def creator_tasks_filter(self, queryset, name, value) -> Any:
         """
@@ -37,6 +82,19 @@ class TasksFilter(django_filters.FilterSet):
             return queryset.filter(creator=self.request.user)
         return queryset
 
+    def search_filter(self, queryset, name, value) -> Any:
+        """
+        Custom filter. Full-text search by task name and description.
+        Args:
+            queryset:
+            name:
+            value:
+        Returns:
+            Any:
+        """
+
+        return search_tasks(queryset, value)
+
     class Meta(object):
         """Meta information."""
 
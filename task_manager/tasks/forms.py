@@ -1,12 +1,228 @@
+import io
+from typing import Any, Dict, List
+
 from django import forms
-from task_manager.tasks.models import Tasks
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from task_manager.autocomplete import (
+    AutocompleteSelect,
+    AutocompleteSelectMultiple,
+)
+from task_manager.labels.models import Label
+from task_manager.lookup_cache import (
+    CachedModelChoiceField,
+    CachedModelMultipleChoiceField,
+)
+from task_manager.statuses.models import Status
+from task_manager.tasks.importer import (
+    ImportResult,
+    TaskImporter,
+    guess_format,
+    read_rows,
+)
+from task_manager.tasks.models import TaskLabelRelated, Tasks
 
 
 class TasksForm(forms.ModelForm):
     """Status form."""
 
+    def save(self, commit: bool = True) -> Tasks:
+        """
+        Save the task and its labels in one transaction.
+        Args:
+            commit: whether to save to the database
+        Returns:
+            Tasks:
+        """
+        self.new_task = self.instance._state.adding  # noqa: WPS437
+        if not commit:
+            return super().save(commit=False)
+        with transaction.atomic():
+            return super().save()
+
+    def _save_m2m(self):  # noqa: WPS120
+        """
+        Write labels to the through table without m2m_changed.
+
+        The saved task is already logged, published and expired by its
+        post_save receivers, labels.set() would do it all again for the
+        same task through touch_relabeled_tasks.
+        """
+        task = self.instance
+        wanted = {label.pk for label in self.cleaned_data['labels']}
+        related = TaskLabelRelated.objects.filter(task=task)
+        stored = set()
+        if not self.new_task:
+            stored = set(related.values_list('label_id', flat=True))
+        if stored - wanted:
+            related.filter(label_id__in=stored - wanted).delete()
+        TaskLabelRelated.objects.bulk_create([
+            TaskLabelRelated(task=task, label_id=label_id)
+            for label_id in wanted - stored
+        ])
+        getattr(task, '_prefetched_objects_cache', {}).pop('labels', None)
+
+    def _get_validation_exclusions(self) -> List[str]:  # noqa: WPS120
+        """
+        Skip the query of ForeignKey.validate for the status.
+
+        The status field has already found the row in the lookup cache.
+        Returns:
+            List:
+        """
+        exclusions = super()._get_validation_exclusions()
+        exclusions.append('status')
+        return exclusions
+
     class Meta(object):
         """Meta information."""
 
         model = Tasks
         fields = ['name', 'description', 'status', 'executor', 'labels']
+        widgets = {
+            'status': AutocompleteSelect('autocomplete_statuses'),
+            'executor': AutocompleteSelect('autocomplete_users'),
+            'labels': AutocompleteSelectMultiple('autocomplete_labels'),
+        }
+        field_classes = {
+            'status': CachedModelChoiceField,
+            'labels': CachedModelMultipleChoiceField,
+        }
+
+
+class TasksBulkActionForm(forms.Form):
+    """Change status, executor or labels of many tasks at once."""
+
+    SET_STATUS = 'set_status'
+    SET_EXECUTOR = 'set_executor'
+    ADD_LABELS = 'add_labels'
+    REMOVE_LABELS = 'remove_labels'
+    chunk_size = 500
+
+    action = forms.ChoiceField(
+        label=_('BulkAction'),
+        choices=[
+            (SET_STATUS, _('BulkActionSetStatus')),
+            (SET_EXECUTOR, _('BulkActionSetExecutor')),
+            (ADD_LABELS, _('BulkActionAddLabels')),
+            (REMOVE_LABELS, _('BulkActionRemoveLabels')),
+        ],
+    )
+    tasks = forms.ModelMultipleChoiceField(
+        queryset=Tasks.objects.only('pk'),
+        required=False,
+        widget=forms.MultipleHiddenInput,
+    )
+    select_all = forms.BooleanField(
+        label=_('BulkSelectAll'),
+        required=False,
+    )
+    status = CachedModelChoiceField(
+        label=_('Status'),
+        queryset=Status.objects.all(),
+        required=False,
+        widget=AutocompleteSelect('autocomplete_statuses'),
+    )
+    executor = forms.ModelChoiceField(
+        label=_('TaskExecutor'),
+        queryset=get_user_model().objects.all(),
+        required=False,
+        widget=AutocompleteSelect('autocomplete_users'),
+    )
+    labels = CachedModelMultipleChoiceField(
+        label=_('Labels'),
+        queryset=Label.objects.all(),
+        required=False,
+        widget=AutocompleteSelectMultiple('autocomplete_labels'),
+    )
+
+    def clean(self) -> Dict[str, Any]:
+        """
+        Check the chosen action has its value and some tasks are chosen.
+        Returns:
+            Dict:
+        """
+        cleaned_data = super().clean()
+        action = cleaned_data.get('action')
+        if action == self.SET_STATUS and not cleaned_data.get('status'):
+            self.add_error('status', _('ThisFieldCannotBeBlank'))
+        if action in {self.ADD_LABELS, self.REMOVE_LABELS}:
+            if not cleaned_data.get('labels'):
+                self.add_error('labels', _('ThisFieldCannotBeBlank'))
+        if not cleaned_data.get('tasks') and not cleaned_data.get(
+            'select_all',
+        ):
+            raise forms.ValidationError(_('ErrorBulkNoTasks'))
+        return cleaned_data
+
+    def save(self, queryset) -> int:
+        """
+        Apply the action to tasks in one transaction.
+
+        Tasks are processed in chunks of primary keys so that neither
+        the UPDATE nor the label queries grow with the selection.
+        Args:
+            queryset: tasks to change
+        Returns:
+            int:
+        """
+        pks = list(queryset.order_by().values_list('pk', flat=True))
+        with transaction.atomic():
+            for start in range(0, len(pks), self.chunk_size):
+                chunk = pks[start:start + self.chunk_size]
+                self.apply(Tasks.objects.filter(pk__in=chunk))
+        return len(pks)
+
+    def apply(self, tasks):
+        """
+        Apply the action to a chunk of tasks.
+        Args:
+            tasks: tasks of the chunk
+        """
+        action = self.cleaned_data['action']
+        if action == self.SET_STATUS:
+            tasks.update(status=self.cleaned_data['status'])
+        elif action == self.SET_EXECUTOR:
+            tasks.update(executor=self.cleaned_data['executor'])
+        elif action == self.ADD_LABELS:
+            tasks.add_labels(self.cleaned_data['labels'])
+        else:
+            tasks.remove_labels(self.cleaned_data['labels'])
+
+
+class TasksImportForm(forms.Form):
+    """Upload of a file with tasks."""
+
+    file = forms.FileField(
+        label=_('ImportFile'),
+        help_text=_('HelpImportFile'),
+    )
+
+    def clean_file(self) -> Any:
+        """
+        Check the file format is known.
+        Returns:
+            Any:
+        Raises:
+            ValidationError: if the extension is unknown
+        """
+        upload = self.cleaned_data['file']
+        try:
+            self.file_format = guess_format(upload.name)
+        except ValueError as error:
+            raise forms.ValidationError(str(error))
+        return upload
+
+    def save(self, creator) -> ImportResult:
+        """
+        Import tasks of the uploaded file.
+        Args:
+            creator: creator of every task, creators of rows are ignored
+        Returns:
+            ImportResult:
+        """
+        stream = io.TextIOWrapper(
+            self.cleaned_data['file'].file, encoding='utf-8-sig', newline='',
+        )
+        return TaskImporter(creator).run(read_rows(stream, self.file_format))
@@ -0,0 +1,319 @@
+"""
+Bulk import of tasks from CSV, JSON or NDJSON.
+
+Status, label and user names are resolved to ids with one query per batch
+and kept for the following batches. Tasks and their labels are inserted
+with bulk_create, one transaction per batch. Invalid rows are reported and
+skipped, they do not abort the batch.
+"""
+import csv
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext as _
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import TaskLabelRelated, Tasks
+
+CSV = 'csv'
+JSON = 'json'
+NDJSON = 'ndjson'
+FORMATS = (CSV, JSON, NDJSON)
+
+Row = Tuple[int, Optional[Dict[str, Any]]]
+
+
+def guess_format(file_name: str) -> str:
+    """
+    Get format from the file extension.
+    Args:
+        file_name:
+    Returns:
+        str:
+    Raises:
+        ValueError: if the extension is unknown
+    """
+    extension = file_name.rsplit('.', 1)[-1].lower()
+    if extension == 'jsonl':
+        extension = NDJSON
+    if extension not in FORMATS:
+        raise ValueError(_('ImportErrorUnknownFormat'))
+    return extension
+
+
+def read_rows(stream, file_format: str) -> Iterator[Row]:
+    """
+    Read rows with their line numbers, None marks a malformed row.
+
+    CSV and NDJSON are read lazily, JSON must be an array of objects.
+    Args:
+        stream: text stream
+        file_format: CSV, JSON or NDJSON
+    Yields:
+        Tuple:
+    """
+    if file_format == CSV:
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif file_format == NDJSON:
+        for line_number, line in enumerate(stream, start=1):
+            if line.strip():
+                yield line_number, _load_object(line)
+    else:
+        try:
+            rows = json.load(stream)
+        except ValueError:
+            rows = None
+        if not isinstance(rows, list):
+            yield 1, None
+            return
+        for index, row in enumerate(rows, start=1):
+            yield index, row if isinstance(row, dict) else None
+
+
+def _load_object(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse one NDJSON line.
+    Args:
+        line:
+    Returns:
+        Optional:
+    """
+    try:
+        row = json.loads(line)
+    except ValueError:
+        return None
+    return row if isinstance(row, dict) else None
+
+
+def normalize_labels(labels) -> Optional[List[str]]:
+    """
+    Get label names of a list or of a string separated by commas.
+    Args:
+        labels: labels of a parsed row
+    Returns:
+        Optional: None for labels of another type
+    """
+    if not labels:
+        return []
+    if isinstance(labels, str):
+        labels = labels.split(',')
+    elif not isinstance(labels, list):
+        return None
+    if not all(isinstance(label, str) for label in labels):
+        return None
+    return [label.strip() for label in labels if label.strip()]
+
+
+class ImportResult(object):
+    """Number of created tasks and errors of skipped rows."""
+
+    def __init__(self):
+        """Init result."""
+        self.created = 0
+        self.errors: List[Tuple[int, str]] = []
+
+
+class TaskImporter(object):
+    """
+    Create tasks from rows of names.
+
+    Every task is created by creator. The creator column of rows is read
+    only with row_creators, which the import command sets: the creator of
+    a task may delete it, a user uploading a file creates tasks as itself.
+    """
+
+    max_name_length = Tasks.max_name_field_length
+
+    def __init__(
+        self, creator, batch_size: int = 500, row_creators: bool = False,
+    ):
+        """
+        Init importer.
+        Args:
+            creator: creator of the tasks, of rows without one with
+                row_creators
+            batch_size: rows per transaction
+            row_creators: whether rows may name their creator
+        """
+        self.creator = creator
+        self.batch_size = batch_size
+        self.row_creators = row_creators
+        self.result = ImportResult()
+        self.seen_names = set()
+        self.statuses: Dict[str, Optional[int]] = {}
+        self.labels: Dict[str, Optional[int]] = {}
+        self.users: Dict[str, Optional[int]] = {creator.username: creator.pk}
+
+    def run(self, rows: Iterable[Row]) -> ImportResult:
+        """
+        Import all rows.
+        Args:
+            rows: rows made by read_rows()
+        Returns:
+            ImportResult:
+        """
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                return self.result
+            self.import_batch(batch)
+
+    def import_batch(self, batch: List[Row]) -> None:
+        """
+        Validate and insert one batch.
+        Args:
+            batch: rows of the batch
+        """
+        batch = [
+            (line, self.normalize(row)) for line, row in batch
+        ]
+        self.resolve(batch)
+        taken = set(Tasks.objects.filter(
+            name__in=[row['name'] for _line, row in batch if row],
+        ).values_list('name', flat=True))
+        tasks, labels = [], {}
+        for line, row in batch:
+            error = self.validate(row, taken)
+            if error:
+                self.result.errors.append((line, error))
+                continue
+            self.seen_names.add(row['name'])
+            tasks.append((line, self.build(row)))
+            labels[row['name']] = [self.labels[name] for name in row['labels']]
+        if tasks:
+            self.insert(tasks, labels)
+
+    def insert(self, tasks: List[Tuple[int, Tasks]], labels: Dict) -> None:
+        """
+        Insert tasks and their labels in one transaction.
+        Args:
+            tasks: line numbers and unsaved tasks
+            labels: label ids by task name
+        """
+        try:
+            with transaction.atomic():
+                Tasks.objects.bulk_create([task for _line, task in tasks])
+                pks = Tasks.objects.filter(
+                    name__in=labels.keys(),
+                ).values_list('name', 'pk')
+                TaskLabelRelated.objects.bulk_create([
+                    TaskLabelRelated(task_id=pk, label_id=label_id)
+                    for name, pk in pks for label_id in labels[name]
+                ])
+        except IntegrityError:
+            self.result.errors.extend(
+                (line, _('ImportErrorBatchFailed')) for line, _task in tasks
+            )
+            return
+        self.result.created += len(tasks)
+
+    def normalize(self, row) -> Optional[Dict[str, Any]]:
+        """
+        Bring a row of any format to plain strings and a list of labels.
+
+        Labels are a list of names or names separated by commas, labels of
+        any other type are None and make the row invalid.
+        Args:
+            row: parsed row
+        Returns:
+            Optional:
+        """
+        if row is None:
+            return None
+        creator = row.get('creator') if self.row_creators else None
+        return {
+            'name': str(row.get('name') or '').strip(),
+            'description': str(row.get('description') or ''),
+            'status': str(row.get('status') or '').strip(),
+            'creator': str(creator or '').strip(),
+            'executor': str(row.get('executor') or '').strip(),
+            'labels': normalize_labels(row.get('labels')),
+        }
+
+    def resolve(self, batch: List[Tuple[int, Optional[Dict]]]) -> None:
+        """
+        Look up ids of names not seen in the previous batches.
+        Args:
+            batch: normalized rows
+        """
+        rows = [row for _line, row in batch if row]
+        lookups = (
+            (self.statuses, Status.objects, 'name', ('status',)),
+            (self.labels, Label.objects, 'name', ()),
+            (
+                self.users,
+                get_user_model().objects,
+                'username',
+                ('creator', 'executor'),
+            ),
+        )
+        for known, manager, field, columns in lookups:
+            names = set()
+            for row in rows:
+                if columns:
+                    names.update(row[column] for column in columns)
+                else:
+                    names.update(row['labels'] or ())
+            names = {name for name in names if name and name not in known}
+            if not names:
+                continue
+            known.update(dict.fromkeys(names))
+            known.update(manager.filter(
+                **{'{field}__in'.format(field=field): names},
+            ).values_list(field, 'pk'))
+
+    def validate(self, row, taken: set) -> Optional[str]:
+        """
+        Get error of a row, None for a valid one.
+        Args:
+            row: normalized row
+            taken: names of existing tasks
+        Returns:
+            Optional:
+        """
+        if row is None:
+            return _('ImportErrorMalformedRow')
+        name = row['name']
+        if not name:
+            return _('ImportErrorFieldRequired') % {'field': 'name'}
+        if len(name) > self.max_name_length:
+            return _('ImportErrorNameTooLong') % {
+                'length': self.max_name_length,
+            }
+        if name in taken or name in self.seen_names:
+            return _('ImportErrorDuplicateName') % {'name': name}
+        if not row['status']:
+            return _('ImportErrorFieldRequired') % {'field': 'status'}
+        if self.statuses[row['status']] is None:
+            return _('ImportErrorUnknownStatus') % {'name': row['status']}
+        for column in ('creator', 'executor'):
+            if row[column] and self.users[row[column]] is None:
+                return _('ImportErrorUnknownUser') % {'name': row[column]}
+        if row['labels'] is None:
+            return _('ImportErrorInvalidLabels')
+        for label in row['labels']:
+            if self.labels[label] is None:
+                return _('ImportErrorUnknownLabel') % {'name': label}
+        return None
+
+    def build(self, row: Dict[str, Any]) -> Tasks:
+        """
+        Build unsaved task of a valid row.
+        Args:
+            row: normalized row
+        Returns:
+            Tasks:
+        """
+        return Tasks(
+            name=row['name'],
+            description=row['description'],
+            status_id=self.statuses[row['status']],
+            creator_id=self.users[row['creator'] or self.creator.username],
+            executor_id=self.users[row['executor']] if row['executor'] else None,
+        )
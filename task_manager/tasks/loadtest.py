@@ -0,0 +1,578 @@
+"""
+HTTP load test of task manager pages.
+
+Concurrent clients log in as users of a seeded dataset and request the
+views of VIEWS against a server started for the run, or one given by url.
+Every client is a thread with its own cookies, the server runs in another
+process so clients do not compete with it for the GIL. Redirects are not
+followed, a request is measured from sending it to reading its body.
+
+The report holds throughput and latency percentiles per view as JSON, with
+the commit of the tree, so runs of different commits can be compared.
+"""
+import datetime
+import http.cookiejar
+import json
+import math
+import os
+import random
+import socket
+import subprocess  # noqa: S404
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.urls import reverse
+from task_manager.tasks.seeding import PASSWORD, PREFIX, Dataset
+
+VIEWS = ('tasks', 'detail_task', 'create_task', 'users', 'statuses', 'labels')
+RUNSERVER = 'runserver'
+GUNICORN = 'gunicorn'
+SERVERS = (RUNSERVER, GUNICORN)
+PERCENTILES = (50, 95, 99)
+FIRST_REQUEST_VIEWS = ('login', 'home', 'users', 'create_user')
+
+Sample = Tuple[str, float, int]
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Report redirects as responses instead of following them."""
+
+    def redirect_request(self, *args, **kwargs) -> None:  # noqa: WPS324
+        """
+        Do not follow.
+        Args:
+            args:
+            kwargs:
+        """
+        return None  # noqa: WPS324
+
+
+class HttpClient(object):
+    """Browser-like client keeping cookies and sending the CSRF token."""
+
+    def __init__(self, base_url: str, timeout: float = 30):
+        """
+        Init client.
+        Args:
+            base_url: scheme, host and port of the server
+            timeout: seconds to wait for a response
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), NoRedirect,
+        )
+
+    def request(self, path: str, data: Optional[Dict] = None) -> int:
+        """
+        Send a GET, or a POST of form data, and read the response.
+        Args:
+            path: path of the url
+            data: form fields to POST
+        Returns:
+            int: status code
+        """
+        body = None
+        headers = {}
+        if data is not None:
+            body = urllib.parse.urlencode(data, doseq=True).encode()
+            headers['X-CSRFToken'] = self.cookie(settings.CSRF_COOKIE_NAME)
+        request = urllib.request.Request(  # noqa: S310
+            self.base_url + path, data=body, headers=headers,
+        )
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            error.read()
+            return error.code
+
+    def cookie(self, name: str) -> str:
+        """
+        Get a cookie value.
+        Args:
+            name:
+        Returns:
+            str:
+        """
+        for cookie in self.cookies:
+            if cookie.name == name:
+                return cookie.value
+        return ''
+
+    def login(self, username: str, password: str) -> bool:
+        """
+        Log in through the login form.
+        Args:
+            username:
+            password:
+        Returns:
+            bool:
+        """
+        self.request(reverse('login'))
+        self.request(reverse('login'), {
+            'username': username, 'password': password,
+        })
+        return bool(self.cookie(settings.SESSION_COOKIE_NAME))
+
+
+def build_requests(
+    dataset: Dataset, run: str, worker: int,
+) -> Dict[str, Callable[[random.Random, int], Tuple[str, Optional[Dict]]]]:
+    """
+    Get builders of a request of each view, taking the rng and a counter.
+    Args:
+        dataset: rows to request
+        run: token of the run, part of created task names
+        worker: number of the client, part of created task names
+    Returns:
+        Dict:
+    """
+    def detail(rng, _count):  # noqa: WPS430
+        return reverse('detail_task', args=[rng.choice(dataset.tasks)]), None
+
+    def create(rng, count):  # noqa: WPS430
+        return reverse('create_task'), {
+            'name': '{prefix}-{run}-created-{worker}-{count}'.format(
+                prefix=PREFIX, run=run, worker=worker, count=count,
+            ),
+            'status': rng.choice(dataset.statuses),
+            'labels': rng.sample(dataset.labels, min(2, len(dataset.labels))),
+        }
+
+    requests = {
+        name: _static_request(reverse(name))
+        for name in ('tasks', 'users', 'statuses', 'labels')
+    }
+    requests['detail_task'] = detail
+    requests['create_task'] = create
+    return requests
+
+
+def _static_request(path: str) -> Callable:
+    """
+    Get a builder of a GET of one path.
+    Args:
+        path:
+    Returns:
+        Callable:
+    """
+    return lambda _rng, _count: (path, None)
+
+
+def run_clients(  # noqa: WPS211
+    base_url: str,
+    dataset: Dataset,
+    views: List[str],
+    concurrency: int,
+    duration: float,
+    max_requests: Optional[int] = None,
+    seed: int = 0,
+) -> Tuple[List[Sample], float]:
+    """
+    Drive concurrent clients against the server.
+
+    Every client logs in as a user of the dataset and then requests views
+    in random order until the duration or its share of max_requests runs out.
+    Args:
+        base_url: scheme, host and port of the server
+        dataset: rows to request, with users to log in as
+        views: names of the views to request
+        concurrency: number of clients
+        duration: seconds to run
+        max_requests: requests of all clients, unlimited by default
+        seed: seed of the view order
+    Returns:
+        Tuple: samples and seconds the run took
+    Raises:
+        RuntimeError: if a client cannot log in
+    """
+    samples: List[List[Sample]] = [[] for _index in range(concurrency)]
+    clients = []
+    for worker in range(concurrency):
+        client = HttpClient(base_url)
+        username = dataset.usernames[worker % len(dataset.usernames)]
+        if not client.login(username, PASSWORD):
+            raise RuntimeError('Cannot log in as {username}'.format(
+                username=username,
+            ))
+        clients.append(client)
+    share = None
+    if max_requests is not None:
+        share = math.ceil(max_requests / concurrency)
+    start = threading.Barrier(concurrency + 1)
+    run = uuid.uuid4().hex[:8]
+
+    def work(worker):  # noqa: WPS430
+        rng = random.Random(seed + worker)
+        builders = build_requests(dataset, run, worker)
+        start.wait()
+        deadline = time.perf_counter() + duration
+        count = 0
+        while time.perf_counter() < deadline:
+            if share is not None and count >= share:
+                return
+            view = rng.choice(views)
+            path, data = builders[view](rng, count)
+            began = time.perf_counter()
+            try:
+                status = clients[worker].request(path, data)
+            except OSError:
+                status = 0
+            samples[worker].append((view, time.perf_counter() - began, status))
+            count += 1
+
+    threads = [
+        threading.Thread(target=work, args=(worker,), daemon=True)
+        for worker in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+    return [sample for chunk in samples for sample in chunk], elapsed
+
+
+def percentile(latencies: List[float], percent: float) -> float:
+    """
+    Get a percentile of sorted latencies by the nearest rank.
+    Args:
+        latencies: sorted values
+        percent: 0 to 100
+    Returns:
+        float:
+    """
+    if not latencies:
+        return 0.0
+    rank = math.ceil(percent / 100 * len(latencies))
+    return latencies[max(rank, 1) - 1]
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    """
+    Get throughput and latency in milliseconds of every view and in total.
+    Args:
+        samples: view, seconds and status code of every request, 0 when
+            the connection failed
+        elapsed: seconds of the run
+    Returns:
+        Dict:
+    """
+    by_view: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        by_view.setdefault(sample[0], []).append(sample)
+    views = {
+        view: _summarize_view(view_samples, elapsed)
+        for view, view_samples in sorted(by_view.items())
+    }
+    return {'views': views, 'total': _summarize_view(samples, elapsed)}
+
+
+def _summarize_view(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    """
+    Get throughput and latency of samples.
+    Args:
+        samples:
+        elapsed: seconds of the run
+    Returns:
+        Dict:
+    """
+    latencies = sorted(sample[1] * 1000 for sample in samples)
+    codes: Dict[str, int] = {}
+    for sample in samples:
+        codes[str(sample[2])] = codes.get(str(sample[2]), 0) + 1
+    summary = {
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if not 0 < sample[2] < 400),
+        'status_codes': codes,
+        'throughput': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(sum(latencies) / len(latencies), 2)
+        if latencies else 0.0,
+        'max_ms': round(latencies[-1], 2) if latencies else 0.0,
+    }
+    for percent in PERCENTILES:
+        summary['p{percent}_ms'.format(percent=percent)] = round(
+            percentile(latencies, percent), 2,
+        )
+    return summary
+
+
+def get_commit() -> Optional[str]:
+    """
+    Get the commit of the tree, None outside a git checkout.
+    Returns:
+        Optional:
+    """
+    try:
+        output = subprocess.run(  # noqa: S603, S607
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def build_report(
+    samples: List[Sample],
+    elapsed: float,
+    config: Dict[str, Any],
+    dataset: Dataset,
+) -> Dict[str, Any]:
+    """
+    Build the report of a run.
+    Args:
+        samples:
+        elapsed: seconds of the run
+        config: options of the run
+        dataset:
+    Returns:
+        Dict:
+    """
+    report = {
+        'created_at': datetime.datetime.now(
+            datetime.timezone.utc,
+        ).isoformat(),
+        'commit': get_commit(),
+        'config': config,
+        'dataset': dataset.sizes(),
+        'elapsed_seconds': round(elapsed, 3),
+    }
+    report.update(summarize(samples, elapsed))
+    return report
+
+
+def write_report(report: Dict[str, Any], path: str):
+    """
+    Write a report as JSON.
+    Args:
+        report:
+        path:
+    """
+    with open(path, 'w') as report_file:
+        json.dump(report, report_file, indent=2, sort_keys=True)
+        report_file.write('\n')
+
+
+def free_port() -> int:
+    """
+    Get a free local TCP port.
+    Returns:
+        int:
+    """
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+class LocalServer(object):
+    """Server of this project started in a subprocess for a run."""
+
+    def __init__(
+        self,
+        kind: str = RUNSERVER,
+        workers: int = 2,
+        env: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Init server.
+        Args:
+            kind: RUNSERVER or GUNICORN
+            workers: gunicorn workers
+            env: environment variables set for the server
+        """
+        self.kind = kind
+        self.workers = workers
+        self.env = env or {}
+        self.port = free_port()
+        self.url = 'http://127.0.0.1:{port}'.format(port=self.port)
+        self.process: Optional[subprocess.Popen] = None
+
+    def command(self) -> List[str]:
+        """
+        Get the command line of the server.
+        Returns:
+            List:
+        """
+        bind = '127.0.0.1:{port}'.format(port=self.port)
+        if self.kind == GUNICORN:
+            return [
+                sys.executable, '-m', 'gunicorn',
+                '--bind', bind,
+                '--workers', str(self.workers),
+                '--config', 'gunicorn.conf.py',
+                'task_manager.wsgi:application',
+            ]
+        return [
+            sys.executable, '-m', 'django', 'runserver', '--noreload', bind,
+        ]
+
+    def __enter__(self) -> 'LocalServer':
+        """
+        Start the server and wait until it answers.
+        Returns:
+            LocalServer:
+        """
+        self.start()
+        try:
+            self.wait_ready()
+        except Exception:
+            self.stop()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Stop the server.
+        Args:
+            exc_info:
+        """
+        self.stop()
+
+    def start(self):
+        """Start the server process."""
+        env = {**os.environ, **self.env}
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
+        self.process = subprocess.Popen(  # noqa: S603
+            self.command(),
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def wait_listening(self, timeout: float = 30):
+        """
+        Wait until the server accepts connections, without a request.
+        Args:
+            timeout: seconds
+        Raises:
+            RuntimeError: if the server exits or does not listen in time
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError('The {kind} server exited'.format(
+                    kind=self.kind,
+                ))
+            try:
+                socket.create_connection(('127.0.0.1', self.port), 1).close()
+            except OSError:
+                time.sleep(0.01)
+                continue
+            return
+        raise RuntimeError('The {kind} server did not start'.format(
+            kind=self.kind,
+        ))
+
+    def wait_ready(self, timeout: float = 30):
+        """
+        Wait until the login page answers.
+        Args:
+            timeout: seconds
+        Raises:
+            RuntimeError: if the server exits or does not answer in time
+        """
+        client = HttpClient(self.url, timeout=1)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError('The {kind} server exited'.format(
+                    kind=self.kind,
+                ))
+            try:
+                client.request(reverse('login'))
+            except OSError:
+                time.sleep(0.2)
+                continue
+            return
+        raise RuntimeError('The {kind} server did not start'.format(
+            kind=self.kind,
+        ))
+
+    def stop(self):
+        """Terminate the server process."""
+        if self.process is None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+
+def time_request(client: HttpClient, path: str) -> float:
+    """
+    Get milliseconds of a request.
+    Args:
+        client:
+        path:
+    Returns:
+        float:
+    """
+    began = time.perf_counter()
+    client.request(path)
+    return round((time.perf_counter() - began) * 1000, 2)
+
+
+def measure_first_requests(
+    kind: str = RUNSERVER,
+    workers: int = 1,
+    warmup: bool = True,
+    views: Tuple[str, ...] = FIRST_REQUEST_VIEWS,
+) -> Dict[str, Any]:
+    """
+    Time the first requests of a server started for the measurement.
+
+    The server is started with WARMUP on or off. Time to first request runs
+    from starting the process to the response of the first view. Every view
+    is requested twice, the first request of a view pays for what the
+    warm-up did not do and the second shows the warm cost.
+    Args:
+        kind: RUNSERVER or GUNICORN
+        workers: gunicorn workers
+        warmup: whether the server warms up
+        views: names of views requested without arguments
+    Returns:
+        Dict:
+    """
+    server = LocalServer(kind, workers, env={'WARMUP': '1' if warmup else '0'})
+    client = HttpClient(server.url)
+    began = time.perf_counter()
+    server.start()
+    try:
+        server.wait_listening()
+        listening = time.perf_counter() - began
+        requests = {}
+        for view in views:
+            path = reverse(view)
+            requests[view] = [time_request(client, path)]
+            if len(requests) == 1:
+                first_request = time.perf_counter() - began
+            requests[view].append(time_request(client, path))
+    finally:
+        server.stop()
+    return {
+        'server': kind,
+        'warmup': warmup,
+        'listening_ms': round(listening * 1000, 2),
+        'first_request_ms': round(first_request * 1000, 2),
+        'requests_ms': requests,
+    }
@@ -0,0 +1,154 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from task_manager.tasks import benchmark
+from task_manager.tasks.loadtest import write_report
+
+
+class Command(BaseCommand):
+    """Run micro-benchmarks of the task list."""
+
+    help = (
+        'Time querysets, filters, forms and templates of the task list '
+        'against a seeded dataset, write the results as JSON and compare '
+        'them with a baseline.'
+    )
+
+    def add_arguments(self, parser):
+        """
+        Add command arguments.
+        Args:
+            parser:
+        """
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--statuses', type=int, default=5)
+        parser.add_argument('--labels', type=int, default=50)
+        parser.add_argument('--tasks', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix',
+            help='Prefix of the dataset, bench<seed> by default. A dataset '
+            'seeded before is reused.',
+        )
+        parser.add_argument(
+            '--benchmarks',
+            default='',
+            help='Comma separated prefixes of benchmark names to run.',
+        )
+        parser.add_argument(
+            '--list', action='store_true', help='List benchmarks and exit.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5, help='Timed loops.',
+        )
+        parser.add_argument(
+            '--min-time',
+            type=float,
+            default=0.2,
+            help='Seconds a timed loop runs at least.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Report file, benchmark-<time>.json by default.',
+        )
+        parser.add_argument(
+            '--compare',
+            metavar='BASELINE',
+            help='Report to compare with, fails on regressions.',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.1,
+            help='Allowed growth of a metric over the baseline, 0.1 for 10%%.',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Execute command.
+        Args:
+            args:
+            options:
+        Raises:
+            CommandError: if the options are invalid or a benchmark regressed
+        """
+        benchmarks = benchmark.get_benchmarks()
+        patterns = [
+            pattern for pattern in options['benchmarks'].split(',') if pattern
+        ]
+        names = benchmark.select(benchmarks, patterns)
+        if options['list']:
+            self.stdout.write('\n'.join(names))
+            return
+        if not names:
+            raise CommandError('No benchmarks match {patterns}.'.format(
+                patterns=options['benchmarks'],
+            ))
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be positive.')
+        baseline = None
+        if options['compare']:
+            try:
+                baseline = benchmark.read_report(options['compare'])
+            except (OSError, ValueError) as error:
+                raise CommandError('Cannot read baseline: {error}'.format(
+                    error=error,
+                ))
+        seeder = benchmark.find_seeder(
+            options['prefix'] or 'bench{seed}'.format(seed=options['seed']),
+            users=options['users'],
+            statuses=options['statuses'],
+            labels=options['labels'],
+            tasks=options['tasks'],
+            seed=options['seed'],
+        )
+
+        def progress(name, result):  # noqa: WPS430
+            self.stdout.write(
+                '{name}: {best_ms} ms, {peak_kib} KiB peak, '
+                '{queries} queries'.format(name=name, **result),
+            )
+
+        results = benchmark.run_benchmarks(
+            seeder, names, options['repeat'], options['min_time'], progress,
+        )
+        report = benchmark.build_report(results, {
+            'prefix': seeder.prefix,
+            'repeat': options['repeat'],
+            'min_time': options['min_time'],
+        })
+        output = options['output'] or 'benchmark-{stamp}.json'.format(
+            stamp=time.strftime('%Y%m%d-%H%M%S'),
+        )
+        write_report(report, output)
+        self.stdout.write('Report written to {output}.'.format(output=output))
+        if baseline is not None:
+            self.check_regressions(baseline, report, options['threshold'])
+
+    def check_regressions(self, baseline, report, threshold):
+        """
+        Compare a report with the baseline.
+        Args:
+            baseline:
+            report:
+            threshold: allowed growth
+        Raises:
+            CommandError: if a metric regressed
+        """
+        changes = benchmark.compare(baseline, report, threshold)
+        regressions = [change for change in changes if change['regressed']]
+        for change in regressions:
+            self.stdout.write(
+                '{benchmark} {metric}: {baseline} -> {current} '
+                '({percent:+.1f}%)'.format(
+                    percent=change['change'] * 100, **change,
+                ),
+            )
+        if regressions:
+            raise CommandError(
+                '{count} metrics regressed by more than {percent:.0f}%.'
+                .format(count=len(regressions), percent=threshold * 100),
+            )
+        self.stdout.write('No regressions against {commit}.'.format(
+            commit=baseline.get('commit') or 'the baseline',
+        ))
@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from task_manager.tasks.importer import (
+    FORMATS,
+    TaskImporter,
+    guess_format,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    """Import tasks from a file."""
+
+    help = 'Import tasks from a CSV, JSON or NDJSON file.'
+
+    def add_arguments(self, parser):
+        """
+        Add command arguments.
+        Args:
+            parser:
+        """
+        parser.add_argument('path', help='File to import.')
+        parser.add_argument(
+            '--creator',
+            required=True,
+            help='Username set as creator of rows without one.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='File format, guessed from the extension by default.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of rows inserted per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Execute command.
+        Args:
+            args:
+            options:
+        Raises:
+            CommandError: if the creator or the format is unknown
+        """
+        try:
+            creator = get_user_model().objects.get(
+                username=options['creator'],
+            )
+        except get_user_model().DoesNotExist:
+            raise CommandError(
+                'User "{username}" does not exist.'.format(
+                    username=options['creator'],
+                ),
+            )
+        try:
+            file_format = options['format'] or guess_format(options['path'])
+        except ValueError as error:
+            raise CommandError(error)
+        importer = TaskImporter(
+            creator, batch_size=options['batch_size'], row_creators=True,
+        )
+        with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+            result = importer.run(read_rows(stream, file_format))
+        for line, error in result.errors:
+            self.stderr.write('Line {line}: {error}'.format(
+                line=line, error=error,
+            ))
+        self.stdout.write(
+            'Imported {created} tasks, skipped {skipped} rows.'.format(
+                created=result.created, skipped=len(result.errors),
+            ),
+        )
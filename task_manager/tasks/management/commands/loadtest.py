@@ -0,0 +1,181 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from task_manager.tasks import loadtest
+from task_manager.tasks.seeding import find_dataset, seed_dataset
+
+
+class Command(BaseCommand):
+    """Measure throughput and latency of task manager views."""
+
+    help = (
+        'Seed a dataset, start a local server and drive concurrent clients '
+        'against it, writing latency percentiles per view as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        """
+        Add command arguments.
+        Args:
+            parser:
+        """
+        parser.add_argument(
+            '--users', type=int, default=20, help='Users to seed.',
+        )
+        parser.add_argument(
+            '--statuses', type=int, default=5, help='Statuses to seed.',
+        )
+        parser.add_argument(
+            '--labels', type=int, default=20, help='Labels to seed.',
+        )
+        parser.add_argument(
+            '--tasks', type=int, default=1000, help='Tasks to seed.',
+        )
+        parser.add_argument(
+            '--labels-per-task',
+            type=int,
+            default=2,
+            help='Labels of every seeded task.',
+        )
+        parser.add_argument(
+            '--skip-seed',
+            action='store_true',
+            help='Reuse datasets seeded by earlier runs.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=8, help='Concurrent clients.',
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=30,
+            help='Seconds to run.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            help='Stop after this many requests of all clients.',
+        )
+        parser.add_argument(
+            '--views',
+            default=','.join(loadtest.VIEWS),
+            help='Comma separated views to request.',
+        )
+        parser.add_argument(
+            '--server',
+            choices=loadtest.SERVERS,
+            default=loadtest.RUNSERVER,
+            help='Server started for the run.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Workers of the gunicorn server.',
+        )
+        parser.add_argument(
+            '--url',
+            help='Run against a server already running at this url.',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+        parser.add_argument(
+            '--output',
+            help='Report file, loadtest-<time>.json by default.',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Execute command.
+        Args:
+            args:
+            options:
+        Raises:
+            CommandError: if the options or the run fail
+        """
+        views = [view for view in options['views'].split(',') if view]
+        unknown = set(views) - set(loadtest.VIEWS)
+        if unknown or not views:
+            raise CommandError('Unknown views: {views}'.format(
+                views=', '.join(sorted(unknown)) or '(none)',
+            ))
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be positive.')
+        dataset = self.get_dataset(options)
+        config = {
+            'views': views,
+            'concurrency': options['concurrency'],
+            'duration': options['duration'],
+            'requests': options['requests'],
+            'server': 'external' if options['url'] else options['server'],
+            'workers': options['workers'],
+            'seed': options['seed'],
+        }
+        try:
+            samples, elapsed = self.run(dataset, views, options)
+        except RuntimeError as error:
+            raise CommandError(error)
+        report = loadtest.build_report(samples, elapsed, config, dataset)
+        output = options['output'] or 'loadtest-{stamp}.json'.format(
+            stamp=time.strftime('%Y%m%d-%H%M%S'),
+        )
+        loadtest.write_report(report, output)
+        for view, summary in report['views'].items():
+            self.stdout.write(
+                '{view}: {requests} requests, {errors} errors, '
+                '{throughput} req/s, p50 {p50_ms} ms, p95 {p95_ms} ms, '
+                'p99 {p99_ms} ms'.format(view=view, **summary),
+            )
+        self.stdout.write('Report written to {output}.'.format(output=output))
+
+    def get_dataset(self, options):
+        """
+        Seed a dataset or find the seeded ones.
+        Args:
+            options:
+        Returns:
+            Dataset:
+        Raises:
+            CommandError: if there are no users, statuses or tasks
+        """
+        if options['skip_seed']:
+            dataset = find_dataset()
+        else:
+            started = time.perf_counter()
+            dataset = seed_dataset(
+                users=options['users'],
+                statuses=options['statuses'],
+                labels=options['labels'],
+                tasks=options['tasks'],
+                labels_per_task=options['labels_per_task'],
+                seed=options['seed'],
+            )
+            self.stdout.write('Seeded {sizes} in {seconds:.1f} s.'.format(
+                sizes=dataset.sizes(), seconds=time.perf_counter() - started,
+            ))
+        if not (dataset.usernames and dataset.statuses and dataset.tasks):
+            raise CommandError('The dataset needs users, statuses and tasks.')
+        return dataset
+
+    def run(self, dataset, views, options):
+        """
+        Run clients against the given url or a local server.
+        Args:
+            dataset:
+            views:
+            options:
+        Returns:
+            Tuple: samples and seconds the run took
+        """
+        run_options = {
+            'views': views,
+            'concurrency': options['concurrency'],
+            'duration': options['duration'],
+            'max_requests': options['requests'],
+            'seed': options['seed'],
+        }
+        if options['url']:
+            return loadtest.run_clients(options['url'], dataset, **run_options)
+        with loadtest.LocalServer(
+            options['server'], options['workers'],
+        ) as server:
+            return loadtest.run_clients(server.url, dataset, **run_options)
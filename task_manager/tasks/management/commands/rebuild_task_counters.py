@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from task_manager.tasks.models import UserTasksCounter
+
+
+class Command(BaseCommand):
+    """Recount per-user task counters and report drift."""
+
+    help = 'Rebuild created/assigned task counters of users in chunks.'
+
+    def add_arguments(self, parser):
+        """
+        Add command arguments.
+        Args:
+            parser:
+        """
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of users recounted per transaction.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report drift, do not write counters.',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Execute command.
+        Args:
+            args:
+            options:
+        """
+        chunk_size = options['chunk_size']
+        user_ids = get_user_model().objects.order_by('pk').values_list(
+            'pk', flat=True,
+        )
+        checked = drifted = 0
+        last_pk = 0
+        while True:
+            chunk = list(user_ids.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1]
+            checked += len(chunk)
+            drifted += self.rebuild_chunk(chunk, options)
+        self.stdout.write(
+            'Checked {checked} users, {drifted} with drift{suffix}.'.format(
+                checked=checked,
+                drifted=drifted,
+                suffix=' (dry run)' if options['dry_run'] else '',
+            ),
+        )
+
+    def rebuild_chunk(self, user_ids, options) -> int:
+        """
+        Compare and fix counters of a chunk of users.
+        Args:
+            user_ids:
+            options:
+        Returns:
+            int:
+        """
+        with transaction.atomic():
+            actual = UserTasksCounter.objects.count_tasks(user_ids)
+            stored = {
+                counter.user_id: (
+                    counter.created_count,
+                    counter.assigned_count,
+                ) for counter in UserTasksCounter.objects.filter(
+                    user_id__in=user_ids,
+                )
+            }
+            drift = [
+                user_id for user_id, counts in actual.items()
+                if stored.get(user_id) != counts
+            ]
+            for user_id in drift:
+                if options['verbosity'] > 1:
+                    self.stdout.write(
+                        'User {user}: stored {stored}, actual {actual}'.format(
+                            user=user_id,
+                            stored=stored.get(user_id),
+                            actual=actual[user_id],
+                        ),
+                    )
+            if drift and not options['dry_run']:
+                UserTasksCounter.objects.refresh(drift)
+        return len(drift)
@@ -0,0 +1,156 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from task_manager.tasks.seeding import PASSWORD, Seeder
+
+
+def parse_range(value: str) -> tuple:
+    """
+    Parse MIN-MAX or a single number.
+    Args:
+        value:
+    Returns:
+        tuple:
+    Raises:
+        ValueError: if the range is malformed
+    """
+    low, _dash, high = value.partition('-')
+    bounds = (int(low), int(high or low))
+    if bounds[0] < 0 or bounds[0] > bounds[1]:
+        raise ValueError(value)
+    return bounds
+
+
+class Command(BaseCommand):
+    """Generate a large synthetic dataset."""
+
+    help = (
+        'Generate users, statuses, labels and tasks with batched inserts, '
+        'COPY on PostgreSQL. The same options and seed give the same rows.'
+    )
+
+    def add_arguments(self, parser):
+        """
+        Add command arguments.
+        Args:
+            parser:
+        """
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--statuses', type=int, default=5)
+        parser.add_argument('--labels', type=int, default=50)
+        parser.add_argument('--tasks', type=int, default=100000)
+        parser.add_argument(
+            '--labels-per-task',
+            default='0-3',
+            help='Number of labels of a task, MIN-MAX or a single number.',
+        )
+        parser.add_argument(
+            '--status-skew',
+            type=float,
+            default=1.0,
+            help='Zipf exponent of statuses of tasks, 0 for uniform.',
+        )
+        parser.add_argument(
+            '--executor-skew',
+            type=float,
+            default=1.0,
+            help='Zipf exponent of tasks per executor, 0 for uniform.',
+        )
+        parser.add_argument(
+            '--label-skew',
+            type=float,
+            default=1.0,
+            help='Zipf exponent of labels of tasks, 0 for uniform.',
+        )
+        parser.add_argument(
+            '--unassigned',
+            type=float,
+            default=0.1,
+            help='Share of tasks without executor.',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='Tasks are created within this many days.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix',
+            help='Prefix of row names, seed<seed> by default.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=50000,
+            help='Tasks generated and written at once.',
+        )
+        parser.add_argument(
+            '--keep-indexes',
+            action='store_true',
+            help='Update indexes of tasks row by row instead of building '
+            'them after the load, for tables much larger than the load.',
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        """
+        Execute command.
+        Args:
+            args:
+            options:
+        Raises:
+            CommandError: if the options are invalid or the prefix is taken
+        """
+        try:
+            labels_per_task = parse_range(options['labels_per_task'])
+        except ValueError:
+            raise CommandError('--labels-per-task must be MIN-MAX.')
+        if options['users'] < 1 or options['statuses'] < 1:
+            raise CommandError('Tasks need at least one user and status.')
+        if not 0 <= options['unassigned'] <= 1:
+            raise CommandError('--unassigned must be between 0 and 1.')
+        seeder = Seeder(
+            users=options['users'],
+            statuses=options['statuses'],
+            labels=options['labels'],
+            tasks=options['tasks'],
+            labels_per_task=labels_per_task,
+            status_skew=options['status_skew'],
+            executor_skew=options['executor_skew'],
+            label_skew=options['label_skew'],
+            unassigned=options['unassigned'],
+            days=options['days'],
+            seed=options['seed'],
+            prefix=options['prefix'] or 'seed{seed}'.format(
+                seed=options['seed'],
+            ),
+            chunk_size=options['chunk_size'],
+            defer_indexes=not options['keep_indexes'],
+            using=options['database'],
+        )
+        if seeder.exists():
+            raise CommandError(
+                'Rows prefixed "{prefix}" exist, pick another --prefix.'.format(
+                    prefix=seeder.prefix,
+                ),
+            )
+        started = time.perf_counter()
+
+        def progress(table, count):  # noqa: WPS430
+            if options['verbosity'] > 1:
+                self.stdout.write('{table}: {count}'.format(
+                    table=table, count=count,
+                ))
+
+        dataset = seeder.run(progress)
+        self.stdout.write(
+            'Seeded {users} users, {statuses} statuses, {labels} labels and '
+            '{tasks} tasks in {seconds:.1f} s. Users log in with "{password}".'
+            .format(
+                seconds=time.perf_counter() - started,
+                password=PASSWORD,
+                **dataset.sizes(),
+            ),
+        )
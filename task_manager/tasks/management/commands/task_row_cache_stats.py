@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from task_manager.tasks.row_cache import stats
+
+
+class Command(BaseCommand):
+    """Report hits and misses of the task row cache."""
+
+    help = 'Show task row cache hits and misses of all workers.'
+
+    def add_arguments(self, parser):
+        """
+        Add command arguments.
+        Args:
+            parser:
+        """
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset counters after reporting.',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Execute command.
+        Args:
+            args:
+            options:
+        """
+        self.stdout.write(
+            'Hits {hits}, misses {misses}, hit ratio {hit_ratio:.2%}.'.format(
+                **stats.totals(),
+            ),
+        )
+        if options['reset']:
+            stats.reset()
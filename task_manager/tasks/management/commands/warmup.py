@@ -0,0 +1,80 @@
+from django.core.management.base import BaseCommand
+from task_manager import warmup
+from task_manager.tasks import loadtest
+
+
+class Command(BaseCommand):
+    """Warm up the process or measure the time to first request."""
+
+    help = (
+        'Run the warm-up done before a worker takes requests and print the '
+        'time of every step, or with --measure start a server with the '
+        'warm-up off and on and compare the time to its first requests.'
+    )
+
+    def add_arguments(self, parser):
+        """
+        Add command arguments.
+        Args:
+            parser:
+        """
+        parser.add_argument(
+            '--measure',
+            action='store_true',
+            help='Measure the time to first request without and with warm-up.',
+        )
+        parser.add_argument(
+            '--server',
+            choices=loadtest.SERVERS,
+            default=loadtest.RUNSERVER,
+            help='Server started for the measurement.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Workers of the gunicorn server.',
+        )
+        parser.add_argument(
+            '--output', help='Write the measurement as JSON to this file.',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Execute command.
+        Args:
+            args:
+            options:
+        """
+        if not options['measure']:
+            timings = {
+                **warmup.run_steps(warmup.STEPS),
+                **warmup.run_steps(warmup.WORKER_STEPS),
+            }
+            for step, seconds in timings.items():
+                self.stdout.write('{step}: {ms:.1f} ms'.format(
+                    step=step, ms=seconds * 1000,
+                ))
+            return
+        results = [
+            loadtest.measure_first_requests(
+                options['server'], options['workers'], warm,
+            )
+            for warm in (False, True)
+        ]
+        for result in results:
+            self.stdout.write(
+                'WARMUP={warm}: listening after {listening_ms} ms, '
+                'first response after {first_request_ms} ms'.format(
+                    warm=int(result['warmup']), **result,
+                ),
+            )
+            for view, (first, second) in result['requests_ms'].items():
+                self.stdout.write('  {view}: {first} ms, then {second} ms'.format(
+                    view=view, first=first, second=second,
+                ))
+        if options['output']:
+            loadtest.write_report({
+                'commit': loadtest.get_commit(),
+                'runs': results,
+            }, options['output'])
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.10 on 2026-10-16 20:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_alter_tasks_executor'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tasklabelrelated',
+            index=models.Index(fields=['label', 'task'], name='tasks_label_task_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasks',
+            index=models.Index(fields=['-created_at', '-id'], name='tasks_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasks',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='tasks_status_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasks',
+            index=models.Index(fields=['executor', '-created_at', '-id'], name='tasks_executor_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasks',
+            index=models.Index(fields=['creator', '-created_at', '-id'], name='tasks_creator_created_at_idx'),
+        ),
+    ]
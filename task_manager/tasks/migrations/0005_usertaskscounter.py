@@ -0,0 +1,23 @@
+# Generated by Django 3.2.10 on 2026-10-16 20:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_auto_20211227_1219'),
+        ('tasks', '0004_task_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTasksCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='tasks_counter', serialize=False, to='users.customuser')),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('assigned_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE tasks_tasks ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX tasks_search_vector_idx ON tasks_tasks "
+    "USING GIN (search_vector)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS tasks_search_vector_idx",
+    "ALTER TABLE tasks_tasks DROP COLUMN IF EXISTS search_vector",
+]
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE tasks_tasks_fts USING fts5("
+    "name, description, tokenize='unicode61 remove_diacritics 2', "
+    "prefix='2 3')",
+    "INSERT INTO tasks_tasks_fts (rowid, name, description) "
+    "SELECT id, name, description FROM tasks_tasks",
+]
+SQLITE_BACKWARD = [
+    "DROP TABLE IF EXISTS tasks_tasks_fts",
+]
+
+
+def run_statements(schema_editor, postgres, sqlite):
+    from task_manager.tasks.search import FTS5, POSTGRES, search_backend
+
+    statements = {POSTGRES: postgres, FTS5: sqlite}.get(
+        search_backend(schema_editor.connection.alias), [],
+    )
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    run_statements(schema_editor, POSTGRES_FORWARD, SQLITE_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    run_statements(schema_editor, POSTGRES_BACKWARD, SQLITE_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_usertaskscounter'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.10 on 2026-10-16 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_tasks_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tasks',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunSQL(
+            'UPDATE tasks_tasks SET updated_at = created_at',
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.10 on 2026-10-16 22:35
+
+from django.db import migrations, models
+
+
+def log_existing_tasks(apps, schema_editor):
+    Tasks = apps.get_model('tasks', 'Tasks')
+    TaskChange = apps.get_model('tasks', 'TaskChange')
+    pks = Tasks.objects.using(schema_editor.connection.alias).order_by(
+        'created_at', 'id',
+    ).values_list('id', flat=True)
+    TaskChange.objects.using(schema_editor.connection.alias).bulk_create(
+        [TaskChange(task_id=pk) for pk in pks.iterator()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_tasks_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField(db_index=True)),
+                ('deleted', models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.RunPython(log_existing_tasks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.25 on 2026-10-17 00:07
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_taskchange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskchange',
+            name='logged_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
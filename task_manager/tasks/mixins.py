@@ -7,6 +7,7 @@ from django.http import HttpResponsePermanentRedirect, HttpResponseRedirect
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
+from task_manager.views_mixins import SingleObjectCacheMixin
 
 
 class CustomLoginRequiredMixin(LoginRequiredMixin):
@@ -29,7 +30,10 @@ class CustomLoginRequiredMixin(LoginRequiredMixin):
         return super().dispatch(request, *args, **kwargs)
 
 
-class CheckUserRightsTestMixin(UserPassesTestMixin):
+class CheckUserRightsTestMixin(
+    SingleObjectCacheMixin,
+    UserPassesTestMixin,
+):
     """Deny a request with a permission error if the test_func() == False."""
 
     redirect_url = settings.LOGIN_REDIRECT_URL
@@ -53,13 +57,11 @@ class CheckUserRightsTestMixin(UserPassesTestMixin):
         Returns:
             Any:
         """
-        user_test_result = self.get_test_func()()
-
         if not request.user.is_authenticated:
             self.redirect_url = reverse_lazy('login')  # noqa: WPS601
             messages.error(request, _('UserNotAuthentication'))
             return self.handle_no_permission()
-        if not user_test_result:
+        if not self.get_test_func()():
             messages.error(request, _('ErrorTaskCanOnlyBeDeletedByAuthor'))
             return self.handle_no_permission()
         return super().dispatch(request, *args, **kwargs)
@@ -1,8 +1,112 @@
+from typing import Dict, Iterable, Tuple
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from task_manager.labels.models import Label
 from task_manager.statuses.models import Status
+from task_manager.tasks.signals import tasks_bulk_created, tasks_bulk_updated
+
+USER_FIELDS = frozenset(('creator', 'creator_id', 'executor', 'executor_id'))
+
+
+class TasksQuerySet(models.QuerySet):
+    """Tasks queryset notifying about bulk writes which skip model signals."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Insert objects and send tasks_bulk_created.
+        Args:
+            objs: tasks to insert
+            args:
+            kwargs:
+        Returns:
+            list:
+        """
+        objs = super().bulk_create(objs, *args, **kwargs)
+        tasks_bulk_created.send(sender=self.model, objs=objs)
+        return objs
+
+    def update(self, **kwargs) -> int:
+        """
+        Update rows, their updated_at too, and send tasks_bulk_updated.
+
+        Keys of the rows, and their users when a user field changes, are
+        read beforehand only for connected receivers.
+        Args:
+            kwargs: fields to update
+        Returns:
+            int:
+        """
+        kwargs.setdefault('updated_at', timezone.now())
+        if not tasks_bulk_updated.has_listeners(self.model):
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            pks, user_ids = [], set()
+            if USER_FIELDS & kwargs.keys():
+                for pk, creator_id, executor_id in self.order_by(
+                ).values_list('pk', 'creator_id', 'executor_id'):
+                    pks.append(pk)
+                    user_ids.update((creator_id, executor_id))
+            else:
+                pks = list(self.order_by().values_list('pk', flat=True))
+            rows = super().update(**kwargs)
+            tasks_bulk_updated.send(
+                sender=self.model,
+                pks=pks,
+                values=kwargs,
+                user_ids=user_ids,
+            )
+        return rows
+
+    def add_labels(self, labels, batch_size: int = 500) -> int:
+        """
+        Attach labels to every task, skipping pairs which already exist.
+        Args:
+            labels: labels to attach
+            batch_size: rows per INSERT
+        Returns:
+            int:
+        """
+        pks = list(self.order_by().values_list('pk', flat=True))
+        label_ids = [label.pk for label in labels]
+        existing = set(TaskLabelRelated.objects.filter(
+            task_id__in=pks, label_id__in=label_ids,
+        ).values_list('task_id', 'label_id'))
+        related = [
+            TaskLabelRelated(task_id=pk, label_id=label_id)
+            for pk in pks for label_id in label_ids
+            if (pk, label_id) not in existing
+        ]
+        TaskLabelRelated.objects.bulk_create(related, batch_size=batch_size)
+        changed = {row.task_id for row in related}
+        if changed:
+            self.model.objects.filter(pk__in=changed).update(
+                updated_at=timezone.now(),
+            )
+        return len(related)
+
+    def remove_labels(self, labels) -> int:
+        """
+        Detach labels from every task.
+        Args:
+            labels: labels to detach
+        Returns:
+            int:
+        """
+        related = TaskLabelRelated.objects.filter(
+            task__in=self.order_by().values('pk'), label__in=labels,
+        )
+        changed = set(related.values_list('task_id', flat=True))
+        deleted, _rows = related.delete()
+        if changed:
+            self.model.objects.filter(pk__in=changed).update(
+                updated_at=timezone.now(),
+            )
+        return deleted
 
 
 class Tasks(models.Model):
@@ -25,6 +129,7 @@ class Tasks(models.Model):
         verbose_name=_('TaskDescription'),
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     status = models.ForeignKey(
         Status,
         related_name='statuses',
@@ -54,6 +159,8 @@ class Tasks(models.Model):
         blank=True,
     )
 
+    objects = TasksQuerySet.as_manager()
+
     def __str__(self) -> str:
         """
         String representation.
@@ -62,12 +169,48 @@ class Tasks(models.Model):
         """
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values) -> 'Tasks':
+        """
+        Load a task remembering its stored creator and executor.
+        Args:
+            db: database alias
+            field_names: loaded fields
+            values: loaded values
+        Returns:
+            Tasks:
+        """
+        instance = super().from_db(db, field_names, values)
+        if {'creator_id', 'executor_id'} <= set(field_names):
+            instance._loaded_users = (  # noqa: WPS437
+                instance.creator_id, instance.executor_id,
+            )
+        return instance
+
     class Meta(object):
         """Meta information."""
 
         verbose_name = _('Task')
         verbose_name_plural = _('Tasks')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='tasks_created_at_idx',
+            ),
+            models.Index(
+                fields=['status', '-created_at', '-id'],
+                name='tasks_status_created_at_idx',
+            ),
+            models.Index(
+                fields=['executor', '-created_at', '-id'],
+                name='tasks_executor_created_at_idx',
+            ),
+            models.Index(
+                fields=['creator', '-created_at', '-id'],
+                name='tasks_creator_created_at_idx',
+            ),
+        ]
 
 
 class TaskLabelRelated(models.Model):
@@ -85,3 +228,140 @@ class TaskLabelRelated(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta(object):
+        """Meta information."""
+
+        indexes = [
+            models.Index(
+                fields=['label', 'task'],
+                name='tasks_label_task_idx',
+            ),
+        ]
+
+
+class TaskChangeManager(models.Manager):
+    """Log of task changes read by incremental sync."""
+
+    chunk_size = 500
+
+    def record(self, pks: Iterable[int], deleted: bool = False) -> None:
+        """
+        Move tasks to the end of the log.
+
+        Earlier entries of the tasks are removed, so the log holds one
+        entry per task ever created and deleted tasks stay as tombstones.
+        Args:
+            pks: changed tasks
+            deleted: whether the tasks were deleted
+        """
+        pks = list(dict.fromkeys(pk for pk in pks if pk is not None))
+        with transaction.atomic(using=self.db):
+            for start in range(0, len(pks), self.chunk_size):
+                chunk = pks[start:start + self.chunk_size]
+                self.filter(task_id__in=chunk).delete()
+                self.bulk_create([
+                    self.model(task_id=pk, deleted=deleted) for pk in chunk
+                ])
+
+
+class TaskChange(models.Model):
+    """Latest change of a task, its id is the sync cursor."""
+
+    task_id = models.BigIntegerField(db_index=True)
+    deleted = models.BooleanField(default=False)
+    logged_at = models.DateTimeField(default=timezone.now)
+
+    objects = TaskChangeManager()
+
+
+class UserTasksCounterManager(models.Manager):
+    """Keep per-user task counters in sync with Tasks."""
+
+    def count_tasks(
+        self, user_ids: Iterable[int],
+    ) -> Dict[int, Tuple[int, int]]:
+        """
+        Count created and assigned tasks of users from the Tasks table.
+        Args:
+            user_ids: users to count
+        Returns:
+            Dict:
+        """
+        user_ids = list(user_ids)
+        counts = {user_id: [0, 0] for user_id in user_ids}
+        for position, field in enumerate(('creator_id', 'executor_id')):
+            rows = Tasks.objects.filter(
+                **{'{field}__in'.format(field=field): user_ids},
+            ).order_by().values(field).annotate(total=Count('id'))
+            for row in rows:
+                counts[row[field]][position] = row['total']
+        return {user_id: tuple(pair) for user_id, pair in counts.items()}
+
+    def refresh(self, user_ids: Iterable[int]) -> None:
+        """
+        Recount counters of users from the Tasks table.
+        Args:
+            user_ids: users to recount
+        """
+        user_ids = {user_id for user_id in user_ids if user_id is not None}
+        if not user_ids:
+            return
+        counters = [
+            self.model(
+                user_id=user_id,
+                created_count=created,
+                assigned_count=assigned,
+            ) for user_id, (created, assigned) in self.count_tasks(
+                user_ids,
+            ).items()
+        ]
+        with transaction.atomic(using=self.db):
+            self.bulk_create(counters, ignore_conflicts=True)
+            self.bulk_update(counters, ['created_count', 'assigned_count'])
+
+    def adjust(self, user_id: int, created: int = 0, assigned: int = 0):
+        """
+        Shift counters of a user, recount when the row is missing.
+        Args:
+            user_id: user
+            created: delta of created tasks
+            assigned: delta of assigned tasks
+        """
+        if user_id is None or not (created or assigned):
+            return
+        updated = self.filter(user_id=user_id).update(
+            created_count=F('created_count') + created,
+            assigned_count=F('assigned_count') + assigned,
+        )
+        if not updated:
+            self.refresh([user_id])
+
+    def for_user(self, user_id: int) -> 'UserTasksCounter':
+        """
+        Get counters of a user, build them on first access.
+        Args:
+            user_id: user
+        Returns:
+            UserTasksCounter:
+        """
+        counter = self.filter(user_id=user_id).first()
+        if counter is None:
+            self.refresh([user_id])
+            counter = self.get(user_id=user_id)
+        return counter
+
+
+class UserTasksCounter(models.Model):
+    """Denormalized number of tasks created by and assigned to a user."""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        primary_key=True,
+        related_name='tasks_counter',
+        on_delete=models.CASCADE,
+    )
+    created_count = models.PositiveIntegerField(default=0)
+    assigned_count = models.PositiveIntegerField(default=0)
+
+    objects = UserTasksCounterManager()
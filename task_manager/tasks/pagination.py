@@ -0,0 +1,223 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404
+from django.utils.translation import gettext as _
+
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+def encode_cursor(direction: str, created_at: datetime, pk: int) -> str:
+    """
+    Encode position of a row into an opaque cursor.
+    Args:
+        direction: FORWARD or BACKWARD
+        created_at: row creation time
+        pk: row primary key
+    Returns:
+        str:
+    """
+    raw = json.dumps([direction, created_at.isoformat(), pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, datetime, int]:
+    """
+    Decode cursor produced by encode_cursor().
+    Args:
+        cursor: opaque cursor
+    Returns:
+        Tuple:
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    padding = '=' * (-len(cursor) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(cursor + padding).decode()
+        direction, created_at, pk = json.loads(raw)
+        created_at = datetime.fromisoformat(created_at)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError('Malformed cursor')
+    if direction not in {FORWARD, BACKWARD}:
+        raise ValueError('Malformed cursor')
+    if not isinstance(pk, int) or isinstance(pk, bool):
+        raise ValueError('Malformed cursor')
+    return direction, created_at, pk
+
+
+class CursorPage(object):
+    """One page of a keyset paginated queryset."""
+
+    is_cursor = True
+
+    def __init__(
+        self,
+        object_list: List[Any],
+        next_cursor: Optional[str],
+        previous_cursor: Optional[str],
+    ):
+        """
+        Init page.
+        Args:
+            object_list: rows of the page
+            next_cursor: cursor of the following page
+            previous_cursor: cursor of the preceding page
+        """
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.next_url = None
+        self.previous_url = None
+
+    def __len__(self) -> int:
+        """
+        Count rows of the page.
+        Returns:
+            int:
+        """
+        return len(self.object_list)
+
+    def __iter__(self):
+        """
+        Iterate rows of the page.
+        Returns:
+            Iterator:
+        """
+        return iter(self.object_list)
+
+    def has_next(self) -> bool:
+        """
+        Check following page exists.
+        Returns:
+            bool:
+        """
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        """
+        Check preceding page exists.
+        Returns:
+            bool:
+        """
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        """
+        Check any other page exists.
+        Returns:
+            bool:
+        """
+        return self.has_next() or self.has_previous()
+
+
+def paginate_by_cursor(queryset, cursor: str, page_size: int) -> CursorPage:
+    """
+    Slice queryset on (created_at, id) without COUNT and OFFSET.
+
+    Any ordering of the queryset is replaced, full-text search results
+    come newest first and not by rank.
+    Args:
+        queryset: queryset to paginate
+        cursor: opaque cursor, empty string for the first page
+        page_size: rows per page
+    Returns:
+        CursorPage:
+    """
+    direction, created_at, pk = FORWARD, None, None
+    if cursor:
+        direction, created_at, pk = decode_cursor(cursor)
+
+    if direction == FORWARD:
+        queryset = queryset.order_by('-created_at', '-id')
+        if created_at is not None:
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at)
+                | Q(created_at=created_at, id__lt=pk),
+            )
+    else:
+        queryset = queryset.order_by('created_at', 'id').filter(
+            Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk),
+        )
+
+    rows = list(queryset[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if direction == BACKWARD:
+        rows.reverse()
+
+    has_next = has_more if direction == FORWARD else True
+    has_previous = created_at is not None if direction == FORWARD else has_more
+    if not rows:
+        return CursorPage(rows, None, None)
+    first, last = rows[0], rows[-1]
+    return CursorPage(
+        rows,
+        encode_cursor(FORWARD, last.created_at, last.pk) if has_next else None,
+        encode_cursor(
+            BACKWARD, first.created_at, first.pk,
+        ) if has_previous else None,
+    )
+
+
+class CursorPaginationMixin(object):
+    """
+    Opt-in keyset pagination for list views ordered by creation time.
+
+    Cursor mode is enabled by the presence of the cursor query parameter
+    (empty for the first page) or globally by TASKS_CURSOR_PAGINATION.
+    Pages are ordered by creation time only, a search ranks its results
+    with page numbers and not with cursors.
+    """
+
+    cursor_query_param = 'cursor'
+
+    def use_cursor_pagination(self) -> bool:
+        """
+        Check cursor mode is requested.
+        Returns:
+            bool:
+        """
+        if self.cursor_query_param in self.request.GET:
+            return True
+        return getattr(settings, 'TASKS_CURSOR_PAGINATION', False)
+
+    def get_cursor_url(self, cursor: str) -> str:
+        """
+        Build url of a page keeping the rest of the query string.
+        Args:
+            cursor: cursor of the page
+        Returns:
+            str:
+        """
+        query = self.request.GET.copy()
+        query.pop(self.page_kwarg, None)
+        query[self.cursor_query_param] = cursor
+        return '?{query}'.format(query=query.urlencode())
+
+    def paginate_queryset(self, queryset, page_size) -> Tuple:
+        """
+        Paginate the queryset by cursor when cursor mode is requested.
+        Args:
+            queryset:
+            page_size:
+        Returns:
+            Tuple:
+        """
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        cursor = self.request.GET.get(self.cursor_query_param, '')
+        try:
+            page = paginate_by_cursor(queryset, cursor, page_size)
+        except ValueError:
+            raise Http404(_('Invalid page.'))
+        if page.has_next():
+            page.next_url = self.get_cursor_url(page.next_cursor)
+        if page.has_previous():
+            page.previous_url = self.get_cursor_url(page.previous_cursor)
+        return None, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,37 @@
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from task_manager.tasks.models import Tasks
+
+
+@receiver(m2m_changed, sender=Tasks.labels.through)
+def touch_relabeled_tasks(
+    sender, instance, action, reverse, pk_set, **kwargs,
+):
+    """
+    Set updated_at of tasks whose labels changed.
+    Args:
+        sender:
+        instance:
+        action:
+        reverse:
+        pk_set:
+        kwargs:
+    """
+    if reverse and action == 'pre_clear':
+        instance._cleared_tasks = list(  # noqa: WPS437
+            sender.objects.filter(label=instance).values_list(
+                'task_id', flat=True,
+            ),
+        )
+        return
+    if action not in {'post_add', 'post_remove', 'post_clear'}:
+        return
+    if not reverse:
+        pks = [instance.pk]
+    elif action == 'post_clear':
+        pks = getattr(instance, '_cleared_tasks', [])
+    else:
+        pks = list(pk_set)
+    if pks:
+        Tasks.objects.filter(pk__in=pks).update(updated_at=timezone.now())
@@ -0,0 +1,232 @@
+"""
+Cache of rendered task rows of the task list.
+
+A row is stored under a key made of the task id and the version stamps of
+the task, its status, creator and executor. Saving or deleting any of them
+sets a new stamp, so the stale fragment is simply never read again.
+
+Stamps must be seen by every worker, the cache is used with a shared cache
+only (SHARED_CACHE). With a local one rows are rendered on every request.
+The receivers at the end of the module set the stamps.
+
+Stamps are set when changes commit on the primary, while the task list may
+read from a replica still behind it. A row rendered from such a replica
+would be stored under the fresh key, so missing rows are rendered from
+tasks read again from default.
+"""
+import hashlib
+import time
+from typing import Dict, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from task_manager.cache_stats import CacheStats
+from task_manager.tasks.signals import tasks_bulk_updated
+
+FRAGMENT_TIMEOUT = 60 * 60 * 24
+TASK = 'task'
+STATUS = 'status'
+USER = 'user'
+
+
+stats = CacheStats('task-row')
+STATS_KEYS = stats.keys
+
+
+def version_key(kind: str, pk) -> str:
+    """
+    Get cache key of a version stamp.
+    Args:
+        kind: TASK, STATUS or USER
+        pk: primary key
+    Returns:
+        str:
+    """
+    return 'task-row:version:{kind}:{pk}'.format(kind=kind, pk=pk)
+
+
+def new_version() -> int:
+    """
+    Get a version stamp never used before.
+    Returns:
+        int:
+    """
+    return time.time_ns()
+
+
+def bump(kind: str, pks: Iterable) -> None:
+    """
+    Invalidate rows depending on the objects.
+    Args:
+        kind: TASK, STATUS or USER
+        pks: primary keys of changed objects
+    """
+    if not settings.SHARED_CACHE:
+        return
+    version = new_version()
+    cache.set_many(
+        {version_key(kind, pk): version for pk in pks},
+        timeout=None,
+    )
+
+
+def get_versions(keys: Iterable[str]) -> Dict[str, int]:
+    """
+    Read version stamps, starting missing ones from a fresh value.
+    Args:
+        keys: version keys
+    Returns:
+        Dict:
+    """
+    keys = set(keys)
+    versions = cache.get_many(keys)
+    missing = keys - versions.keys()
+    if missing:
+        version = new_version()
+        for key in missing:
+            cache.add(key, version, timeout=None)
+        versions.update(cache.get_many(missing))
+    return versions
+
+
+def row_dependencies(task) -> list:
+    """
+    Get version keys the row of a task depends on.
+    Args:
+        task:
+    Returns:
+        list:
+    """
+    keys = [
+        version_key(TASK, task.pk),
+        version_key(STATUS, task.status_id),
+        version_key(USER, task.creator_id),
+    ]
+    if task.executor_id is not None:
+        keys.append(version_key(USER, task.executor_id))
+    return keys
+
+
+def prepare_rows(tasks, language: str) -> None:
+    """
+    Attach cache keys and cached fragments to tasks of a page.
+
+    Costs a few cache round trips for the whole page, not per row. Without
+    a shared cache tasks are left without keys and rendered.
+    Args:
+        tasks: tasks of the page
+        language: active language of the response
+    """
+    if not settings.SHARED_CACHE:
+        return
+    tasks = list(tasks)
+    versions = get_versions(
+        key for task in tasks for key in row_dependencies(task)
+    )
+    for task in tasks:
+        stamp = ':'.join(
+            str(versions.get(key)) for key in row_dependencies(task)
+        )
+        task.row_cache_key = 'task-row:{pk}:{language}:{digest}'.format(
+            pk=task.pk,
+            language=language,
+            digest=hashlib.md5(stamp.encode()).hexdigest(),  # noqa: S303
+        )
+    fragments = cache.get_many([task.row_cache_key for task in tasks])
+    for task in tasks:
+        task.cached_row = fragments.get(task.row_cache_key)
+    stats.record(hits=len(fragments), misses=len(tasks) - len(fragments))
+    read_missing_from_primary([
+        task for task in tasks
+        if task.cached_row is None and task._state.db != DEFAULT_DB_ALIAS
+    ])
+
+
+def read_missing_from_primary(tasks: list) -> None:
+    """
+    Attach tasks read from default to tasks read from a replica.
+
+    The stamps of a key are at least as new as default, so the row stored
+    under it is rendered from default too. Tasks deleted there meanwhile
+    are rendered as read, without storing the row.
+    Args:
+        tasks: tasks of missing rows read from a replica
+    """
+    if not tasks:
+        return
+    model = type(tasks[0])
+    primary_tasks = model.objects.using(DEFAULT_DB_ALIAS).select_related(
+        'status', 'executor', 'creator',
+    ).in_bulk([task.pk for task in tasks])
+    for task in tasks:
+        task.row_source = primary_tasks.get(task.pk)
+        if task.row_source is None:
+            task.row_cache_key = None
+
+
+def store_row(task, fragment: str) -> None:
+    """
+    Store rendered row of a task.
+    Args:
+        task:
+        fragment: rendered html
+    """
+    cache.set(task.row_cache_key, fragment, FRAGMENT_TIMEOUT)
+
+
+@receiver(post_save, sender='tasks.Tasks')
+@receiver(post_delete, sender='tasks.Tasks')
+def expire_task_row(sender, instance, **kwargs):
+    """
+    Expire cached row of a changed task.
+    Args:
+        sender:
+        instance:
+        kwargs:
+    """
+    bump(TASK, [instance.pk])
+
+
+@receiver(tasks_bulk_updated)
+def expire_bulk_updated_task_rows(sender, pks, **kwargs):
+    """
+    Expire cached rows of bulk updated tasks.
+    Args:
+        sender:
+        pks:
+        kwargs:
+    """
+    bump(TASK, pks)
+
+
+@receiver(post_save, sender='statuses.Status')
+@receiver(post_delete, sender='statuses.Status')
+def expire_status_rows(sender, instance, **kwargs):
+    """
+    Expire cached rows showing a changed status.
+    Args:
+        sender:
+        instance:
+        kwargs:
+    """
+    bump(STATUS, [instance.pk])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def expire_user_rows(sender, instance, **kwargs):
+    """
+    Expire cached rows showing a changed user.
+
+    Login only touches last_login which rows do not show.
+    Args:
+        sender:
+        instance:
+        kwargs:
+    """
+    if kwargs.get('update_fields') == frozenset(('last_login',)):
+        return
+    bump(USER, [instance.pk])
@@ -0,0 +1,239 @@
+"""
+Full-text search over task name and description.
+
+PostgreSQL keeps a generated ``search_vector`` tsvector column with a GIN
+index. SQLite keeps the ``tasks_tasks_fts`` FTS5 shadow table which is
+updated incrementally by the receivers below on Tasks writes. Other
+backends and SQLite builds without FTS5 fall back to icontains lookups.
+"""
+import re
+from typing import Iterable, List, Optional
+
+from django.db import connections, router
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from task_manager.tasks.signals import tasks_bulk_created, tasks_bulk_updated
+
+FTS_TABLE = 'tasks_tasks_fts'
+TASKS = 'tasks.Tasks'
+POSTGRES = 'postgresql'
+FTS5 = 'fts5'
+
+_backends = {}
+
+
+def search_backend(using: str) -> Optional[str]:
+    """
+    Get search backend available on a database.
+    Args:
+        using: database alias
+    Returns:
+        Optional:
+    """
+    if using not in _backends:
+        connection = connections[using]
+        backend = None
+        if connection.vendor == 'postgresql':
+            backend = POSTGRES
+        elif connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA compile_options')
+                options = {row[0] for row in cursor.fetchall()}
+            if 'ENABLE_FTS5' in options:
+                backend = FTS5
+        _backends[using] = backend
+    return _backends[using]
+
+
+def tokenize(query: str) -> List[str]:
+    """
+    Split user input into words safe for any query syntax.
+    Args:
+        query: user input
+    Returns:
+        List:
+    """
+    return re.findall(r'\w+', query)
+
+
+def search_tasks(queryset, query: str):
+    """
+    Filter tasks matching every word of the query, best first.
+
+    The last word is matched by prefix to support search as you type.
+    Args:
+        queryset: tasks queryset
+        query: user input
+    Returns:
+        QuerySet:
+    """
+    words = tokenize(query)
+    if not words:
+        return queryset
+    backend = search_backend(queryset.db)
+    if backend == FTS5:
+        match = ' '.join('"{word}"'.format(word=word) for word in words)
+        match = '{match}*'.format(match=match)
+        return queryset.extra(
+            select={'search_rank': 'bm25({fts}, 10.0, 1.0)'.format(
+                fts=FTS_TABLE,
+            )},
+            tables=[FTS_TABLE],
+            where=[
+                '{fts}.rowid = tasks_tasks.id'.format(fts=FTS_TABLE),
+                '{fts} MATCH %s'.format(fts=FTS_TABLE),
+            ],
+            params=[match],
+            order_by=['search_rank'],
+        )
+    if backend == POSTGRES:
+        ts_query = '{words}:*'.format(words=' & '.join(words))
+        return queryset.extra(
+            select={
+                'search_rank': (
+                    "ts_rank(tasks_tasks.search_vector, "
+                    "to_tsquery('simple', %s))"
+                ),
+            },
+            select_params=[ts_query],
+            where=[
+                "tasks_tasks.search_vector @@ to_tsquery('simple', %s)",
+            ],
+            params=[ts_query],
+            order_by=['-search_rank'],
+        )
+    for word in words:
+        queryset = queryset.filter(
+            Q(name__icontains=word) | Q(description__icontains=word),
+        )
+    return queryset
+
+
+def index_tasks(tasks: Iterable, using: str) -> None:
+    """
+    Add or replace tasks in the SQLite shadow table.
+    Args:
+        tasks: tasks to index
+        using: database alias
+    """
+    if search_backend(using) != FTS5:
+        return
+    rows = [(task.pk, task.name, task.description) for task in tasks]
+    if not rows:
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            'DELETE FROM {fts} WHERE rowid = %s'.format(fts=FTS_TABLE),
+            [(row[0],) for row in rows],
+        )
+        cursor.executemany(
+            'INSERT INTO {fts} (rowid, name, description) '
+            'VALUES (%s, %s, %s)'.format(fts=FTS_TABLE),
+            rows,
+        )
+
+
+def unindex_tasks(pks: Iterable[int], using: str) -> None:
+    """
+    Remove tasks from the SQLite shadow table.
+    Args:
+        pks: primary keys of tasks
+        using: database alias
+    """
+    if search_backend(using) != FTS5:
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            'DELETE FROM {fts} WHERE rowid = %s'.format(fts=FTS_TABLE),
+            [(pk,) for pk in pks],
+        )
+
+
+def rebuild_index(using: str) -> None:
+    """
+    Fill the SQLite shadow table from scratch.
+    Args:
+        using: database alias
+    """
+    if search_backend(using) != FTS5:
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute('DELETE FROM {fts}'.format(fts=FTS_TABLE))
+        cursor.execute(
+            'INSERT INTO {fts} (rowid, name, description) '
+            'SELECT id, name, description FROM tasks_tasks'.format(
+                fts=FTS_TABLE,
+            ),
+        )
+
+
+@receiver(post_save, sender=TASKS)
+def index_saved_task(sender, instance, using, **kwargs):
+    """
+    Reindex saved task for full-text search.
+    Args:
+        sender:
+        instance:
+        using:
+        kwargs:
+    """
+    index_tasks([instance], using)
+
+
+@receiver(post_delete, sender=TASKS)
+def unindex_deleted_task(sender, instance, using, **kwargs):
+    """
+    Remove deleted task from full-text search.
+    Args:
+        sender:
+        instance:
+        using:
+        kwargs:
+    """
+    unindex_tasks([instance.pk], using)
+
+
+@receiver(tasks_bulk_created)
+def index_bulk_created_tasks(sender, objs, **kwargs):
+    """
+    Index bulk inserted tasks for full-text search.
+    Args:
+        sender:
+        objs:
+        kwargs:
+    """
+    using = router.db_for_write(sender)
+    index_tasks([task for task in objs if task.pk is not None], using)
+    names = [task.name for task in objs if task.pk is None]
+    chunk_size = 500
+    for start in range(0, len(names), chunk_size):
+        index_tasks(
+            sender.objects.using(using).filter(
+                name__in=names[start:start + chunk_size],
+            ).only('name', 'description'),
+            using,
+        )
+
+
+@receiver(tasks_bulk_updated)
+def index_bulk_updated_tasks(sender, pks, values, **kwargs):
+    """
+    Reindex bulk updated tasks when searchable fields change.
+    Args:
+        sender:
+        pks:
+        values:
+        kwargs:
+    """
+    if not {'name', 'description'} & values.keys():
+        return
+    using = router.db_for_write(sender)
+    chunk_size = 500
+    for start in range(0, len(pks), chunk_size):
+        index_tasks(
+            sender.objects.using(using).filter(
+                pk__in=pks[start:start + chunk_size],
+            ).only('name', 'description'),
+            using,
+        )
@@ -0,0 +1,676 @@
+"""
+Synthetic datasets of users, statuses, labels and tasks.
+
+Rows are generated from a seed, so the same options give the same rows.
+Names carry a prefix, a dataset can be added to a database holding other
+data. Primary keys are assigned from the largest existing one, and rows are
+written with batched INSERTs, COPY on PostgreSQL, bypassing the ORM and
+its signals. Indexes of tasks are dropped for the load and built again at
+its end. What the receivers of Tasks keep up to date is written
+afterwards in bulk: user task counters, the sync log and the SQLite search
+index. Change stamps and the lookup cache are bumped at the end.
+
+Skew of statuses, executors and labels is the exponent of a Zipf-like
+distribution, the n-th row is picked with weight 1 / n ** skew. Zero picks
+rows uniformly.
+"""
+import csv
+import datetime
+import io
+import random
+from collections import Counter
+from contextlib import contextmanager
+from functools import partial
+from itertools import accumulate
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+)
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max
+from task_manager import lookup_cache
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks import conditional, search
+from task_manager.tasks.models import (
+    TaskChange,
+    TaskLabelRelated,
+    Tasks,
+    UserTasksCounter,
+)
+
+PREFIX = 'loadtest'
+PASSWORD = 'loadtest-password'
+END = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+NAME = '{prefix}-{kind}-{index:07d}'
+SQLITE_CACHE_KIB = 256 * 1024
+DESCRIPTIONS = 4096
+WORDS = (
+    'fix', 'add', 'update', 'remove', 'review', 'deploy', 'test', 'write',
+    'report', 'migrate', 'design', 'check', 'page', 'form', 'server',
+    'database', 'cache', 'login', 'search', 'export', 'import', 'label',
+    'status', 'user', 'release', 'bug', 'docs', 'api', 'build', 'config',
+)
+USER_COLUMNS = (
+    'id', 'password', 'last_login', 'is_superuser', 'username',
+    'first_name', 'last_name', 'email', 'is_staff', 'is_active',
+    'date_joined',
+)
+TASK_COLUMNS = (
+    'id', 'name', 'description', 'created_at', 'updated_at', 'status_id',
+    'creator_id', 'executor_id',
+)
+LINK_COLUMNS = ('id', 'task_id', 'label_id', 'created_at', 'updated_at')
+
+
+class Dataset(object):
+    """Primary keys of a seeded dataset."""
+
+    def __init__(
+        self,
+        token: str,
+        usernames: List[str],
+        statuses: Sequence[int],
+        labels: Sequence[int],
+        tasks: Sequence[int],
+    ):
+        """
+        Init dataset.
+        Args:
+            token: prefix of the row names
+            usernames: users, all with PASSWORD
+            statuses: status ids
+            labels: label ids
+            tasks: task ids
+        """
+        self.token = token
+        self.usernames = usernames
+        self.statuses = statuses
+        self.labels = labels
+        self.tasks = tasks
+
+    def sizes(self) -> dict:
+        """
+        Get the number of rows of each kind.
+        Returns:
+            dict:
+        """
+        return {
+            'users': len(self.usernames),
+            'statuses': len(self.statuses),
+            'labels': len(self.labels),
+            'tasks': len(self.tasks),
+        }
+
+
+def zipf_weights(size: int, skew: float) -> List[float]:
+    """
+    Get cumulative weights picking the n-th of size rows by 1 / n ** skew.
+    Args:
+        size: number of rows
+        skew: exponent, 0 for uniform
+    Returns:
+        List:
+    """
+    return list(accumulate(
+        1 / (rank ** skew) for rank in range(1, size + 1)
+    ))
+
+
+def insert_rows(
+    model,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    using: str = DEFAULT_DB_ALIAS,
+    batch_size: Optional[int] = None,
+) -> int:
+    """
+    Write rows of database values, COPY on PostgreSQL.
+
+    Other backends run one INSERT over batches of rows, their drivers loop
+    over the parameters without a round trip to Python per row.
+    Args:
+        model: model of the table
+        columns: column names of the values
+        rows: tuples of values
+        using: database alias
+        batch_size: rows per INSERT
+    Returns:
+        int: number of rows
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)  # noqa: WPS437
+    column_list = ', '.join(quote(column) for column in columns)
+    rows = list(rows)
+    if not rows:
+        return 0
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(
+                [_copy_value(value) for value in row] for row in rows
+            )
+            buffer.seek(0)
+            cursor.copy_expert(
+                'COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)'.format(
+                    table=table, columns=column_list,
+                ),
+                buffer,
+            )
+            return len(rows)
+        batch_size = batch_size or len(rows)
+        sql = 'INSERT INTO {table} ({columns}) VALUES ({values})'.format(
+            table=table,
+            columns=column_list,
+            values=', '.join(['%s'] * len(columns)),
+        )
+        for start in range(0, len(rows), batch_size):
+            cursor.executemany(sql, rows[start:start + batch_size])
+    return len(rows)
+
+
+def _copy_value(value) -> Any:
+    """
+    Encode a value for COPY in CSV format, where an empty field is NULL.
+    Args:
+        value:
+    Returns:
+        Any:
+    """
+    if value is None:
+        return ''
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def next_id(model, using: str) -> int:
+    """
+    Get the primary key after the largest one.
+    Args:
+        model:
+        using: database alias
+    Returns:
+        int:
+    """
+    largest = model.objects.using(using).aggregate(largest=Max('pk'))
+    return (largest['largest'] or 0) + 1
+
+
+class Seeder(object):
+    """Generator of a dataset."""
+
+    def __init__(  # noqa: WPS211
+        self,
+        users: int = 1000,
+        statuses: int = 5,
+        labels: int = 50,
+        tasks: int = 100000,
+        labels_per_task: Sequence[int] = (0, 3),
+        status_skew: float = 1.0,
+        executor_skew: float = 1.0,
+        label_skew: float = 1.0,
+        unassigned: float = 0.1,
+        days: int = 365,
+        end: datetime.datetime = END,
+        seed: int = 0,
+        prefix: str = 'seed',
+        chunk_size: int = 50000,
+        defer_indexes: bool = True,
+        using: str = DEFAULT_DB_ALIAS,
+    ):
+        """
+        Init seeder.
+        Args:
+            users: number of users, creators and executors of the tasks
+            statuses: number of statuses
+            labels: number of labels
+            tasks: number of tasks
+            labels_per_task: smallest and largest number of labels of a task
+            status_skew: skew of statuses of tasks
+            executor_skew: skew of tasks per executor
+            label_skew: skew of labels of tasks
+            unassigned: share of tasks without executor
+            days: tasks are created within this many days before end
+            end: time of the latest task
+            seed: seed of the generator
+            prefix: prefix of the row names
+            chunk_size: tasks generated and written at once
+            defer_indexes: build indexes of tasks after the load, worth it
+                unless the tables hold much more than the load
+            using: database alias
+        """
+        self.users = users
+        self.statuses = statuses
+        self.labels = labels
+        self.tasks = tasks
+        self.labels_per_task = (
+            min(labels_per_task[0], labels), min(labels_per_task[1], labels),
+        )
+        self.status_skew = status_skew
+        self.executor_skew = executor_skew
+        self.label_skew = label_skew
+        self.unassigned = unassigned
+        self.days = days
+        self.end = end.astimezone(datetime.timezone.utc)
+        self.seed = seed
+        self.prefix = prefix
+        self.chunk_size = chunk_size
+        self.defer_indexes = defer_indexes
+        self.using = using
+        self.sqlite = connections[using].vendor == 'sqlite'
+
+    def name(self, kind: str, index: int) -> str:
+        """
+        Get the name of a row.
+        Args:
+            kind: user, status, label or task
+            index: number of the row
+        Returns:
+            str:
+        """
+        return NAME.format(prefix=self.prefix, kind=kind, index=index)
+
+    def exists(self) -> bool:
+        """
+        Check rows of the prefix were seeded before.
+        Returns:
+            bool:
+        """
+        return get_user_model().objects.using(self.using).filter(
+            username=self.name('user', 0),
+        ).exists() or Status.objects.using(self.using).filter(
+            name=self.name('status', 0),
+        ).exists()
+
+    def run(self, progress: Optional[Callable[[str, int], None]] = None):
+        """
+        Write the dataset in one transaction.
+        Args:
+            progress: called with a table and the number of rows written
+        Returns:
+            Dataset:
+        """
+        progress = progress or (lambda _table, _count: None)
+        rng = random.Random(self.seed)
+        with self.page_cache(), transaction.atomic(using=self.using):
+            user_ids = self.write_users(progress)
+            status_ids = self.write_lookups(Status, 'status', self.statuses)
+            progress('statuses', len(status_ids))
+            label_ids = self.write_lookups(Label, 'label', self.labels)
+            progress('labels', len(label_ids))
+            with self.deferred_indexes(Tasks, TaskLabelRelated, TaskChange):
+                task_ids = self.write_tasks(
+                    rng, user_ids, status_ids, label_ids, progress,
+                )
+            self.reset_sequences()
+        lookup_cache.for_model(Status).bump()
+        lookup_cache.for_model(Label).bump()
+        conditional.touch(conditional.LOOKUPS, conditional.TASKS)
+        return Dataset(
+            self.prefix,
+            [self.name('user', index) for index in range(self.users)],
+            status_ids,
+            label_ids,
+            task_ids,
+        )
+
+    @contextmanager
+    def page_cache(self) -> Iterator[None]:
+        """
+        Give SQLite a page cache holding the indexes being filled.
+
+        The default cache of 2 MiB makes index updates of a large load
+        read and write the same pages over and over.
+        Yields:
+            None:
+        """
+        connection = connections[self.using]
+        if connection.vendor != 'sqlite':
+            yield
+            return
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            previous = cursor.fetchone()[0]
+            cursor.execute('PRAGMA cache_size = -{size}'.format(
+                size=SQLITE_CACHE_KIB,
+            ))
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA cache_size = {size}'.format(
+                    size=int(previous),
+                ))
+
+    @contextmanager
+    def deferred_indexes(self, *models) -> Iterator[None]:
+        """
+        Drop indexes of models and build them again after the load.
+
+        Building an index from all rows at once is much faster than
+        updating it row by row. Both run in the transaction of the load,
+        unique constraints are kept.
+        Args:
+            models:
+        Yields:
+            None:
+        """
+        connection = connections[self.using]
+        if not self.defer_indexes:
+            yield
+            return
+        editor = connection.schema_editor()
+        statements = [
+            (model, statement)
+            for model in models
+            for statement in editor._model_indexes_sql(model)  # noqa: WPS437
+        ]
+        with connection.cursor() as cursor:
+            for model, statement in statements:
+                cursor.execute(str(editor._delete_index_sql(  # noqa: WPS437
+                    model, str(statement.parts['name']).strip('"'),
+                )))
+        yield
+        with connection.cursor() as cursor:
+            for _model, statement in statements:
+                cursor.execute(str(statement))
+
+    def write_users(self, progress) -> range:
+        """
+        Write users sharing one password hash.
+        Args:
+            progress:
+        Returns:
+            range: user ids
+        """
+        user_model = get_user_model()
+        first = next_id(user_model, self.using)
+        password = make_password(PASSWORD)
+        joined = self.adapt(self.end - datetime.timedelta(days=self.days))
+        insert_rows(user_model, USER_COLUMNS, (
+            (
+                first + index, password, None, False,
+                self.name('user', index), 'First{index}'.format(index=index),
+                'Last{index}'.format(index=index), '', False, True, joined,
+            )
+            for index in range(self.users)
+        ), self.using)
+        progress('users', self.users)
+        return range(first, first + self.users)
+
+    def write_lookups(self, model, kind: str, count: int) -> range:
+        """
+        Write statuses or labels.
+        Args:
+            model: Status or Label
+            kind: status or label
+            count: number of rows
+        Returns:
+            range: ids
+        """
+        first = next_id(model, self.using)
+        created = self.adapt(self.end - datetime.timedelta(days=self.days))
+        insert_rows(model, ('id', 'name', 'created_at'), (
+            (first + index, self.name(kind, index), created)
+            for index in range(count)
+        ), self.using)
+        return range(first, first + count)
+
+    def write_tasks(  # noqa: WPS211
+        self, rng, user_ids, status_ids, label_ids, progress,
+    ) -> range:
+        """
+        Write tasks, their labels and what receivers of tasks keep.
+
+        Tasks are generated oldest first, so ids, names and creation times
+        grow together and the indexes of the table are appended to.
+        Args:
+            rng: random generator
+            user_ids: ids of users
+            status_ids: ids of statuses
+            label_ids: ids of labels
+            progress:
+        Returns:
+            range: task ids
+        """
+        first = next_id(Tasks, self.using)
+        link_id = next_id(TaskLabelRelated, self.using)
+        status_weights = zipf_weights(len(status_ids), self.status_skew)
+        executor_weights = zipf_weights(len(user_ids), self.executor_skew)
+        label_weights = zipf_weights(len(label_ids), self.label_skew)
+        created, assigned = Counter(), Counter()
+        span = self.days * 86400
+        origin = self.end - datetime.timedelta(seconds=span)
+        if self.sqlite:
+            origin = origin.replace(tzinfo=None)
+        task_name = partial(NAME.format, prefix=self.prefix, kind='task')
+        descriptions = [
+            ' '.join(rng.choices(WORDS, k=rng.randint(3, 8)))
+            for _index in range(DESCRIPTIONS)
+        ]
+        for start in range(0, self.tasks, self.chunk_size):
+            size = min(self.chunk_size, self.tasks - start)
+            pks = range(first + start, first + start + size)
+            statuses = rng.choices(
+                status_ids, cum_weights=status_weights, k=size,
+            )
+            executors = rng.choices(
+                user_ids, cum_weights=executor_weights, k=size,
+            )
+            creators = rng.choices(user_ids, k=size)
+            stamps = [
+                origin + datetime.timedelta(seconds=second)
+                for second in sorted(
+                    span * (start + rng.random() * size) / self.tasks
+                    for _index in range(size)
+                )
+            ]
+            if self.sqlite:
+                stamps = [str(stamp) for stamp in stamps]
+            texts = rng.choices(descriptions, k=size)
+            labels = self.pick_labels(rng, label_ids, label_weights, size)
+            tasks, links = [], []
+            for offset, pk in enumerate(pks):
+                executor = executors[offset]
+                if rng.random() < self.unassigned:
+                    executor = None
+                created[creators[offset]] += 1
+                assigned[executor] += 1
+                stamp = stamps[offset]
+                tasks.append((
+                    pk, task_name(index=start + offset), texts[offset],
+                    stamp, stamp, statuses[offset], creators[offset],
+                    executor,
+                ))
+                for label_id in labels[offset]:
+                    links.append((link_id, pk, label_id, stamp, stamp))
+                    link_id += 1
+            insert_rows(Tasks, TASK_COLUMNS, tasks, self.using)
+            insert_rows(TaskLabelRelated, LINK_COLUMNS, links, self.using)
+            progress('tasks', start + size)
+        self.log(first, first + self.tasks)
+        self.index(first, first + self.tasks)
+        insert_rows(
+            UserTasksCounter,
+            ('user_id', 'created_count', 'assigned_count'),
+            (
+                (user_id, created[user_id], assigned[user_id])
+                for user_id in user_ids
+            ),
+            self.using,
+        )
+        return range(first, first + self.tasks)
+
+    def pick_labels(self, rng, label_ids, weights, size) -> List[List[int]]:
+        """
+        Pick distinct labels of tasks.
+
+        Labels are drawn for all tasks at once, a task takes drawn labels
+        until it has its number of them, skipping repeats.
+        Args:
+            rng: random generator
+            label_ids:
+            weights: cumulative weights of labels
+            size: number of tasks
+        Returns:
+            List:
+        """
+        low, high = self.labels_per_task
+        counts = rng.choices(range(low, high + 1), k=size)
+        draws = iter(rng.choices(
+            label_ids, cum_weights=weights, k=sum(counts) * 2,
+        ))
+        picked = []
+        for count in counts:
+            labels: Dict[int, None] = {}
+            for label_id in draws:
+                labels[label_id] = None
+                if len(labels) >= count:
+                    break
+            for label_id in label_ids:
+                if len(labels) >= count:
+                    break
+                labels[label_id] = None
+            picked.append(list(labels)[:count])
+        return picked
+
+    def adapt(self, value: datetime.datetime) -> Any:
+        """
+        Convert a time to its database value.
+
+        SQLite takes naive UTC time as text, like Django stores it, tasks
+        convert their times the same way in bulk.
+        Args:
+            value:
+        Returns:
+            Any:
+        """
+        if self.sqlite:
+            return str(value.replace(tzinfo=None))
+        return value
+
+    def log(self, first: int, end: int):
+        """
+        Add new tasks to the sync log in the order of their ids.
+        Args:
+            first: first task id
+            end: id after the last task
+        """
+        quote = connections[self.using].ops.quote_name
+        logged_at = self.adapt(datetime.datetime.now(datetime.timezone.utc))
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO {log} ({task_id}, {deleted}, {logged_at}) '
+                'SELECT id, %s, %s FROM {tasks} WHERE id >= %s AND id < %s '
+                'ORDER BY id'.format(
+                    log=quote(TaskChange._meta.db_table),  # noqa: WPS437
+                    task_id=quote('task_id'),
+                    deleted=quote('deleted'),
+                    logged_at=quote('logged_at'),
+                    tasks=quote(Tasks._meta.db_table),  # noqa: WPS437
+                ),
+                [False, logged_at, first, end],
+            )
+
+    def index(self, first: int, end: int):
+        """
+        Add new tasks to the SQLite search index.
+        Args:
+            first: first task id
+            end: id after the last task
+        """
+        if search.search_backend(self.using) != search.FTS5:
+            return
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO {fts} (rowid, name, description) '
+                'SELECT id, name, description FROM tasks_tasks '
+                'WHERE id >= %s AND id < %s'.format(fts=search.FTS_TABLE),
+                [first, end],
+            )
+
+    def reset_sequences(self):
+        """Move sequences past the assigned primary keys."""
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(no_style(), [
+            get_user_model(), Status, Label, Tasks, TaskLabelRelated,
+        ])
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+def seed_dataset(  # noqa: WPS211
+    users: int = 20,
+    statuses: int = 5,
+    labels: int = 20,
+    tasks: int = 1000,
+    labels_per_task: int = 2,
+    seed: int = 0,
+) -> Dataset:
+    """
+    Seed a dataset for a load test under a new prefix.
+    Args:
+        users: number of users
+        statuses: number of statuses
+        labels: number of labels
+        tasks: number of tasks
+        labels_per_task: labels of every task, at most labels
+        seed: seed of the generator
+    Returns:
+        Dataset:
+    """
+    prefix = '{prefix}-{token}'.format(
+        prefix=PREFIX, token=random.SystemRandom().getrandbits(32),
+    )
+    return Seeder(
+        users=users,
+        statuses=statuses,
+        labels=labels,
+        tasks=tasks,
+        labels_per_task=(labels_per_task, labels_per_task),
+        status_skew=0,
+        executor_skew=0,
+        label_skew=0,
+        unassigned=0,
+        end=datetime.datetime.now(datetime.timezone.utc),
+        seed=seed,
+        prefix=prefix,
+        defer_indexes=False,
+    ).run()
+
+
+def find_dataset() -> Dataset:
+    """
+    Get rows of datasets seeded before for load tests.
+    Returns:
+        Dataset:
+    """
+    prefix = '{prefix}-'.format(prefix=PREFIX)
+    return Dataset(
+        '',
+        list(get_user_model().objects.filter(
+            username__startswith=prefix,
+        ).values_list('username', flat=True)),
+        list(Status.objects.filter(
+            name__startswith=prefix,
+        ).values_list('pk', flat=True)),
+        list(Label.objects.filter(
+            name__startswith=prefix,
+        ).values_list('pk', flat=True)),
+        list(Tasks.objects.filter(
+            name__startswith=prefix,
+        ).values_list('pk', flat=True)),
+    )
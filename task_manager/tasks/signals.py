@@ -0,0 +1,31 @@
+from django.dispatch import Signal
+
+# Sent by TasksQuerySet.bulk_create() with `objs`, the inserted tasks.
+tasks_bulk_created = Signal()
+
+# Sent by TasksQuerySet.update() with `pks` of the updated tasks, `values`
+# passed to update() and `user_ids` of creators and executors before the
+# update when one of the user fields changes.
+tasks_bulk_updated = Signal()
+
+
+def created_pks(model, objs, chunk_size=500):
+    """
+    Get ids of tasks sent by tasks_bulk_created.
+
+    Backends not returning ids from bulk inserts leave them unset, those
+    are looked up by name.
+    Args:
+        model:
+        objs:
+        chunk_size:
+    Returns:
+        list:
+    """
+    pks = [task.pk for task in objs if task.pk is not None]
+    names = [task.name for task in objs if task.pk is None]
+    for start in range(0, len(names), chunk_size):
+        pks.extend(model.objects.filter(
+            name__in=names[start:start + chunk_size],
+        ).order_by('created_at', 'id').values_list('pk', flat=True))
+    return pks
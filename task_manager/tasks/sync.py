@@ -0,0 +1,159 @@
+"""
+Incremental sync of tasks.
+
+Every save, bulk write, label change and deletion of a task moves the task
+to the end of the TaskChange log, deleted tasks stay there as tombstones;
+the receivers at the end of the module write it.
+A client passes the cursor of its previous response and gets tasks changed
+after it: a range scan of the log primary key, then the current rows of
+the changed tasks. Statuses, labels and users are sent by id, so renaming
+them does not resend tasks.
+
+Log ids are taken when a change is written, not when it commits. On
+PostgreSQL a transaction holding a lower id may commit after one holding
+a higher id, a cursor past the higher id would skip the change. Changes
+logged within SYNC_LAG_SECONDS are therefore held back, with everything
+after them. A change is sent unless its transaction commits later than
+SYNC_LAG_SECONDS after logging it; workers are expected to keep their
+clocks in sync.
+"""
+import datetime
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from task_manager.tasks.models import TaskChange, TaskLabelRelated, Tasks
+from task_manager.tasks.signals import (
+    created_pks,
+    tasks_bulk_created,
+    tasks_bulk_updated,
+)
+
+FIELDS = (
+    'id',
+    'name',
+    'description',
+    'status_id',
+    'creator_id',
+    'executor_id',
+    'created_at',
+    'updated_at',
+)
+
+
+def changes_since(cursor: int, limit: int) -> Dict[str, Any]:
+    """
+    Get tasks changed and deleted after a cursor.
+
+    Changes from the first one logged within SYNC_LAG_SECONDS on are left
+    for a later call, more is false then.
+    Args:
+        cursor: id of the last change the client has seen
+        limit: changes read at most
+    Returns:
+        Dict: next cursor, whether more changes wait, tasks and deleted ids
+    """
+    settled = timezone.now() - datetime.timedelta(
+        seconds=settings.SYNC_LAG_SECONDS,
+    )
+    changes = list(
+        TaskChange.objects.filter(pk__gt=cursor).order_by('pk').values_list(
+            'pk', 'task_id', 'deleted', 'logged_at',
+        )[:limit + 1],
+    )
+    ready = next(
+        (
+            index for index, change in enumerate(changes)
+            if change[3] > settled
+        ),
+        len(changes),
+    )
+    more = ready > limit
+    changes = changes[:min(ready, limit)]
+    latest = {task_id: deleted for _pk, task_id, deleted, _at in changes}
+    deleted = [task_id for task_id, gone in latest.items() if gone]
+    return {
+        'cursor': changes[-1][0] if changes else cursor,
+        'more': more,
+        'tasks': _rows_of([
+            task_id for task_id, gone in latest.items() if not gone
+        ]),
+        'deleted': deleted,
+    }
+
+
+def _rows_of(pks: List[int]) -> List[Dict[str, Any]]:
+    """
+    Read tasks with their label ids in two queries.
+
+    A task deleted after its change was logged is skipped, its tombstone
+    comes later in the log.
+    Args:
+        pks: primary keys of tasks in log order
+    Returns:
+        List:
+    """
+    if not pks:
+        return []
+    rows = {
+        row['id']: row
+        for row in Tasks.objects.filter(pk__in=pks).values(*FIELDS)
+    }
+    for row in rows.values():
+        row['labels'] = []
+    related = TaskLabelRelated.objects.filter(task_id__in=rows).order_by(
+        'label_id',
+    ).values_list('task_id', 'label_id')
+    for task_id, label_id in related:
+        rows[task_id]['labels'].append(label_id)
+    return [rows[pk] for pk in pks if pk in rows]
+
+
+@receiver(post_save, sender=Tasks)
+def log_saved_task(sender, instance, **kwargs):
+    """
+    Log a created or updated task for incremental sync.
+    Args:
+        sender:
+        instance:
+        kwargs:
+    """
+    TaskChange.objects.record([instance.pk])
+
+
+@receiver(post_delete, sender=Tasks)
+def log_deleted_task(sender, instance, **kwargs):
+    """
+    Leave a tombstone of a deleted task.
+    Args:
+        sender:
+        instance:
+        kwargs:
+    """
+    TaskChange.objects.record([instance.pk], deleted=True)
+
+
+@receiver(tasks_bulk_created)
+def log_bulk_created_tasks(sender, objs, **kwargs):
+    """
+    Log bulk inserted tasks.
+    Args:
+        sender:
+        objs:
+        kwargs:
+    """
+    TaskChange.objects.record(created_pks(sender, objs))
+
+
+@receiver(tasks_bulk_updated)
+def log_bulk_updated_tasks(sender, pks, **kwargs):
+    """
+    Log bulk updated tasks, label changes included.
+    Args:
+        sender:
+        pks:
+        kwargs:
+    """
+    TaskChange.objects.record(pks)
@@ -0,0 +1,63 @@
+from django import template
+from task_manager.tasks import row_cache
+
+register = template.Library()
+
+
+class TaskRowNode(template.Node):
+    """Render a task row once and serve it from the cache afterwards."""
+
+    def __init__(self, task, nodelist):
+        """
+        Init node.
+        Args:
+            task: filter expression resolving to the task
+            nodelist: nodes of the row
+        """
+        self.task = task
+        self.nodelist = nodelist
+        self.name = task.token
+
+    def render(self, context) -> str:
+        """
+        Render cached fragment or the row itself.
+        Args:
+            context:
+        Returns:
+            str:
+        """
+        task = self.task.resolve(context)
+        if getattr(task, 'row_cache_key', None) is None:
+            return self.nodelist.render(context)
+        if task.cached_row is not None:
+            return task.cached_row
+        with context.push({self.name: getattr(task, 'row_source', task)}):
+            fragment = self.nodelist.render(context)
+        row_cache.store_row(task, fragment)
+        return fragment
+
+
+@register.tag(name='cache_task_row')
+def cache_task_row(parser, token) -> TaskRowNode:
+    """
+    Cache rendered row of a task prepared by row_cache.prepare_rows().
+
+    Usage: {% cache_task_row task %}<tr>...</tr>{% endcache_task_row %}
+    The task is given as a variable, rows read again from default are
+    rendered under its name.
+    Args:
+        parser:
+        token:
+    Returns:
+        TaskRowNode:
+    Raises:
+        TemplateSyntaxError: if the task is not given
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(
+            '{tag} tag requires a task'.format(tag=bits[0]),
+        )
+    nodelist = parser.parse(('endcache_task_row',))
+    parser.delete_first_token()
+    return TaskRowNode(parser.compile_filter(bits[1]), nodelist)
@@ -1,15 +1,29 @@
 from django.urls import path
 from task_manager.tasks.views import (
+    TaskBulkActionView,
     TaskCreateView,
     TaskDeleteView,
     TaskDetailView,
+    TaskEventsView,
+    TaskExportView,
+    TaskImportView,
     TaskListView,
+    TaskSyncView,
     TaskUpdateView,
 )
 
 urlpatterns = [
     path('', TaskListView.as_view(), name='tasks'),
     path('create/', TaskCreateView.as_view(), name='create_task'),
+    path('bulk/', TaskBulkActionView.as_view(), name='bulk_tasks'),
+    path('events/', TaskEventsView.as_view(), name='task_events'),
+    path('sync/', TaskSyncView.as_view(), name='sync_tasks'),
+    path('import/', TaskImportView.as_view(), name='import_tasks'),
+    path(
+        'export/<slug:export_format>/',
+        TaskExportView.as_view(),
+        name='export_tasks',
+    ),
     path('<int:pk>/update/', TaskUpdateView.as_view(), name='update_task'),
     path('<int:pk>/delete/', TaskDeleteView.as_view(), name='delete_task'),
     path('<int:pk>/', TaskDetailView.as_view(), name='detail_task'),
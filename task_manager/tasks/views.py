@@ -1,43 +1,292 @@
-from typing import Any, Union
+from typing import Any, Dict, Union
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.messages.views import SuccessMessageMixin
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+)
 from django.http.response import (
     HttpResponsePermanentRedirect,
     HttpResponseRedirect,
+    StreamingHttpResponse,
 )
+from django.shortcuts import redirect
 from django.urls import reverse_lazy
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
+from django.views.generic import View
 from django.views.generic.detail import DetailView
-from django.views.generic.edit import CreateView, DeleteView, UpdateView
+from django.views.generic.edit import (
+    CreateView,
+    DeleteView,
+    FormView,
+    UpdateView,
+)
 from django_filters.views import FilterView
+from task_manager.lookup_cache import attach, attach_many
+from task_manager.tasks import export, sync
+from task_manager.tasks.conditional import (
+    TaskDetailConditionalMixin,
+    TaskListConditionalMixin,
+)
+from task_manager.tasks.events import TaskEventsContextMixin
 from task_manager.tasks.filters import TasksFilter
-from task_manager.tasks.forms import TasksForm
+from task_manager.tasks.forms import (
+    TasksBulkActionForm,
+    TasksForm,
+    TasksImportForm,
+)
 from task_manager.tasks.mixins import (
     CheckUserRightsTestMixin,
     CustomLoginRequiredMixin,
 )
 from task_manager.tasks.models import Tasks
+from task_manager.tasks.pagination import CursorPaginationMixin
+from task_manager.tasks.row_cache import prepare_rows
 
 
-class TaskListView(CustomLoginRequiredMixin, FilterView):
+class TaskListView(
+    CustomLoginRequiredMixin,
+    TaskListConditionalMixin,
+    TaskEventsContextMixin,
+    CursorPaginationMixin,
+    FilterView,
+):
     """Task listing."""
 
     model = Tasks
     paginate_by = 10
-    queryset = model.objects.select_related(
-        'status',
-        'executor',
-        'creator',
-    )
-    queryset = queryset.prefetch_related('labels')
+    queryset = model.objects.select_related('executor', 'creator')
     login_url = reverse_lazy('login')
     context_object_name = 'tasks_list'
     template_name = 'tasks/index.html'
     filterset_class = TasksFilter
 
+    def get_queryset(self) -> Any:
+        """
+        Get tasks, joining statuses when there is no lookup cache to share.
+        Returns:
+            Any:
+        """
+        queryset = super().get_queryset()
+        if not settings.SHARED_CACHE:
+            queryset = queryset.select_related('status')
+        return queryset
+
+    def get_context_data(self, **kwargs) -> Dict[str, Any]:
+        """
+        Look up cached rows and statuses of the page.
+        Args:
+            kwargs:
+        Returns:
+            Dict:
+        """
+        context = super().get_context_data(**kwargs)
+        attach(context[self.context_object_name], 'status')
+        prepare_rows(context[self.context_object_name], get_language())
+        context['bulk_form'] = TasksBulkActionForm()
+        return context
+
+
+class TaskBulkActionView(CustomLoginRequiredMixin, FormView):
+    """
+    Apply one action to selected tasks or to the whole filter result.
+
+    The filter is taken from the query string of the task list.
+    """
+
+    http_method_names = ['post']
+    form_class = TasksBulkActionForm
+    login_url = reverse_lazy('login')
+
+    def get_success_url(self) -> str:
+        """
+        Get url of the task list with the same filter.
+        Returns:
+            str:
+        """
+        query = self.request.GET.urlencode()
+        if not query:
+            return reverse_lazy('tasks')
+        return '{url}?{query}'.format(url=reverse_lazy('tasks'), query=query)
+
+    def form_valid(self, form) -> HttpResponseRedirect:
+        """
+        Apply the action.
+        Args:
+            form:
+        Returns:
+            HttpResponseRedirect:
+        """
+        queryset = form.cleaned_data['tasks']
+        if form.cleaned_data['select_all']:
+            filterset = TasksFilter(
+                self.request.GET,
+                queryset=Tasks.objects.all(),
+                request=self.request,
+            )
+            if not filterset.is_valid():
+                messages.error(self.request, _('ErrorBulkInvalidFilter'))
+                return redirect(self.get_success_url())
+            queryset = filterset.qs
+        count = form.save(queryset)
+        messages.success(
+            self.request, _('SuccessBulkUpdateTasks') % {'count': count},
+        )
+        return redirect(self.get_success_url())
+
+    def form_invalid(self, form) -> HttpResponseRedirect:
+        """
+        Show errors on the task list.
+        Args:
+            form:
+        Returns:
+            HttpResponseRedirect:
+        """
+        for errors in form.errors.values():
+            for error in errors:
+                messages.error(self.request, error)
+        return redirect(self.get_success_url())
+
+
+class TaskExportView(CustomLoginRequiredMixin, View):
+    """Stream the whole TasksFilter result as CSV or NDJSON."""
+
+    login_url = reverse_lazy('login')
+    chunk_size = 2000
+
+    def get(self, request, *args, **kwargs) -> Union[
+        HttpResponseBadRequest,
+        StreamingHttpResponse,
+    ]:
+        """
+        Stream filtered tasks.
+        Args:
+            request:
+        Returns:
+            Union:
+        Raises:
+            Http404: if the format is unknown
+        """
+        export_format = kwargs['export_format']
+        if export_format not in export.RENDERERS:
+            raise Http404
+        filterset = TasksFilter(
+            request.GET,
+            queryset=Tasks.objects.order_by('-created_at', '-id'),
+            request=request,
+        )
+        if not filterset.is_valid():
+            return HttpResponseBadRequest(_('ErrorExportInvalidFilter'))
+        chunks = export.iter_tasks(filterset.qs, self.chunk_size)
+        response = StreamingHttpResponse(
+            export.RENDERERS[export_format](chunks),
+            content_type=export.CONTENT_TYPES[export_format],
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="tasks.{ext}"'.format(ext=export_format)
+        )
+        return response
+
+
+class TaskSyncView(CustomLoginRequiredMixin, View):
+    """JSON of tasks changed and deleted after a cursor."""
+
+    login_url = reverse_lazy('login')
+    page_size = 500
+    max_page_size = 2000
+
+    def get(self, request, *args, **kwargs) -> JsonResponse:
+        """
+        Return the next changes, repeat with the cursor while more is true.
+        Args:
+            request:
+        Returns:
+            JsonResponse:
+        """
+        try:
+            cursor = int(request.GET.get('cursor', 0))
+            limit = int(request.GET.get('limit', self.page_size))
+        except ValueError:
+            return JsonResponse(
+                {'error': 'cursor and limit must be integers'}, status=400,
+            )
+        if cursor < 0 or limit < 1:
+            return JsonResponse(
+                {'error': 'cursor and limit must be positive'}, status=400,
+            )
+        return JsonResponse(
+            sync.changes_since(cursor, min(limit, self.max_page_size)),
+        )
+
+
+class TaskEventsView(CustomLoginRequiredMixin, View):
+    """Stand-in of the task events stream under WSGI."""
+
+    login_url = reverse_lazy('login')
+
+    def get(self, request, *args, **kwargs) -> HttpResponse:
+        """
+        Answer 204, EventSource does not reconnect after it.
 
-class TaskDetailView(CustomLoginRequiredMixin, DetailView):
+        Under ASGI events.EventsRouter streams this url before Django.
+        Args:
+            request:
+        Returns:
+            HttpResponse:
+        """
+        return HttpResponse(status=204)
+
+
+class TaskImportView(CustomLoginRequiredMixin, FormView):
+    """Create tasks from an uploaded file."""
+
+    form_class = TasksImportForm
+    login_url = reverse_lazy('login')
+    template_name = 'tasks/import.html'
+    success_url = reverse_lazy('tasks')
+    max_reported_errors = 20
+
+    def form_valid(self, form) -> HttpResponseRedirect:
+        """
+        Import tasks and report skipped rows.
+        Args:
+            form:
+        Returns:
+            HttpResponseRedirect:
+        """
+        try:
+            result = form.save(self.request.user)
+        except UnicodeDecodeError:
+            form.add_error('file', _('ImportErrorEncoding'))
+            return self.form_invalid(form)
+        messages.success(
+            self.request,
+            _('SuccessImportTasks') % {'count': result.created},
+        )
+        for line, error in result.errors[:self.max_reported_errors]:
+            messages.warning(
+                self.request,
+                _('ImportErrorLine') % {'line': line, 'error': error},
+            )
+        hidden = len(result.errors) - self.max_reported_errors
+        if hidden > 0:
+            messages.warning(
+                self.request, _('ImportMoreErrors') % {'count': hidden},
+            )
+        return super().form_valid(form)
+
+
+class TaskDetailView(
+    CustomLoginRequiredMixin,
+    TaskDetailConditionalMixin,
+    TaskEventsContextMixin,
+    DetailView,
+):
     """Task detail view."""
 
     model = Tasks
@@ -45,6 +294,19 @@ class TaskDetailView(CustomLoginRequiredMixin, DetailView):
     login_url = reverse_lazy('login')
     template_name = 'tasks/detail.html'
 
+    def get_object(self, queryset=None) -> Tasks:
+        """
+        Get the task with its status and labels from the lookup cache.
+        Args:
+            queryset:
+        Returns:
+            Tasks:
+        """
+        task = super().get_object(queryset)
+        attach([task], 'status')
+        attach_many([task], 'labels')
+        return task
+
 
 class TaskCreateView(
     CustomLoginRequiredMixin,
@@ -120,7 +382,7 @@ class TaskDeleteView(
         Returns:
             bool:
         """
-        return self.get_object().creator == self.request.user
+        return self.get_object().creator_id == self.request.user.pk
 
     def post(self, request, *args, **kwargs) -> Union[
         HttpResponsePermanentRedirect,
@@ -213,3 +213,27 @@ class TestUpdateDeleteCase(TestCaseWithoutRollbar):
             reverse('delete_status', args=[self.status.pk]),
         )
         self.assertRedirects(response, reverse('login'))
+
+
+class TestAutocompleteViewCase(TestCaseWithoutRollbar):
+    """Test choices endpoint."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        Status.objects.create(name='in progress')
+        Status.objects.create(name='finished')
+        cls.credentials = {'username': 'test', 'password': 'test'}
+        get_user_model().objects.create_user(**cls.credentials)
+
+    def test_prefix_search(self):
+        """Test choices are matched by name prefix."""
+        self.client.login(**self.credentials)
+        response = self.client.get(
+            reverse('autocomplete_statuses'), {'q': 'in'},
+        )
+        self.assertEqual(response.status_code, HttpResponseBase.status_code)
+        self.assertEqual(
+            ['in progress'],
+            [choice['text'] for choice in response.json()['results']],
+        )
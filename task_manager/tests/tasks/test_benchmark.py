@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django import test
+from django.core.management import CommandError, call_command
+from task_manager.mixins import TestCaseWithoutRollbar
+from task_manager.tasks import benchmark
+
+
+class TestBenchmarkCompareCase(test.SimpleTestCase):
+    """Test comparison of reports with a baseline."""
+
+    def test_compare(self):
+        """Test metrics growing over the threshold are flagged."""
+        baseline = {'benchmarks': {
+            'form:build': {'best_ms': 1.0, 'peak_kib': 10},
+            'render:layout.html': {'best_ms': 2.0, 'peak_kib': 0},
+        }}
+        report = {'benchmarks': {
+            'form:build': {'best_ms': 1.05, 'peak_kib': 20},
+            'render:layout.html': {'best_ms': 1.0, 'peak_kib': 5},
+            'queryset:list': {'best_ms': 3.0, 'peak_kib': 1},
+        }}
+        changes = benchmark.compare(baseline, report, threshold=0.1)
+        self.assertEqual(4, len(changes))
+        self.assertEqual(
+            [('form:build', 'peak_kib')],
+            [
+                (change['benchmark'], change['metric'])
+                for change in changes if change['regressed']
+            ],
+        )
+
+    def test_select(self):
+        """Test benchmarks are selected by name prefixes."""
+        benchmarks = benchmark.get_benchmarks()
+        self.assertEqual(31, len(benchmark.select(benchmarks, ['filter:'])))
+        self.assertEqual(
+            ['form:build', 'form:render', 'queryset:list'],
+            sorted(benchmark.select(benchmarks, ['form', 'queryset'])),
+        )
+        self.assertEqual(len(benchmarks), len(benchmark.select(
+            benchmarks, [],
+        )))
+
+
+class TestBenchmarkCommandCase(TestCaseWithoutRollbar):
+    """Test benchmark command."""
+
+    def setUp(self):
+        """Setup always when test executed."""
+        descriptor, self.output = tempfile.mkstemp(suffix='.json')
+        os.close(descriptor)
+        self.addCleanup(os.remove, self.output)
+
+    def run_benchmarks(self, **options):
+        """
+        Run a few benchmarks once on a small dataset.
+        Args:
+            options:
+        Returns:
+            str: output of the command
+        """
+        out = StringIO()
+        call_command(
+            'benchmark',
+            users=3,
+            labels=4,
+            tasks=30,
+            benchmarks='queryset,filter:status+q,form,render',
+            repeat=1,
+            min_time=0,
+            output=self.output,
+            stdout=out,
+            **options,
+        )
+        return out.getvalue()
+
+    def test_writes_report_and_compares(self):
+        """Test results are written and compared with a baseline."""
+        self.run_benchmarks()
+        with open(self.output) as report_file:
+            report = json.load(report_file)
+        self.assertEqual(7, len(report['benchmarks']))
+        index = report['benchmarks']['render:tasks/index.html']
+        self.assertEqual(0, index['queries'])
+        self.assertGreater(index['best_ms'], 0)
+        self.assertGreater(index['peak_kib'], 0)
+        self.assertGreaterEqual(
+            report['benchmarks']['queryset:list']['queries'], 2,
+        )
+        for result in report['benchmarks'].values():
+            result['best_ms'] = 1e-6
+        baseline = '{output}.baseline'.format(output=self.output)
+        self.addCleanup(os.remove, baseline)
+        with open(baseline, 'w') as baseline_file:
+            json.dump(report, baseline_file)
+        with self.assertRaises(CommandError):
+            self.run_benchmarks(compare=baseline)
+        self.assertIn(
+            'No regressions', self.run_benchmarks(
+                compare=baseline, threshold=1e9,
+            ),
+        )
+
+    def test_unknown_benchmark(self):
+        """Test names are checked before seeding."""
+        with self.assertRaises(CommandError):
+            call_command('benchmark', benchmarks='nothing')
@@ -0,0 +1,229 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from task_manager.labels.models import Label
+from task_manager.mixins import TestCaseWithoutRollbar
+from task_manager.statuses.models import Status
+from task_manager.tasks import row_cache
+from task_manager.tasks.models import Tasks, UserTasksCounter
+
+
+class TestRebuildTaskCountersCase(TestCaseWithoutRollbar):
+    """Test rebuild_task_counters command."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.user = get_user_model().objects.create_user(username='test')
+        status = Status.objects.create(name='new')
+        for postfix in range(2):
+            Tasks.objects.create(
+                name=f'task{postfix}',  # noqa: WPS305
+                status=status,
+                creator=cls.user,
+                executor=cls.user,
+            )
+
+    def setUp(self):
+        """Setup always when test executed."""
+        UserTasksCounter.objects.filter(user=self.user).update(
+            created_count=10,
+        )
+
+    def test_reports_and_fixes_drift(self):
+        """Test drift is reported and fixed."""
+        out = StringIO()
+        call_command('rebuild_task_counters', chunk_size=1, stdout=out)
+        self.assertIn('Checked 1 users, 1 with drift.', out.getvalue())
+        counter = UserTasksCounter.objects.get(user=self.user)
+        self.assertEqual(
+            (2, 2), (counter.created_count, counter.assigned_count),
+        )
+
+    def test_dry_run(self):
+        """Test dry run does not write counters."""
+        out = StringIO()
+        call_command('rebuild_task_counters', dry_run=True, stdout=out)
+        self.assertIn('1 with drift (dry run)', out.getvalue())
+        counter = UserTasksCounter.objects.get(user=self.user)
+        self.assertEqual(10, counter.created_count)
+
+
+class TestTaskRowCacheStatsCase(TestCaseWithoutRollbar):
+    """Test task_row_cache_stats command."""
+
+    def test_reports_and_resets_totals(self):
+        """Test totals are reported and reset."""
+        row_cache.stats.reset()
+        row_cache.stats.record(hits=3, misses=1)
+        out = StringIO()
+        call_command('task_row_cache_stats', reset=True, stdout=out)
+        self.assertIn('Hits 3, misses 1, hit ratio 75.00%.', out.getvalue())
+        self.assertEqual(0, row_cache.stats.totals()['hits'])
+
+
+class TestImportTasksCase(TestCaseWithoutRollbar):
+    """Test import_tasks command."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.user = get_user_model().objects.create_user(username='test')
+        cls.executor = get_user_model().objects.create_user(username='exec')
+        Status.objects.create(name='new')
+        Label.objects.create(name='bug')
+        Label.objects.create(name='urgent')
+
+    def write_file(self, suffix: str, content: str) -> str:
+        """
+        Write a temporary file removed after the test.
+        Args:
+            suffix:
+            content:
+        Returns:
+            str:
+        """
+        descriptor, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as stream:
+            stream.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_imports_csv_and_reports_bad_rows(self):
+        """Test valid rows are imported and invalid ones reported."""
+        path = self.write_file('.csv', (
+            'name,description,status,executor,labels\n'
+            'first,"multi\nline",new,exec,"bug, urgent"\n'
+            'second,,missing,,\n'
+            'third,,new,,bug\n'
+            'first,,new,,\n'
+            'fourth,,new,nobody,\n'
+        ))
+        out, err = StringIO(), StringIO()
+        call_command(
+            'import_tasks', path, creator='test', batch_size=2,
+            stdout=out, stderr=err,
+        )
+        self.assertIn('Imported 2 tasks, skipped 3 rows.', out.getvalue())
+        self.assertEqual(3, len(err.getvalue().splitlines()))
+        self.assertIn('Line 4:', err.getvalue())
+        first = Tasks.objects.get(name='first')
+        self.assertEqual('multi\nline', first.description)
+        self.assertEqual(self.user, first.creator)
+        self.assertEqual(self.executor, first.executor)
+        self.assertEqual(
+            ['bug', 'urgent'],
+            sorted(first.labels.values_list('name', flat=True)),
+        )
+        self.assertEqual(2, self.user.tasks_counter.created_count)
+
+    def test_imports_ndjson(self):
+        """Test NDJSON rows take label lists and a creator."""
+        path = self.write_file('.ndjson', (
+            '{"name": "first", "status": "new", "creator": "exec", '
+            '"labels": ["bug"]}\n'
+            'not json\n'
+        ))
+        out, err = StringIO(), StringIO()
+        call_command(
+            'import_tasks', path, creator='test', stdout=out, stderr=err,
+        )
+        self.assertIn('Imported 1 tasks, skipped 1 rows.', out.getvalue())
+        self.assertEqual(
+            self.executor, Tasks.objects.get(name='first').creator,
+        )
+
+    def test_invalid_labels_are_row_errors(self):
+        """Test labels neither a list nor a string skip only their row."""
+        path = self.write_file('.ndjson', (
+            '{"name": "first", "status": "new", "labels": 5}\n'
+            '{"name": "second", "status": "new", "labels": {"bug": 1}}\n'
+            '{"name": "third", "status": "new", "labels": [["bug"]]}\n'
+            '{"name": "fourth", "status": "new", "labels": "bug,urgent"}\n'
+        ))
+        out, err = StringIO(), StringIO()
+        call_command(
+            'import_tasks', path, creator='test', batch_size=1,
+            stdout=out, stderr=err,
+        )
+        self.assertIn('Imported 1 tasks, skipped 3 rows.', out.getvalue())
+        self.assertEqual(3, len(err.getvalue().splitlines()))
+        for line in (1, 2, 3):
+            self.assertIn('Line {line}:'.format(line=line), err.getvalue())
+        self.assertEqual(2, Tasks.objects.get(name='fourth').labels.count())
+
+    def test_unknown_creator_and_format(self):
+        """Test command fails before reading the file."""
+        with self.assertRaises(CommandError):
+            call_command('import_tasks', 'tasks.csv', creator='nobody')
+        with self.assertRaises(CommandError):
+            call_command('import_tasks', 'tasks.xml', creator='test')
+
+
+class TestSeedCase(TestCaseWithoutRollbar):
+    """Test seed command."""
+
+    def seed(self, prefix, **options):
+        """
+        Seed a small dataset.
+        Args:
+            prefix:
+            options:
+        Returns:
+            list: task rows without ids and prefix
+        """
+        call_command(
+            'seed',
+            users=4,
+            statuses=3,
+            labels=5,
+            tasks=40,
+            labels_per_task='1-3',
+            prefix=prefix,
+            stdout=StringIO(),
+            **options,
+        )
+        tasks = Tasks.objects.filter(
+            name__startswith=prefix,
+        ).order_by('pk').values_list(
+            'name', 'description', 'created_at', 'status__name',
+            'executor__username', 'labels__name',
+        )
+        return [
+            tuple(
+                str(value).replace(prefix, '') for value in row
+            ) for row in tasks
+        ]
+
+    def test_seeds_deterministic_rows(self):
+        """Test the same seed gives the same rows and counters."""
+        first = self.seed('first')
+        self.assertEqual(first, self.seed('second'))
+        self.assertNotEqual(first, self.seed('third', seed=1))
+        self.assertEqual(40, Tasks.objects.filter(
+            name__startswith='first',
+        ).count())
+        user = get_user_model().objects.get(username='first-user-0000000')
+        self.assertEqual(
+            Tasks.objects.filter(creator=user).count(),
+            user.tasks_counter.created_count,
+        )
+        self.assertTrue(user.check_password('loadtest-password'))
+        seeded = Tasks.objects.order_by('-pk').first()
+        task = Tasks.objects.create(
+            name='after', status=seeded.status, creator=user,
+        )
+        self.assertGreater(task.pk, seeded.pk)
+
+    def test_invalid_options(self):
+        """Test ranges, shares and taken prefixes are checked."""
+        with self.assertRaises(CommandError):
+            call_command('seed', labels_per_task='3-1')
+        with self.assertRaises(CommandError):
+            call_command('seed', unassigned=2)
+        self.seed('taken')
+        with self.assertRaises(CommandError):
+            self.seed('taken')
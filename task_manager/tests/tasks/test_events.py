@@ -0,0 +1,244 @@
+import asyncio
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from task_manager.asgi import application
+from task_manager.labels.models import Label
+from task_manager.mixins import TestCaseWithoutRollbar
+from task_manager.statuses.models import Status
+from task_manager.tasks import events
+from task_manager.tasks.events import MemoryBroadcast, SocketBroadcast
+from task_manager.tasks.forms import TasksForm
+from task_manager.tasks.models import TaskChange, Tasks
+
+
+async def receive_published(broadcast, event, subscribers=2):
+    """
+    Publish an event from another thread to new subscribers.
+    Args:
+        broadcast:
+        event:
+        subscribers: number of streams
+    Returns:
+        list: what each stream got
+    """
+    streams = [broadcast.subscribe() for _index in range(subscribers)]
+    publisher = threading.Thread(target=broadcast.publish, args=(event,))
+    publisher.start()
+    received = [
+        await asyncio.wait_for(stream.queue.get(), 5) for stream in streams
+    ]
+    publisher.join()
+    return received
+
+
+class TestBroadcastCase(TestCase):
+    """Test fan-out of events to streams."""
+
+    def test_backend_must_publish(self):
+        """Test a broadcast without publish cannot be built."""
+        with self.assertRaises(TypeError):
+            events.Broadcast()
+
+    def test_memory_broadcast(self):
+        """Test every stream of the process gets the event."""
+        event = {'action': events.UPDATED, 'ids': [1]}
+        self.assertEqual(
+            [event, event],
+            asyncio.run(receive_published(MemoryBroadcast(), event)),
+        )
+
+    def test_socket_broadcast_between_workers(self):
+        """Test events go to streams of another broadcast of the directory."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        worker = SocketBroadcast(directory)
+        publisher = SocketBroadcast(directory)
+        event = {'action': events.DELETED, 'ids': [2]}
+
+        async def run():  # noqa: WPS430
+            stream = worker.subscribe()
+            publisher.publish(event)
+            try:
+                return await asyncio.wait_for(stream.queue.get(), 5)
+            finally:
+                worker.close()
+
+        self.assertEqual(event, asyncio.run(run()))
+
+    def test_slow_stream_overflows(self):
+        """Test a stream with a full queue is told to reload once."""
+        broadcast = MemoryBroadcast(queue_size=2)
+
+        async def run():  # noqa: WPS430
+            stream = broadcast.subscribe()
+            for pk in range(4):
+                broadcast.publish({'action': events.UPDATED, 'ids': [pk]})
+            await asyncio.sleep(0)
+            return [stream.queue.get_nowait() for _index in range(3)]
+
+        received = asyncio.run(run())
+        self.assertEqual([[0], [1]], [event['ids'] for event in received[:2]])
+        self.assertIsNone(received[2])
+
+
+class TestPublishCase(TestCaseWithoutRollbar):
+    """Test task changes are published on commit."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.user = get_user_model().objects.create_user(
+            username='test', password='test',
+        )
+        cls.status = Status.objects.create(name='test_status')
+
+    def test_changes_are_published(self):
+        """Test create, bulk update and delete events."""
+        broadcast = mock.Mock()
+        with mock.patch.object(
+            events, 'get_broadcast', return_value=broadcast,
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                task = Tasks.objects.create(
+                    name='task', status=self.status, creator=self.user,
+                )
+            pk = task.pk
+            with self.captureOnCommitCallbacks(execute=True):
+                Tasks.objects.filter(pk=pk).update(description='new')
+            with self.captureOnCommitCallbacks(execute=True):
+                task.delete()
+        self.assertEqual(
+            [
+                {'action': events.CREATED, 'ids': [pk]},
+                {'action': events.UPDATED, 'ids': [pk]},
+                {'action': events.DELETED, 'ids': [pk]},
+            ],
+            [call.args[0] for call in broadcast.publish.call_args_list],
+        )
+
+    def test_form_publishes_once(self):
+        """Test a task saved with labels by its form is published once."""
+        label = Label.objects.create(name='label')
+        broadcast = mock.Mock()
+        with mock.patch.object(
+            events, 'get_broadcast', return_value=broadcast,
+        ):
+            form = TasksForm(data={
+                'name': 'task', 'status': self.status.pk, 'labels': [label.pk],
+            })
+            form.instance.creator = self.user
+            with self.captureOnCommitCallbacks(execute=True):
+                task = form.save()
+            form = TasksForm(instance=task, data={
+                'name': 'task', 'status': self.status.pk, 'labels': [],
+            })
+            with self.captureOnCommitCallbacks(execute=True):
+                form.save()
+        self.assertEqual(
+            [
+                {'action': events.CREATED, 'ids': [task.pk]},
+                {'action': events.UPDATED, 'ids': [task.pk]},
+            ],
+            [call.args[0] for call in broadcast.publish.call_args_list],
+        )
+        self.assertEqual([], list(task.labels.all()))
+        self.assertEqual(1, TaskChange.objects.filter(task_id=task.pk).count())
+
+
+class TestEventsStreamCase(TestCaseWithoutRollbar):
+    """Test the ASGI stream of task events."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.credentials = {'username': 'test', 'password': 'test'}
+        cls.user = get_user_model().objects.create_user(**cls.credentials)
+
+    def get_stream(self, event, cookie: str = ''):
+        """
+        Open the stream, publish an event and disconnect once it is sent.
+        Args:
+            event: event to publish
+            cookie: Cookie header
+        Returns:
+            list: ASGI messages sent
+        """
+        broadcast = MemoryBroadcast()
+        sent = []
+        received = asyncio.Event()
+
+        async def receive():  # noqa: WPS430
+            await received.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):  # noqa: WPS430
+            sent.append(message)
+            if message['type'] == 'http.response.start':
+                broadcast.publish(event)
+            if b'data:' in message.get('body', b''):
+                received.set()
+
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': reverse('task_events'),
+            'headers': [(b'cookie', cookie.encode())],
+        }
+        with mock.patch.object(
+            events, 'get_broadcast', return_value=broadcast,
+        ), mock.patch.object(events, 'close_old_connections'):
+            async_to_sync(application)(scope, receive, send)
+        return sent
+
+    def test_stream_sends_events(self):
+        """Test a logged in user gets published events."""
+        self.client.login(**self.credentials)
+        cookie = '{name}={value}'.format(
+            name=settings.SESSION_COOKIE_NAME,
+            value=self.client.cookies[settings.SESSION_COOKIE_NAME].value,
+        )
+        sent = self.get_stream({'action': events.CREATED, 'ids': [7]}, cookie)
+        self.assertEqual(200, sent[0]['status'])
+        self.assertIn(
+            (b'content-type', b'text/event-stream'), sent[0]['headers'],
+        )
+        self.assertEqual(
+            b'event: tasks\ndata: {"action": "created", "ids": [7]}\n\n',
+            sent[-1]['body'],
+        )
+
+    def test_anonymous_user_is_refused(self):
+        """Test the stream needs a session."""
+        sent = self.get_stream({'action': events.CREATED, 'ids': [7]})
+        self.assertEqual(403, sent[0]['status'])
+
+    def test_pages_connect_only_to_served_stream(self):
+        """Test task pages load the events script with the stream on."""
+        self.client.login(**self.credentials)
+        task = Tasks.objects.create(
+            name='task',
+            status=Status.objects.create(name='status'),
+            creator=self.user,
+        )
+        urls = (reverse('tasks'), reverse('detail_task', args=[task.pk]))
+        for stream in (False, True):
+            for url in urls:
+                with self.subTest(url=url, stream=stream):
+                    with override_settings(TASK_EVENTS={'STREAM': stream}):
+                        response = self.client.get(url)
+                    script = 'task_events.js' in response.content.decode()
+                    self.assertEqual(stream, script)
+
+    def test_wsgi_fallback(self):
+        """Test the view answers 204 so EventSource stops reconnecting."""
+        self.client.login(**self.credentials)
+        response = self.client.get(reverse('task_events'))
+        self.assertEqual(204, response.status_code)
@@ -1,5 +1,14 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from task_manager import lookup_cache
+from task_manager.labels.models import Label
 from task_manager.mixins import TestCaseWithoutRollbar
 from task_manager.statuses.forms import StatusForm
+from task_manager.statuses.models import Status
+from task_manager.tasks.forms import TasksForm
 
 
 class TestStatusCreationForm(TestCaseWithoutRollbar):
@@ -14,3 +23,66 @@ class TestStatusCreationForm(TestCaseWithoutRollbar):
         """Test form is invalid."""
         data = {'name': ''}
         self.assertFalse(StatusForm(data=data).is_valid())
+
+
+class TestTasksForm(TestCaseWithoutRollbar):
+    """Test task form loads choices lazily."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        user_model = get_user_model()
+        cls.users = user_model.objects.bulk_create([
+            user_model(username=f'user{postfix}')  # noqa: WPS305
+            for postfix in range(30)
+        ])
+        cls.executor = user_model.objects.get(username='user7')
+        cls.status = Status.objects.create(name='new')
+        cls.labels = Label.objects.bulk_create([
+            Label(name=f'label{postfix}')  # noqa: WPS305
+            for postfix in range(30)
+        ])
+
+    def test_renders_selected_choices_only(self):
+        """Test only empty and selected options are rendered."""
+        form = TasksForm(initial={
+            'status': self.status.pk,
+            'executor': self.executor.pk,
+        })
+        html = str(form['executor'])
+        self.assertEqual(html.count('<option'), 2)
+        self.assertIn(
+            'data-autocomplete-url="{url}"'.format(
+                url=reverse('autocomplete_users'),
+            ),
+            html,
+        )
+        self.assertEqual(str(form['labels']).count('<option'), 0)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_validation_does_not_load_table(self):
+        """Test validation fetches only submitted users, lookups are cached."""
+        label = Label.objects.get(name='label20')
+        for model in (Status, Label):
+            # bulk_create sends no post_save, bump as the receivers would.
+            lookup_cache.for_model(model).bump()
+            lookup_cache.for_model(model).rows()
+        form = TasksForm(data={
+            'name': 'task',
+            'status': self.status.pk,
+            'executor': self.executor.pk,
+            'labels': [label.pk],
+        })
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(form.is_valid())
+        self.assertFalse(any(
+            'LIMIT' not in query['sql']
+            for query in queries.captured_queries
+            if 'FROM "users_customuser"' in query['sql']
+        ))
+        self.assertFalse(any(
+            'FROM "labels_label"' in query['sql']
+            or 'FROM "statuses_status"' in query['sql']
+            for query in queries.captured_queries
+        ))
+        self.assertEqual([label], list(form.cleaned_data['labels']))
@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django import test
+from django.core.management import CommandError, call_command
+from task_manager.tasks import loadtest
+from task_manager.tasks.models import Tasks
+from task_manager.tasks.seeding import seed_dataset
+
+
+class TestLoadTestReportCase(test.SimpleTestCase):
+    """Test latency statistics of a run."""
+
+    def test_percentile(self):
+        """Test percentiles are taken by the nearest rank."""
+        latencies = [float(value) for value in range(1, 101)]
+        self.assertEqual(50, loadtest.percentile(latencies, 50))
+        self.assertEqual(99, loadtest.percentile(latencies, 99))
+        self.assertEqual(1, loadtest.percentile(latencies, 0))
+        self.assertEqual(0, loadtest.percentile([], 95))
+
+    def test_summarize(self):
+        """Test views are summarized apart and in total."""
+        samples = [
+            ('tasks', 0.01, 200),
+            ('tasks', 0.03, 200),
+            ('create_task', 0.02, 302),
+            ('create_task', 0.05, 500),
+        ]
+        report = loadtest.summarize(samples, elapsed=2)
+        self.assertEqual(['create_task', 'tasks'], list(report['views']))
+        create = report['views']['create_task']
+        self.assertEqual(1, create['errors'])
+        self.assertEqual({'302': 1, '500': 1}, create['status_codes'])
+        self.assertEqual(30, report['views']['tasks']['p99_ms'])
+        self.assertEqual(4, report['total']['requests'])
+        self.assertEqual(2, report['total']['throughput'])
+
+
+@test.modify_settings(MIDDLEWARE={'remove': [
+    'task_manager.error_reporting.ErrorReportingMiddleware',
+]})
+class TestLoadTestCommandCase(test.LiveServerTestCase):
+    """Test the loadtest command against a live server."""
+
+    def setUp(self):
+        """Setup always when test executed."""
+        descriptor, self.output = tempfile.mkstemp(suffix='.json')
+        os.close(descriptor)
+        self.addCleanup(os.remove, self.output)
+
+    def test_seeds_and_reports_views(self):
+        """Test a run seeds data, requests every view and writes a report."""
+        out = StringIO()
+        call_command(
+            'loadtest',
+            url=self.live_server_url,
+            users=2,
+            tasks=30,
+            concurrency=1,
+            duration=30,
+            requests=12,
+            output=self.output,
+            stdout=out,
+        )
+        self.assertEqual(30, Tasks.objects.filter(
+            name__contains='-task-',
+        ).count())
+        with open(self.output) as report_file:
+            report = json.load(report_file)
+        self.assertEqual(12, report['total']['requests'])
+        self.assertEqual(
+            {'labels': 20, 'statuses': 5, 'tasks': 30, 'users': 2},
+            report['dataset'],
+        )
+        for view, summary in report['views'].items():
+            self.assertIn(view, loadtest.VIEWS)
+            self.assertLessEqual(summary['p50_ms'], summary['p99_ms'])
+        self.assertIn('Report written', out.getvalue())
+
+    def test_unknown_view(self):
+        """Test views are checked before seeding."""
+        with self.assertRaises(CommandError):
+            call_command('loadtest', views='tasks,admin', output=self.output)
+
+
+class TestSeedDatasetCase(test.TestCase):
+    """Test datasets of load tests."""
+
+    def test_seed_dataset(self):
+        """Test rows and labels of tasks are inserted."""
+        dataset = seed_dataset(
+            users=3, statuses=2, labels=4, tasks=25, labels_per_task=3,
+        )
+        self.assertEqual(
+            {'users': 3, 'statuses': 2, 'labels': 4, 'tasks': 25},
+            dataset.sizes(),
+        )
+        self.assertEqual(
+            75, Tasks.labels.through.objects.filter(
+                task_id__in=dataset.tasks,
+            ).count(),
+        )
+        self.assertEqual(25, Tasks.objects.filter(
+            creator__username__in=dataset.usernames,
+        ).count())
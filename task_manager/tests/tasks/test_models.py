@@ -1,9 +1,11 @@
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
 from django.db.models.deletion import ProtectedError
+from django.test.utils import CaptureQueriesContext
 from task_manager.mixins import TestCaseWithoutRollbar
 from task_manager.statuses.models import Status
-from task_manager.tasks.models import Tasks
+from task_manager.tasks.models import Tasks, UserTasksCounter
 from task_manager.utils import load_file_from_fixture
 
 
@@ -79,3 +81,86 @@ class TestModelCase(TestCaseWithoutRollbar):
         task.delete()
         with self.assertRaises(ObjectDoesNotExist):
             Tasks.objects.get(pk=task.pk)
+
+
+class TestUserTasksCounterCase(TestCaseWithoutRollbar):
+    """Test per-user task counters follow Tasks writes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.user_model = get_user_model()
+        cls.author = cls.user_model.objects.create_user(username='author')
+        cls.executor = cls.user_model.objects.create_user(username='executor')
+        cls.status = Status.objects.create(name='new')
+
+    def assert_counts(self, user, created, assigned):
+        """
+        Check stored counters of the user.
+        Args:
+            user:
+            created:
+            assigned:
+        """
+        counter = UserTasksCounter.objects.get(user=user)
+        self.assertEqual(
+            (created, assigned),
+            (counter.created_count, counter.assigned_count),
+        )
+
+    def test_save_and_delete(self):
+        """Test counters on create, reassign and delete."""
+        task = Tasks.objects.create(
+            name='task', status=self.status, creator=self.author,
+        )
+        self.assert_counts(self.author, 1, 0)
+
+        task.executor = self.executor
+        task.save()
+        self.assert_counts(self.author, 1, 0)
+        self.assert_counts(self.executor, 0, 1)
+
+        task.executor = self.author
+        task.save()
+        self.assert_counts(self.author, 1, 1)
+        self.assert_counts(self.executor, 0, 0)
+
+        task.delete()
+        self.assert_counts(self.author, 0, 0)
+
+    def test_bulk_paths(self):
+        """Test counters on bulk_create, update and queryset delete."""
+        Tasks.objects.bulk_create([
+            Tasks(
+                name=f'task{postfix}',  # noqa: WPS305
+                status=self.status,
+                creator=self.author,
+                executor=self.author,
+            ) for postfix in range(3)
+        ])
+        self.assert_counts(self.author, 3, 3)
+
+        Tasks.objects.filter(name='task0').update(executor=self.executor)
+        self.assert_counts(self.author, 3, 2)
+        self.assert_counts(self.executor, 0, 1)
+
+        Tasks.objects.filter(executor=self.author).delete()
+        self.assert_counts(self.author, 1, 0)
+        self.assert_counts(self.executor, 0, 1)
+
+    def test_saves_without_reading_users(self):
+        """Test loaded tasks and saves of other fields skip the user read."""
+        Tasks.objects.create(
+            name='task', status=self.status, creator=self.author,
+        )
+        task = Tasks.objects.get(name='task')
+        task.executor = self.executor
+        with CaptureQueriesContext(connection) as queries:
+            task.save()
+            task.save(update_fields=['name'])
+        self.assertFalse(any(
+            '"creator_id", "tasks_tasks"."executor_id" FROM' in query['sql']
+            for query in queries.captured_queries
+        ))
+        self.assert_counts(self.author, 1, 0)
+        self.assert_counts(self.executor, 0, 1)
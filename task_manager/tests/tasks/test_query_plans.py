@@ -0,0 +1,124 @@
+from itertools import combinations
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory
+from task_manager.labels.models import Label
+from task_manager.mixins import TestCaseWithoutRollbar
+from task_manager.statuses.models import Status
+from task_manager.tasks.filters import TasksFilter
+from task_manager.tasks.models import TaskLabelRelated, Tasks
+from task_manager.tasks.views import TaskListView
+
+
+class TestFilterQueryPlanCase(TestCaseWithoutRollbar):
+    """Test every TasksFilter combination is served by an index."""
+
+    filter_fields = ('status', 'executor', 'label', 'self_tasks')
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        number_of_tasks = 500
+        user_model = get_user_model()
+        cls.users = [
+            user_model.objects.create_user(
+                username=f'user{postfix}',  # noqa: WPS305
+            ) for postfix in range(5)
+        ]
+        cls.statuses = [
+            Status.objects.create(name=f'status{postfix}')  # noqa: WPS305
+            for postfix in range(5)
+        ]
+        cls.labels = [
+            Label.objects.create(name=f'label{postfix}')  # noqa: WPS305
+            for postfix in range(5)
+        ]
+        Tasks.objects.bulk_create([
+            Tasks(
+                name=f'task{postfix}',  # noqa: WPS305
+                status=cls.statuses[postfix % 5],
+                creator=cls.users[postfix % 3],
+                executor=cls.users[postfix % 5],
+            ) for postfix in range(number_of_tasks)
+        ])
+        TaskLabelRelated.objects.bulk_create([
+            TaskLabelRelated(task=task, label=cls.labels[task.pk % 5])
+            for task in Tasks.objects.all()
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def get_filter_data(self, fields) -> dict:
+        """
+        Build query data for a combination of filter fields.
+        Args:
+            fields: names of filter fields
+        Returns:
+            dict:
+        """
+        values = {
+            'status': self.statuses[0].pk,
+            'executor': self.users[0].pk,
+            'label': self.labels[0].pk,
+            'self_tasks': 'on',
+        }
+        return {field: values[field] for field in fields}
+
+    def explain(self, queryset) -> str:
+        """
+        Get query plan of the queryset.
+        Args:
+            queryset:
+        Returns:
+            str:
+        """
+        sql, params = queryset.query.sql_with_params()
+        explain_prefix = 'EXPLAIN QUERY PLAN'
+        if connection.vendor != 'sqlite':
+            explain_prefix = 'EXPLAIN'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                '{prefix} {sql}'.format(prefix=explain_prefix, sql=sql),
+                params,
+            )
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+    def assert_indexed_plan(self, plan: str, fields):
+        """
+        Fail on a full scan of tasks or on sorting the filtered rows.
+
+        Filtering by label walks the label index and sorts only the
+        matched rows, every other combination must come in index order.
+        Args:
+            plan: query plan
+            fields: names of filter fields
+        """
+        if connection.vendor == 'sqlite':
+            full_scan = any(
+                line.strip() == 'SCAN tasks_tasks'
+                for line in plan.splitlines()
+            )
+            sort = 'USE TEMP B-TREE FOR ORDER BY' in plan
+        else:
+            full_scan = 'Seq Scan on tasks_tasks' in plan
+            sort = 'Sort' in plan
+        self.assertFalse(full_scan, plan)
+        if 'label' not in fields:
+            self.assertFalse(sort, plan)
+
+    def test_filter_combinations_use_index(self):
+        """Test filter combinations avoid sequential scan plus sort."""
+        request = RequestFactory().get('/tasks/')
+        request.user = self.users[0]
+        for size in range(len(self.filter_fields) + 1):
+            for fields in combinations(self.filter_fields, size):
+                with self.subTest(fields=fields):
+                    filterset = TasksFilter(
+                        data=self.get_filter_data(fields),
+                        queryset=TaskListView.queryset,
+                        request=request,
+                    )
+                    self.assertTrue(filterset.is_valid())
+                    queryset = filterset.qs[:10]
+                    self.assert_indexed_plan(self.explain(queryset), fields)
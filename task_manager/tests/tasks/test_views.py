@@ -1,9 +1,29 @@
+import base64
+import csv
+import datetime
+import json
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.http import HttpResponse
 from django.http.response import HttpResponseBase
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.views import View
+from django.views.generic.detail import SingleObjectMixin
+from task_manager.labels.models import Label
 from task_manager.mixins import TestCaseWithoutRollbar
 from task_manager.statuses.models import Status
-from task_manager.tasks.models import Tasks
+from task_manager.tasks import row_cache
+from task_manager.tasks.conditional import ConditionalGetMixin
+from task_manager.tasks.models import TaskChange, TaskLabelRelated, Tasks
+from task_manager.tasks.views import TaskExportView
 from task_manager.utils import load_file_from_fixture
 
 
@@ -74,6 +94,101 @@ class TestListViewCase(TestCaseWithoutRollbar):
         self.assertRedirects(response, reverse('login'))
 
 
+class TestCursorPaginationCase(TestCaseWithoutRollbar):
+    """Test keyset pagination of task list."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        number_of_tasks = 15
+        cls.user_model = get_user_model()
+        cls.credentials = {'username': 'test', 'password': 'test'}
+        cls.user = cls.user_model.objects.create_user(**cls.credentials)
+        cls.status = Status.objects.create(name='test_status')
+        Tasks.objects.bulk_create(
+            [
+                Tasks(
+                    name=f'task{postfix}',  # noqa: WPS305
+                    status=cls.status,
+                    creator=cls.user,
+                    executor=cls.user,
+                ) for postfix in range(number_of_tasks)
+            ], batch_size=number_of_tasks,
+        )
+        cls.url = '{url}?status={status}&cursor='.format(
+            url=reverse('tasks'),
+            status=cls.status.pk,
+        )
+
+    def setUp(self):
+        """Setup always when test executed."""
+        self.client.login(**self.credentials)
+
+    def test_first_page(self):
+        """Test first page has no previous link and no COUNT query."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, HttpResponseBase.status_code)
+        page = response.context['page_obj']
+        self.assertTrue(response.context['is_paginated'])
+        self.assertEqual(len(response.context['tasks_list']), 10)
+        self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+        self.assertFalse(
+            any('COUNT(' in query['sql'] for query in queries.captured_queries),
+        )
+
+    def test_walk_forward_and_back(self):
+        """Test next and previous links keep filter and order."""
+        first = self.client.get(self.url).context
+        next_url = first['page_obj'].next_url
+        self.assertIn('status={status}'.format(status=self.status.pk), next_url)
+
+        second = self.client.get(
+            '{url}{query}'.format(url=reverse('tasks'), query=next_url),
+        ).context
+        self.assertEqual(len(second['tasks_list']), 5)
+        self.assertFalse(second['page_obj'].has_next())
+        self.assertTrue(second['page_obj'].has_previous())
+        seen = {task.pk for task in first['tasks_list']}
+        self.assertFalse(seen & {task.pk for task in second['tasks_list']})
+
+        back = self.client.get(
+            '{url}{query}'.format(
+                url=reverse('tasks'),
+                query=second['page_obj'].previous_url,
+            ),
+        ).context
+        self.assertEqual(
+            [task.pk for task in first['tasks_list']],
+            [task.pk for task in back['tasks_list']],
+        )
+
+    def test_invalid_cursor(self):
+        """Test malformed cursor returns not found."""
+        response = self.client.get('{url}?cursor=broken'.format(
+            url=reverse('tasks'),
+        ))
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_of_wrong_types(self):
+        """Test cursors decoding to values of wrong types are not found."""
+        values = (
+            ['n', 5, 1],
+            ['n', '2021-01-01', True],
+            ['n', '2021-01-01', '1'],
+            ['n', 'yesterday', 1],
+            {'n': 1, 'p': 2, 'x': 3},
+        )
+        for value in values:
+            cursor = base64.urlsafe_b64encode(
+                json.dumps(value).encode(),
+            ).decode().rstrip('=')
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.url + cursor)
+                self.assertEqual(response.status_code, 404)
+
+
 class TestFilterViewCase(TestCaseWithoutRollbar):
     """Test filter view."""
 
@@ -145,6 +260,726 @@ class TestFilterViewCase(TestCaseWithoutRollbar):
         self.assertEqual(count_rec_switch_off, len(response.context['tasks_list']))
 
 
+class TestSearchViewCase(TestCaseWithoutRollbar):
+    """Test full-text search of tasks."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.user_model = get_user_model()
+        cls.credentials = {'username': 'test', 'password': 'test'}
+        cls.user = cls.user_model.objects.create_user(**cls.credentials)
+        cls.status = Status.objects.create(name='test_status')
+        cls.task_in_description = Tasks.objects.create(
+            name='prepare slides',
+            description='numbers are taken from the quarterly report '
+                        'of the sales department and finance department',
+            status=cls.status,
+            creator=cls.user,
+        )
+        cls.task_in_name = Tasks.objects.create(
+            name='quarterly report',
+            status=cls.status,
+            creator=cls.user,
+        )
+        Tasks.objects.create(
+            name='unrelated', status=cls.status, creator=cls.user,
+        )
+
+    def setUp(self):
+        """Setup always when test executed."""
+        self.client.login(**self.credentials)
+
+    def search(self, query: str) -> list:
+        """
+        Get names of found tasks.
+        Args:
+            query:
+        Returns:
+            list:
+        """
+        response = self.client.get(reverse('tasks'), {'q': query})
+        self.assertEqual(response.status_code, HttpResponseBase.status_code)
+        return [task.name for task in response.context['tasks_list']]
+
+    def test_ranked_prefix_search(self):
+        """Test name matches rank above description matches."""
+        self.assertEqual(
+            ['quarterly report', 'prepare slides'],
+            self.search('QUARTERLY rep'),
+        )
+        self.assertEqual([], self.search('report missing'))
+
+    def test_index_follows_writes(self):
+        """Test search sees saved, updated and deleted tasks."""
+        self.task_in_name.name = 'annual summary'
+        self.task_in_name.save()
+        self.assertEqual(['annual summary'], self.search('annual'))
+
+        Tasks.objects.filter(pk=self.task_in_name.pk).update(name='weekly')
+        self.assertEqual(['weekly'], self.search('weekly'))
+
+        self.task_in_description.delete()
+        self.assertEqual([], self.search('quarterly'))
+
+        Tasks.objects.bulk_create([
+            Tasks(name='bulk task', status=self.status, creator=self.user),
+        ])
+        self.assertEqual(['bulk task'], self.search('bulk'))
+
+    def test_cursor_pages_are_not_ranked(self):
+        """Test cursor pages of a search come newest first."""
+        Tasks.objects.filter(pk=self.task_in_name.pk).update(
+            created_at=self.task_in_description.created_at - (
+                datetime.timedelta(days=1)
+            ),
+        )
+        self.assertEqual(
+            ['quarterly report', 'prepare slides'], self.search('quarterly'),
+        )
+        with override_settings(TASKS_CURSOR_PAGINATION=True):
+            self.assertEqual(
+                ['prepare slides', 'quarterly report'],
+                self.search('quarterly'),
+            )
+
+    def test_query_syntax_is_escaped(self):
+        """Test special characters do not break the query."""
+        self.assertEqual(['unrelated'], self.search('\"unrel* ^('))
+
+
+@override_settings(SHARED_CACHE=True)
+class TestRowCacheCase(TestCaseWithoutRollbar):
+    """Test cached rows of the task list."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.user_model = get_user_model()
+        cls.credentials = {'username': 'test', 'password': 'test'}
+        cls.user = cls.user_model.objects.create_user(
+            first_name='Ivan', last_name='Petrov', **cls.credentials,
+        )
+        cls.status = Status.objects.create(name='test_status')
+        cls.tasks = [
+            Tasks.objects.create(
+                name=f'task{postfix}',  # noqa: WPS305
+                status=cls.status,
+                creator=cls.user,
+            ) for postfix in range(3)
+        ]
+
+    def setUp(self):
+        """Setup always when test executed."""
+        cache.clear()
+        row_cache.stats.reset()
+        self.client.login(**self.credentials)
+
+    def get_list(self) -> str:
+        """
+        Get rendered rows of the task list.
+        Returns:
+            str:
+        """
+        response = self.client.get(reverse('tasks'))
+        self.assertEqual(response.status_code, HttpResponseBase.status_code)
+        content = response.content.decode()
+        return content[content.index('<tbody>'):content.index('</tbody>')]
+
+    def test_second_render_hits(self):
+        """Test rows are rendered once and then read from the cache."""
+        first = self.get_list()
+        self.assertEqual(
+            {'hits': 0, 'misses': 3, 'hit_ratio': 0.0},
+            row_cache.stats.as_dict(),
+        )
+        self.assertEqual(first, self.get_list())
+        self.assertEqual(
+            {'hits': 3, 'misses': 3, 'hit_ratio': 0.5},
+            row_cache.stats.as_dict(),
+        )
+        self.assertEqual(
+            row_cache.stats.as_dict(), row_cache.stats.totals(),
+        )
+
+    @override_settings(SHARED_CACHE=False)
+    def test_local_cache_renders_rows(self):
+        """Test rows are not cached in a cache other workers cannot see."""
+        self.assertEqual(self.get_list(), self.get_list())
+        self.assertEqual(
+            {'hits': 0, 'misses': 0, 'hit_ratio': 0.0},
+            row_cache.stats.as_dict(),
+        )
+        self.tasks[0].save()
+        self.assertFalse(any(
+            key.startswith(':1:task-row:')
+            for key in cache._cache  # noqa: WPS437
+        ))
+
+    def test_stats_are_flushed_in_batches(self):
+        """Test counts reach the shared totals at most once per interval."""
+        row_cache.stats.record(hits=1)
+        row_cache.stats.record(hits=2)
+        self.assertEqual(
+            1, cache.get(row_cache.STATS_KEYS['hits']),
+        )
+        self.assertEqual(3, row_cache.stats.totals()['hits'])
+
+    def test_rows_expire_on_changes(self):
+        """Test changed task, status and user are shown at once."""
+        self.get_list()
+        self.tasks[0].name = 'renamed task'
+        self.tasks[0].save()
+        self.assertIn('renamed task', self.get_list())
+        self.assertEqual(2, row_cache.stats.hits)
+
+        Tasks.objects.filter(pk=self.tasks[1].pk).update(name='bulk renamed')
+        self.assertIn('bulk renamed', self.get_list())
+
+        self.status.name = 'renamed_status'
+        self.status.save()
+        content = self.get_list()
+        self.assertIn('renamed_status', content)
+        self.assertNotIn('test_status', content)
+
+        self.user.first_name = 'Pavel'
+        self.user.save()
+        content = self.get_list()
+        self.assertIn('Pavel Petrov', content)
+        self.assertNotIn('Ivan Petrov', content)
+
+
+class TestBulkActionViewCase(TestCaseWithoutRollbar):
+    """Test bulk actions on tasks."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.user_model = get_user_model()
+        cls.credentials = {'username': 'test', 'password': 'test'}
+        cls.user = cls.user_model.objects.create_user(**cls.credentials)
+        cls.executor = cls.user_model.objects.create_user(username='other')
+        cls.status = Status.objects.create(name='new')
+        cls.done = Status.objects.create(name='done')
+        cls.labels = [
+            Label.objects.create(name='bug'),
+            Label.objects.create(name='urgent'),
+        ]
+        Tasks.objects.bulk_create([
+            Tasks(
+                name=f'task{postfix}',  # noqa: WPS305
+                status=cls.done if postfix % 2 else cls.status,
+                creator=cls.user,
+            ) for postfix in range(30)
+        ])
+        cls.tasks = list(Tasks.objects.order_by('pk'))
+        cls.url = reverse('bulk_tasks')
+
+    def setUp(self):
+        """Setup always when test executed."""
+        self.client.login(**self.credentials)
+
+    def post(self, data: dict, query: str = '') -> HttpResponseBase:
+        """
+        Post bulk action.
+        Args:
+            data:
+            query: filter query string
+        Returns:
+            HttpResponseBase:
+        """
+        url = '{url}?{query}'.format(url=self.url, query=query)
+        return self.client.post(url, data)
+
+    def test_set_status_of_selected_tasks(self):
+        """Test status of selected tasks only is changed."""
+        selected = [task.pk for task in self.tasks[:3]]
+        response = self.post({
+            'action': 'set_status', 'status': self.done.pk, 'tasks': selected,
+        }, 'executor=')
+        self.assertRedirects(response, '{url}?executor='.format(
+            url=reverse('tasks'),
+        ))
+        self.assertEqual(
+            set(selected) | {task.pk for task in self.tasks[1::2]},
+            set(Tasks.objects.filter(
+                status=self.done,
+            ).values_list('pk', flat=True)),
+        )
+
+    def test_set_executor_of_filter_result(self):
+        """Test whole filter result is reassigned."""
+        self.post({
+            'action': 'set_executor',
+            'executor': self.executor.pk,
+            'select_all': 'on',
+        }, 'status={status}'.format(status=self.status.pk))
+        self.assertEqual(
+            15, Tasks.objects.filter(executor=self.executor).count(),
+        )
+        self.assertFalse(
+            Tasks.objects.filter(
+                executor=self.executor, status=self.done,
+            ).exists(),
+        )
+        self.assertEqual(
+            15, self.executor.tasks_counter.assigned_count,
+        )
+
+    def test_add_and_remove_labels(self):
+        """Test labels are added once and removed."""
+        selected = [task.pk for task in self.tasks[:5]]
+        data = {
+            'action': 'add_labels',
+            'labels': [label.pk for label in self.labels],
+            'tasks': selected,
+        }
+        self.post(data)
+        self.post(data)
+        self.assertEqual(10, TaskLabelRelated.objects.count())
+
+        self.post({
+            'action': 'remove_labels',
+            'labels': [self.labels[0].pk],
+            'select_all': 'on',
+        })
+        self.assertEqual(
+            {self.labels[1].pk},
+            set(TaskLabelRelated.objects.values_list('label_id', flat=True)),
+        )
+
+    def test_queries_do_not_grow_with_selection(self):
+        """Test number of queries does not depend on selected tasks."""
+        query_counts = []
+        for size in (2, 20):
+            with CaptureQueriesContext(connection) as queries:
+                self.post({
+                    'action': 'add_labels',
+                    'labels': [self.labels[0].pk],
+                    'tasks': [task.pk for task in self.tasks[-size:]],
+                })
+            query_counts.append(len(queries))
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_invalid_action_changes_nothing(self):
+        """Test missing values and selection are reported."""
+        response = self.post({'action': 'set_status'}, 'executor=x')
+        self.assertEqual(
+            2, len(list(get_messages(response.wsgi_request))),
+        )
+        response = self.post({
+            'action': 'set_status', 'status': self.done.pk, 'select_all': 'on',
+        }, 'executor=x')
+        self.assertEqual(15, Tasks.objects.filter(status=self.done).count())
+
+    def test_not_auth_users_cannot_change(self):
+        """Test not auth users cannot change tasks."""
+        self.client.logout()
+        response = self.post({
+            'action': 'set_status', 'status': self.done.pk, 'select_all': 'on',
+        })
+        self.assertRedirects(response, reverse('login'))
+        self.assertEqual(15, Tasks.objects.filter(status=self.done).count())
+
+
+class TestExportViewCase(TestCaseWithoutRollbar):
+    """Test streaming export of tasks."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.user_model = get_user_model()
+        cls.credentials = {'username': 'test', 'password': 'test'}
+        cls.user = cls.user_model.objects.create_user(
+            first_name='Ivan', last_name='Petrov', **cls.credentials,
+        )
+        cls.status = Status.objects.create(name='new')
+        cls.done = Status.objects.create(name='done')
+        cls.label = Label.objects.create(name='bug')
+        Tasks.objects.bulk_create([
+            Tasks(
+                name=f'task{postfix}',  # noqa: WPS305
+                description='line one\nline "two"',
+                status=cls.done if postfix % 2 else cls.status,
+                creator=cls.user,
+                executor=cls.user if postfix % 2 else None,
+            ) for postfix in range(7)
+        ])
+        Tasks.objects.get(name='task1').labels.add(cls.label)
+
+    def setUp(self):
+        """Setup always when test executed."""
+        self.client.login(**self.credentials)
+
+    def export(self, export_format: str, query: dict = None) -> str:
+        """
+        Get exported content.
+        Args:
+            export_format:
+            query:
+        Returns:
+            str:
+        """
+        response = self.client.get(
+            reverse('export_tasks', args=[export_format]), query or {},
+        )
+        self.assertEqual(response.status_code, HttpResponseBase.status_code)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        """Test CSV has a header and one record per filtered task."""
+        rows = list(csv.DictReader(
+            self.export('csv', {'status': self.done.pk}).splitlines(True),
+        ))
+        self.assertEqual(
+            ['task5', 'task3', 'task1'], [row['name'] for row in rows],
+        )
+        self.assertEqual('line one\nline "two"', rows[0]['description'])
+        self.assertEqual('Ivan Petrov', rows[0]['executor'])
+        self.assertEqual('bug', rows[2]['labels'])
+
+    def test_ndjson_export(self):
+        """Test NDJSON has one object per line."""
+        tasks = [
+            json.loads(line)
+            for line in self.export('ndjson', {'q': 'task0'}).splitlines()
+        ]
+        self.assertEqual(1, len(tasks))
+        self.assertEqual('', tasks[0]['executor'])
+        self.assertEqual([], tasks[0]['labels'])
+        self.assertEqual('new', tasks[0]['status'])
+
+    def test_labels_are_fetched_per_chunk(self):
+        """Test one label query is made per chunk of rows."""
+        with mock.patch.object(TaskExportView, 'chunk_size', 3):
+            with CaptureQueriesContext(connection) as queries:
+                content = self.export('csv')
+        self.assertEqual(8, len(list(csv.reader(content.splitlines(True)))))
+        label_queries = [
+            query for query in queries.captured_queries
+            if 'tasks_tasklabelrelated' in query['sql']
+        ]
+        self.assertEqual(3, len(label_queries))
+
+    def test_bad_requests(self):
+        """Test unknown format and invalid filter are rejected."""
+        response = self.client.get(reverse('export_tasks', args=['xml']))
+        self.assertEqual(404, response.status_code)
+        response = self.client.get(
+            reverse('export_tasks', args=['csv']), {'status': 'x'},
+        )
+        self.assertEqual(400, response.status_code)
+
+    def test_not_auth_users_cannot_export(self):
+        """Test not auth users cannot export."""
+        self.client.logout()
+        response = self.client.get(reverse('export_tasks', args=['csv']))
+        self.assertRedirects(response, reverse('login'))
+
+
+@override_settings(SHARED_CACHE=True)
+class TestConditionalGetCase(TestCaseWithoutRollbar):
+    """Test ETag and Last-Modified of task pages."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.credentials = {'username': 'test', 'password': 'test'}
+        cls.user = get_user_model().objects.create_user(**cls.credentials)
+        cls.status = Status.objects.create(name='test_status')
+        cls.label = Label.objects.create(name='test_label')
+        cls.tasks = [
+            Tasks.objects.create(
+                name=f'task{postfix}',  # noqa: WPS305
+                status=cls.status,
+                creator=cls.user,
+            ) for postfix in range(3)
+        ]
+        cls.list_url = reverse('tasks')
+        cls.detail_url = reverse('detail_task', args=[cls.tasks[0].pk])
+
+    def setUp(self):
+        """Setup always when test executed."""
+        self.client.login(**self.credentials)
+
+    def assertNotModified(self, url: str, **headers):  # noqa: N802
+        """
+        Check the page is answered with 304 without loading or counting tasks.
+        Args:
+            url:
+            headers: conditional headers
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, **headers)
+        self.assertEqual(304, response.status_code)
+        self.assertFalse(response.content)
+        self.assertFalse(any(
+            'tasks_tasks"."name"' in query['sql'] or 'COUNT(' in query['sql']
+            for query in queries.captured_queries
+        ))
+
+    def test_list_etag(self):
+        """Test unchanged list is not modified, a bulk update changes it."""
+        etag = self.client.get(self.list_url)['ETag']
+        self.assertNotModified(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        Tasks.objects.filter(pk=self.tasks[0].pk).update(
+            description='changed',
+        )
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HttpResponseBase.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+
+    def test_list_etag_changes_with_new_task(self):
+        """Test creating a task changes the list ETag."""
+        etag = self.client.get(self.list_url)['ETag']
+        Tasks.objects.create(name='new', status=self.status, creator=self.user)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HttpResponseBase.status_code)
+        self.assertNotModified(
+            self.list_url, HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+
+    def test_list_etag_depends_on_filter(self):
+        """Test task leaving a filter changes its ETag."""
+        url = '{url}?status={status}'.format(
+            url=self.list_url, status=self.status.pk,
+        )
+        etag = self.client.get(url)['ETag']
+        self.assertNotEqual(etag, self.client.get(self.list_url)['ETag'])
+        self.tasks[2].status = Status.objects.create(name='other')
+        self.tasks[2].save()
+        self.assertNotEqual(etag, self.client.get(url)['ETag'])
+
+    def test_detail_last_modified(self):
+        """Test If-Modified-Since of the detail page."""
+        response = self.client.get(self.detail_url)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertNotModified(
+            self.detail_url,
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+
+    def test_detail_changes_with_labels_and_status(self):
+        """Test labels and status name change the detail ETag."""
+        etag = self.client.get(self.detail_url)['ETag']
+        self.assertNotModified(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.tasks[0].labels.set([self.label])
+        relabeled = self.client.get(self.detail_url)['ETag']
+        self.assertNotEqual(etag, relabeled)
+        self.status.name = 'renamed'
+        self.status.save()
+        response = self.client.get(
+            self.detail_url, HTTP_IF_NONE_MATCH=relabeled,
+        )
+        self.assertEqual(response.status_code, HttpResponseBase.status_code)
+        self.assertContains(response, 'renamed')
+
+    def test_pending_messages_are_rendered(self):
+        """Test page with a message to show is not answered with 304."""
+        etag = self.client.get(self.list_url)['ETag']
+        self.client.post(reverse('bulk_tasks'), {'action': 'status'})
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HttpResponseBase.status_code)
+
+    def test_view_without_fingerprint(self):
+        """Test views not giving a fingerprint are always rendered."""
+        class PageView(View):  # noqa: WPS431
+            """Plain page."""
+
+            def get(self, request, *args, **kwargs):  # noqa: WPS430
+                return HttpResponse('page')
+
+        class ConditionalPageView(  # noqa: WPS431
+            ConditionalGetMixin, PageView,
+        ):
+            """Conditional page without a fingerprint."""
+
+        request = RequestFactory().get('/', HTTP_IF_NONE_MATCH='"page"')
+        request.user = self.user
+        response = ConditionalPageView.as_view()(request)
+        self.assertEqual(b'page', response.content)
+        self.assertNotIn('ETag', response)
+
+    @override_settings(SHARED_CACHE=False)
+    def test_local_cache_renders_pages(self):
+        """Test pages are not fingerprinted by stamps of a local cache."""
+        response = self.client.get(self.list_url)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+
+@override_settings(SYNC_LAG_SECONDS=0)
+class TestSyncViewCase(TestCaseWithoutRollbar):
+    """Test incremental sync of tasks."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.credentials = {'username': 'test', 'password': 'test'}
+        cls.user = get_user_model().objects.create_user(**cls.credentials)
+        cls.status = Status.objects.create(name='test_status')
+        cls.label = Label.objects.create(name='test_label')
+        cls.tasks = [
+            Tasks.objects.create(
+                name=f'task{postfix}',  # noqa: WPS305
+                status=cls.status,
+                creator=cls.user,
+            ) for postfix in range(3)
+        ]
+        cls.url = reverse('sync_tasks')
+
+    def setUp(self):
+        """Setup always when test executed."""
+        self.client.login(**self.credentials)
+
+    def sync(self, cursor: int = 0, **params) -> dict:
+        """
+        Get changes after a cursor.
+        Args:
+            cursor:
+            params: other query parameters
+        Returns:
+            dict:
+        """
+        response = self.client.get(self.url, {'cursor': cursor, **params})
+        self.assertEqual(response.status_code, HttpResponseBase.status_code)
+        return response.json()
+
+    def test_full_sync_in_pages(self):
+        """Test every task is sent once over pages of changes."""
+        first = self.sync(limit=2)
+        self.assertTrue(first['more'])
+        second = self.sync(first['cursor'], limit=2)
+        self.assertFalse(second['more'])
+        self.assertEqual(
+            [task.pk for task in self.tasks],
+            [row['id'] for row in first['tasks'] + second['tasks']],
+        )
+        self.assertEqual(
+            {'cursor': second['cursor'], 'more': False,
+             'tasks': [], 'deleted': []},
+            self.sync(second['cursor']),
+        )
+
+    def test_only_changes_are_sent(self):
+        """Test updated and relabeled tasks are sent after the cursor."""
+        cursor = self.sync()['cursor']
+        self.assertEqual([], self.sync(cursor)['tasks'])
+        Tasks.objects.filter(pk=self.tasks[0].pk).update(description='new')
+        self.tasks[1].labels.set([self.label])
+        changes = self.sync(cursor)
+        self.assertEqual(
+            [self.tasks[0].pk, self.tasks[1].pk],
+            [row['id'] for row in changes['tasks']],
+        )
+        self.assertEqual('new', changes['tasks'][0]['description'])
+        self.assertEqual([self.label.pk], changes['tasks'][1]['labels'])
+        self.assertEqual([], changes['deleted'])
+
+    def test_deleted_task_leaves_tombstone(self):
+        """Test a task removed by TaskDeleteView is reported deleted."""
+        cursor = self.sync()['cursor']
+        task = self.tasks[2]
+        self.client.post(reverse('delete_task', args=[task.pk]))
+        changes = self.sync(cursor)
+        self.assertEqual([], changes['tasks'])
+        self.assertEqual([task.pk], changes['deleted'])
+        self.assertEqual([task.pk], self.sync()['deleted'])
+
+    def test_label_clear_resends_tasks(self):
+        """Test clearing a label from its side resends its tasks."""
+        self.tasks[0].labels.set([self.label])
+        cursor = self.sync()['cursor']
+        self.label.labels.clear()
+        changes = self.sync(cursor)
+        self.assertEqual([self.tasks[0].pk], [
+            row['id'] for row in changes['tasks']
+        ])
+        self.assertEqual([], changes['tasks'][0]['labels'])
+
+    def test_recent_changes_are_held_back(self):
+        """Test changes within the lag window wait, with the ones after."""
+        cursor = self.sync()['cursor']
+        Tasks.objects.filter(pk=self.tasks[0].pk).update(description='new')
+        TaskChange.objects.filter(task_id=self.tasks[0].pk).update(
+            logged_at=timezone.now() - datetime.timedelta(seconds=30),
+        )
+        self.tasks[1].labels.set([self.label])
+        Tasks.objects.filter(pk=self.tasks[2].pk).update(description='new')
+        TaskChange.objects.filter(task_id=self.tasks[2].pk).update(
+            logged_at=timezone.now() - datetime.timedelta(seconds=30),
+        )
+        with override_settings(SYNC_LAG_SECONDS=10):
+            changes = self.sync(cursor)
+        self.assertFalse(changes['more'])
+        self.assertEqual(
+            [self.tasks[0].pk], [row['id'] for row in changes['tasks']],
+        )
+        self.assertEqual(
+            [self.tasks[1].pk, self.tasks[2].pk],
+            [row['id'] for row in self.sync(changes['cursor'])['tasks']],
+        )
+
+    def test_invalid_cursor(self):
+        """Test bad parameters are answered with 400."""
+        for params in ({'cursor': 'x'}, {'cursor': -1}, {'limit': 0}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(400, response.status_code)
+
+
+class TestImportViewCase(TestCaseWithoutRollbar):
+    """Test upload of tasks."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.user_model = get_user_model()
+        cls.credentials = {'username': 'test', 'password': 'test'}
+        cls.user = cls.user_model.objects.create_user(**cls.credentials)
+        Status.objects.create(name='new')
+        cls.url = reverse('import_tasks')
+
+    def setUp(self):
+        """Setup always when test executed."""
+        self.client.login(**self.credentials)
+
+    def test_upload_imports_tasks(self):
+        """Test uploaded rows are imported and errors shown."""
+        upload = SimpleUploadedFile(
+            'tasks.json',
+            '[{"name": "imported", "status": "new"}, {"name": ""}]'.encode(),
+        )
+        response = self.client.post(self.url, {'file': upload})
+        self.assertRedirects(response, reverse('tasks'))
+        self.assertEqual(self.user, Tasks.objects.get(name='imported').creator)
+        self.assertEqual(
+            2, len(list(get_messages(response.wsgi_request))),
+        )
+
+    def test_upload_ignores_creators_of_rows(self):
+        """Test uploaded tasks are created by the uploading user."""
+        other = self.user_model.objects.create_user(username='other')
+        upload = SimpleUploadedFile('tasks.ndjson', json.dumps({
+            'name': 'imported', 'status': 'new', 'creator': other.username,
+        }).encode())
+        self.client.post(self.url, {'file': upload})
+        self.assertEqual(self.user, Tasks.objects.get(name='imported').creator)
+
+    def test_unknown_format_is_rejected(self):
+        """Test unknown file extension is a form error."""
+        upload = SimpleUploadedFile('tasks.xml', b'<tasks/>')
+        response = self.client.post(self.url, {'file': upload})
+        self.assertEqual(response.status_code, HttpResponseBase.status_code)
+        self.assertTrue(response.context['form'].errors)
+
+    def test_not_auth_users_cannot_import(self):
+        """Test not auth users cannot import."""
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertRedirects(response, reverse('login'))
+
+
 class TestCreateViewCase(TestCaseWithoutRollbar):
     """Test create view."""
 
@@ -296,12 +1131,27 @@ class TestUpdateDeleteCase(TestCaseWithoutRollbar):
             ).exists(),
         )
 
+    def test_delete_fetches_task_once(self):
+        """Test the permission check and the deletion share one fetch."""
+        with mock.patch.object(
+            SingleObjectMixin,
+            'get_object',
+            autospec=True,
+            side_effect=SingleObjectMixin.get_object,
+        ) as get_object:
+            response = self.client.post(
+                path=reverse('delete_task', args=[self.task.pk]),
+            )
+        self.assertRedirects(response, reverse('tasks'))
+        get_object.assert_called_once()
+
     def test_get_not_auth_users_cannot_delete(self):
         """Test GET not authenticated users cannot delete."""
         self.client.logout()
-        response = self.client.get(
-            reverse('delete_task', args=[self.task.pk]),
-        )
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse('delete_task', args=[self.task.pk]),
+            )
         self.assertRedirects(response, reverse('login'))
 
     def test_post_not_auth_users_cannot_delete(self):
@@ -0,0 +1,226 @@
+import os
+import tempfile
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from task_manager import db_router
+from task_manager.db_router import PrimaryReplicaRouter, RoutingState
+from task_manager.mixins import TestCaseWithoutRollbar
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Tasks
+
+REPLICA = 'replica0'
+FILE_REPLICA = 'file_replica'
+
+
+def outside_transactions():
+    """
+    Hide the transaction every TestCase runs in from the router.
+    Returns:
+        Any: patcher
+    """
+    return mock.patch.object(db_router, 'connections', {
+        DEFAULT_DB_ALIAS: mock.Mock(in_atomic_block=False),
+    })
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class TestPrimaryReplicaRouterCase(TestCaseWithoutRollbar):
+    """Test routing decisions."""
+
+    def route_read(self, state):
+        """
+        Route a read within a request state.
+        Args:
+            state: RoutingState or None outside requests
+        Returns:
+            Optional:
+        """
+        token = db_router._state.set(state)  # noqa: WPS437
+        try:
+            return PrimaryReplicaRouter().db_for_read(Tasks)
+        finally:
+            db_router._state.reset(token)  # noqa: WPS437
+
+    def test_reads(self):
+        """Test only reads of replica views go to a replica."""
+        replica_view = RoutingState()
+        replica_view.replica_reads = True
+        self.assertIsNone(self.route_read(None))
+        self.assertIsNone(self.route_read(RoutingState()))
+        with outside_transactions():
+            self.assertEqual(REPLICA, self.route_read(replica_view))
+
+    def test_writes_keep_reads_on_primary(self):
+        """Test a request reads from default once it wrote."""
+        state = RoutingState()
+        state.replica_reads = True
+        token = db_router._state.set(state)  # noqa: WPS437
+        try:
+            self.assertEqual(
+                DEFAULT_DB_ALIAS, PrimaryReplicaRouter().db_for_write(Tasks),
+            )
+        finally:
+            db_router._state.reset(token)  # noqa: WPS437
+        self.assertTrue(state.written)
+        self.assertIsNone(self.route_read(state))
+
+    def test_transactions_read_from_primary(self):
+        """Test reads within a transaction of default stay there."""
+        state = RoutingState()
+        state.replica_reads = True
+        with transaction.atomic():
+            self.assertIsNone(self.route_read(state))
+
+    def test_migrations_skip_replicas(self):
+        """Test replicas get their schema by replication."""
+        router = PrimaryReplicaRouter()
+        self.assertTrue(router.allow_migrate(DEFAULT_DB_ALIAS, 'tasks'))
+        self.assertFalse(router.allow_migrate(REPLICA, 'tasks'))
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], REPLICA_STICKY_SECONDS=30)
+class TestReplicaRoutingMiddlewareCase(TestCaseWithoutRollbar):
+    """Test requests read from replicas until the client writes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.credentials = {'username': 'test', 'password': 'test'}
+        get_user_model().objects.create_user(**cls.credentials)
+        cls.status = Status.objects.create(name='test_status')
+
+    def setUp(self):
+        """Setup always when test executed."""
+        self.client.login(**self.credentials)
+        patcher = outside_transactions()
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # The test database has no replica, its reads go to default.
+        choice = mock.patch.object(
+            db_router.random, 'choice', return_value=DEFAULT_DB_ALIAS,
+        )
+        self.choice = choice.start()
+        self.addCleanup(choice.stop)
+
+    def test_replica_views(self):
+        """Test list views read from a replica, forms do not."""
+        self.client.get(reverse('tasks'))
+        self.assertTrue(self.choice.called)
+        self.choice.reset_mock()
+        self.client.get(reverse('create_task'))
+        self.assertFalse(self.choice.called)
+
+    def test_client_sticks_to_primary_after_write(self):
+        """Test the write sets a cookie keeping the client on default."""
+        response = self.client.post(reverse('create_task'), {
+            'name': 'task', 'status': self.status.pk,
+        })
+        cookie = response.cookies[db_router.STICKY_COOKIE]
+        self.assertEqual(30, cookie['max-age'])
+        self.client.get(reverse('tasks'))
+        self.assertFalse(self.choice.called)
+
+    def test_expired_cookie(self):
+        """Test clients go back to replicas after the window."""
+        self.client.cookies[db_router.STICKY_COOKIE] = str(
+            int(time.time()) - 1,
+        )
+        self.client.get(reverse('tasks'))
+        self.assertTrue(self.choice.called)
+
+
+@override_settings(DATABASE_REPLICAS=[FILE_REPLICA], REPLICA_STICKY_SECONDS=30)
+class TestSQLiteReplicaCase(TransactionTestCase):
+    """Test routing against a second SQLite file lagging behind default."""
+
+    # The replica is registered by setUpClass, after the runner checked
+    # the databases of test cases.
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        """Register the replica before the test case checks databases."""
+        descriptor, cls.replica_path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(descriptor)
+        connections.settings[FILE_REPLICA] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': cls.replica_path,
+        }
+        connections.ensure_defaults(FILE_REPLICA)
+        connections.prepare_test_settings(FILE_REPLICA)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Drop the replica."""
+        super().tearDownClass()
+        connections[FILE_REPLICA].close()
+        del connections[FILE_REPLICA]  # noqa: WPS420
+        del connections.settings[FILE_REPLICA]  # noqa: WPS420
+        os.remove(cls.replica_path)
+
+    def setUp(self):
+        """Setup always when test executed."""
+        credentials = {'username': 'test', 'password': 'test'}
+        self.user = get_user_model().objects.create_user(**credentials)
+        self.status = Status.objects.create(name='test_status')
+        self.task = Tasks.objects.create(
+            name='replicated', status=self.status, creator=self.user,
+        )
+        self.client.login(**credentials)
+        self.replicate()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def replicate(self):
+        """Copy default to the replica file."""
+        for alias in (DEFAULT_DB_ALIAS, FILE_REPLICA):
+            connections[alias].ensure_connection()
+        connections[DEFAULT_DB_ALIAS].connection.backup(
+            connections[FILE_REPLICA].connection,
+        )
+
+    def test_files(self):
+        """Test default and the replica are different files."""
+        self.assertNotEqual(
+            connections[DEFAULT_DB_ALIAS].settings_dict['NAME'],
+            connections[FILE_REPLICA].settings_dict['NAME'],
+        )
+
+    def test_reads_lag_until_client_writes(self):
+        """Test the list reads the replica, then default after a write."""
+        Tasks.objects.create(
+            name='not_replicated', status=self.status, creator=self.user,
+        )
+        response = self.client.get(reverse('tasks'))
+        self.assertContains(response, 'replicated')
+        self.assertNotContains(response, 'not_replicated')
+        self.client.post(reverse('create_task'), {
+            'name': 'written', 'status': self.status.pk,
+        })
+        self.assertTrue(Tasks.objects.filter(name='written').exists())
+        self.assertFalse(
+            Tasks.objects.using(FILE_REPLICA).filter(name='written').exists(),
+        )
+        response = self.client.get(reverse('tasks'))
+        self.assertContains(response, 'not_replicated')
+        self.assertContains(response, 'written')
+
+    @override_settings(SHARED_CACHE=True)
+    def test_lagging_row_not_cached(self):
+        """Test rows under fresh stamps are rendered from default."""
+        self.task.name = 'renamed'
+        self.task.save()
+        for _attempt in range(2):
+            response = self.client.get(reverse('tasks'))
+            self.assertContains(response, 'renamed')
+            self.assertNotContains(response, 'replicated')
+        self.assertEqual(
+            'replicated', Tasks.objects.using(FILE_REPLICA).get().name,
+        )
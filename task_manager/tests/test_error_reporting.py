@@ -0,0 +1,177 @@
+import json
+import os
+import sys
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from task_manager import error_reporting
+from task_manager.error_reporting import (
+    ErrorReport,
+    ErrorReporter,
+    FileSink,
+    MemorySink,
+    NullSink,
+    RollbarSink,
+    build_sink,
+)
+
+
+def get_exc_info(exception_class=ValueError):
+    """
+    Raise and catch an exception.
+    Args:
+        exception_class:
+    Returns:
+        Tuple:
+    """
+    try:
+        raise exception_class('failure')
+    except exception_class:
+        return sys.exc_info()
+
+
+class BatchSink(object):
+    """Remember sent batches."""
+
+    def __init__(self):
+        """Init sink."""
+        self.batches = []
+
+    def send(self, reports):
+        """
+        Remember a batch.
+        Args:
+            reports:
+        """
+        self.batches.append(reports)
+
+
+class TestErrorReporterCase(TestCase):
+    """Test background reporter."""
+
+    def test_identical_exceptions_are_counted(self):
+        """Test exceptions within the window go with the next report."""
+        sink = MemorySink()
+        reporter = ErrorReporter(sink, flush_seconds=0)
+        self.assertTrue(reporter.report(get_exc_info(), {}))
+        self.assertFalse(reporter.report(get_exc_info(), {}))
+        self.assertFalse(reporter.report(get_exc_info(), {}))
+        self.assertTrue(reporter.report(get_exc_info(KeyError), {}))
+        for window in reporter._windows.values():  # noqa: WPS437
+            window[0] = 0
+        self.assertTrue(reporter.report(get_exc_info(), {}))
+        reporter.flush()
+        self.assertEqual(
+            [('ValueError', 1), ('KeyError', 1), ('ValueError', 3)],
+            [
+                (report.exception, report.occurrences)
+                for report in sink.reports
+            ],
+        )
+
+    def test_reports_are_sent_in_batches(self):
+        """Test waiting reports are sent together."""
+        sink = BatchSink()
+        reporter = ErrorReporter(sink, batch_size=2, flush_seconds=5)
+        with mock.patch.object(reporter, 'start'):
+            for exception_class in (ValueError, KeyError, TypeError):
+                reporter.report(get_exc_info(exception_class), {})
+        reporter.start()
+        reporter.flush()
+        self.assertEqual([2, 1], [len(batch) for batch in sink.batches])
+
+    def test_queue_is_bounded(self):
+        """Test reports over the queue size are dropped."""
+        reporter = ErrorReporter(MemorySink(), max_queue=1)
+        with mock.patch.object(reporter, 'start'):
+            self.assertTrue(reporter.report(get_exc_info(), {}))
+            self.assertFalse(reporter.report(get_exc_info(KeyError), {}))
+        self.assertEqual(1, reporter.dropped)
+
+    def test_memory_sink_is_bounded(self):
+        """Test only the last reports are kept."""
+        sink = MemorySink(max_reports=2)
+        reporter = ErrorReporter(sink, dedupe_seconds=0, flush_seconds=0)
+        for exception_class in (ValueError, KeyError, TypeError):
+            reporter.report(get_exc_info(exception_class), {})
+        reporter.flush()
+        self.assertEqual(
+            ['KeyError', 'TypeError'],
+            [report.exception for report in sink.reports],
+        )
+
+    def test_default_sink(self):
+        """Test reports are dropped unless a sink is configured."""
+        self.assertIsInstance(build_sink({}), NullSink)
+        self.assertIsInstance(build_sink({'SINK': 'none'}), NullSink)
+
+    def test_file_sink(self):
+        """Test reports are written as JSON lines."""
+        descriptor, path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(descriptor)
+        self.addCleanup(os.remove, path)
+        reporter = ErrorReporter(FileSink(path), flush_seconds=0)
+        reporter.report(get_exc_info(), {'url_name': 'tasks'})
+        reporter.flush()
+        with open(path, encoding='utf-8') as stream:
+            entry = json.loads(stream.readline())
+        self.assertEqual('ValueError', entry['exception'])
+        self.assertEqual('tasks', entry['request']['url_name'])
+        self.assertIn('raise exception_class', entry['traceback'])
+
+    def test_report_keeps_strings_only(self):
+        """Test a report keeps no traceback object with frame locals."""
+        report = ErrorReport(get_exc_info(), {})
+        self.assertFalse(hasattr(report, 'exc_info'))
+        self.assertEqual('failure', report.message)
+        self.assertIn('raise exception_class', report.traceback)
+
+    def test_rollbar_sink_sends_formatted_report(self):
+        """Test Rollbar gets the formatted report as a message."""
+        report = ErrorReport(get_exc_info(), {'url_name': 'tasks'})
+        sink = RollbarSink()
+        with mock.patch('rollbar.init'):
+            with mock.patch('rollbar.report_message') as report_message:
+                sink.send([report])
+        args, kwargs = report_message.call_args
+        self.assertEqual(('ValueError: failure',), args)
+        self.assertEqual(report.traceback, kwargs['extra_data']['traceback'])
+        self.assertEqual('tasks', kwargs['payload_data']['context'])
+
+
+class TestErrorReportingMiddlewareCase(TestCase):
+    """Test exceptions of views are reported."""
+
+    def setUp(self):
+        """Setup always when test executed."""
+        self.sink = MemorySink()
+        self.reporter = ErrorReporter(self.sink, flush_seconds=0)
+        patcher = mock.patch.object(
+            error_reporting, 'get_reporter', return_value=self.reporter,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client.raise_request_exception = False
+
+    def test_view_exception_is_reported(self):
+        """Test unhandled exception is queued with request data."""
+        with mock.patch(
+            'task_manager.views.render', side_effect=RuntimeError('boom'),
+        ):
+            response = self.client.get(reverse('home'))
+        self.assertEqual(500, response.status_code)
+        self.reporter.flush()
+        self.assertEqual(1, len(self.sink.reports))
+        self.assertEqual('home', self.sink.reports[0].request_data['url_name'])
+
+    def test_not_found_is_not_reported(self):
+        """Test Http404 is not an error to report."""
+        credentials = {'username': 'test', 'password': 'test'}
+        get_user_model().objects.create_user(**credentials)
+        self.client.login(**credentials)
+        response = self.client.get(reverse('detail_task', args=[1]))
+        self.assertEqual(404, response.status_code)
+        self.assertEqual(0, self.reporter.queue.qsize())
@@ -0,0 +1,99 @@
+import json
+import logging
+from io import StringIO
+from unittest import TestCase, mock
+
+from task_manager.log import (
+    BackgroundStreamHandler,
+    JsonFormatter,
+    SqlSampleFilter,
+)
+
+
+def make_record(msg: str = 'message', **extra) -> logging.LogRecord:
+    """
+    Build a log record.
+    Args:
+        msg:
+        extra: record attributes
+    Returns:
+        logging.LogRecord:
+    """
+    return logging.makeLogRecord({
+        'name': 'django.db.backends',
+        'levelno': logging.DEBUG,
+        'levelname': 'DEBUG',
+        'msg': msg,
+        **extra,
+    })
+
+
+class TestJsonFormatterCase(TestCase):
+    """Test JSON lines."""
+
+    def test_sql_record(self):
+        """Test SQL fields are kept."""
+        line = JsonFormatter().format(make_record(
+            '(%.3f) %s', args=(0.5, 'SELECT 1'), duration=0.5, sql='SELECT 1',
+        ))
+        entry = json.loads(line)
+        self.assertEqual('(0.500) SELECT 1', entry['message'])
+        self.assertEqual('DEBUG', entry['level'])
+        self.assertEqual(0.5, entry['duration'])
+        self.assertEqual('SELECT 1', entry['sql'])
+
+
+class TestSqlSampleFilterCase(TestCase):
+    """Test sampling of SQL records."""
+
+    def test_only_slow_statements(self):
+        """Test zero percent passes slow statements only."""
+        sample = SqlSampleFilter(percent=0, slow_ms=100)
+        self.assertTrue(sample.filter(make_record(duration=0.2)))
+        self.assertFalse(sample.filter(make_record(duration=0.01)))
+        self.assertFalse(sample.filter(make_record()))
+
+    def test_percent(self):
+        """Test share of passed statements."""
+        self.assertTrue(SqlSampleFilter().filter(make_record(duration=0)))
+        sample = SqlSampleFilter(percent=10)
+        with mock.patch('random.random', return_value=0.05):
+            self.assertTrue(sample.filter(make_record(duration=0)))
+        with mock.patch('random.random', return_value=0.5):
+            self.assertFalse(sample.filter(make_record(duration=0)))
+
+
+class TestBackgroundStreamHandlerCase(TestCase):
+    """Test queue-backed handler."""
+
+    def test_records_are_written_by_thread(self):
+        """Test records are written before close returns."""
+        stream = StringIO()
+        handler = BackgroundStreamHandler(stream)
+        handler.setFormatter(JsonFormatter())
+        handler.handle(make_record('first'))
+        handler.handle(make_record('second'))
+        handler.close()
+        messages = [
+            json.loads(line)['message']
+            for line in stream.getvalue().splitlines()
+        ]
+        self.assertEqual(['first', 'second'], messages)
+
+    def test_records_are_dropped_when_queue_is_full(self):
+        """Test full queue drops records and reports them later."""
+        stream = StringIO()
+        handler = BackgroundStreamHandler(stream, maxsize=2)
+        with mock.patch.object(handler, 'start'):
+            for number in range(4):
+                handler.handle(make_record(str(number)))
+            self.assertEqual(2, handler.dropped)
+            handler.queue.get_nowait()
+            handler.queue.get_nowait()
+            handler.handle(make_record('after'))
+        self.assertEqual(0, handler.dropped)
+        handler.close()
+        self.assertEqual(
+            ['after', 'Dropped 2 log records, the queue was full.'],
+            stream.getvalue().splitlines(),
+        )
@@ -0,0 +1,148 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http.response import HttpResponseBase
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from task_manager import lookup_cache
+from task_manager.labels.models import Label
+from task_manager.mixins import TestCaseWithoutRollbar
+from task_manager.statuses.models import Status
+from task_manager.tasks.filters import TasksFilter
+from task_manager.tasks.models import Tasks
+
+LOOKUP_TABLES = ('"statuses_status"', '"labels_label"')
+
+
+@override_settings(SHARED_CACHE=True)
+class TestLookupCacheCase(TestCaseWithoutRollbar):
+    """Test statuses and labels are read from the process cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.credentials = {'username': 'test', 'password': 'test'}
+        cls.user = get_user_model().objects.create_user(**cls.credentials)
+        cls.status = Status.objects.create(name='test_status')
+        cls.label = Label.objects.create(name='test_label')
+        cls.task = Tasks.objects.create(
+            name='task', status=cls.status, creator=cls.user,
+        )
+        cls.task.labels.add(cls.label)
+
+    def setUp(self):
+        """Setup always when test executed."""
+        self.statuses = lookup_cache.for_model(Status)
+        self.labels = lookup_cache.for_model(Label)
+        # Rows of other tests are rolled back without signals.
+        self.statuses.bump()
+        self.labels.bump()
+
+    def get_lookup_queries(self, url: str) -> list:
+        """
+        Request a page and collect its queries of lookup tables.
+        Args:
+            url:
+        Returns:
+            list:
+        """
+        self.client.login(**self.credentials)
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, HttpResponseBase.status_code)
+        return [
+            query['sql'] for query in queries.captured_queries
+            if any(table in query['sql'] for table in LOOKUP_TABLES)
+        ]
+
+    def test_rows_are_read_once(self):
+        """Test the table is read again only after a change."""
+        self.statuses.rows()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.status, self.statuses.get(self.status.pk))
+        self.status.name = 'renamed'
+        self.status.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                'renamed', self.statuses.get(self.status.pk).name,
+            )
+
+    @override_settings(SHARED_CACHE=False)
+    def test_local_cache_queries_rows(self):
+        """Test rows are queried by key every time without a shared stamp."""
+        self.statuses.rows()
+        Status.objects.filter(pk=self.status.pk).update(name='renamed')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(
+                'renamed', self.statuses.get(self.status.pk).name,
+            )
+            self.assertEqual([self.label], self.labels.filter([
+                str(self.label.pk), 'x',
+            ]))
+        self.assertEqual(2, len(queries))
+        self.assertTrue(all(
+            'WHERE' in query['sql'] for query in queries.captured_queries
+        ))
+
+    @override_settings(SHARED_CACHE=False)
+    def test_pages_read_no_whole_tables(self):
+        """Test pages without a shared stamp never read a whole table."""
+        for url in (
+            '{url}?status={status}&label={label}'.format(
+                url=reverse('tasks'),
+                status=self.status.pk,
+                label=self.label.pk,
+            ),
+            reverse('detail_task', args=[self.task.pk]),
+        ):
+            with self.subTest(url=url):
+                queries = self.get_lookup_queries(url)
+                self.assertTrue(queries)
+                self.assertTrue(all('WHERE' in sql for sql in queries))
+
+    def test_deleted_rows_are_dropped(self):
+        """Test a deleted label is gone from the cache."""
+        label = Label.objects.create(name='other')
+        self.assertEqual([label], self.labels.filter([label.pk]))
+        label.delete()
+        self.assertEqual([], self.labels.filter([label.pk]))
+
+    def test_pages_read_no_lookup_tables(self):
+        """Test task pages take statuses and labels from the cache."""
+        self.assertEqual([], self.get_lookup_queries(
+            '{url}?status={status}&label={label}'.format(
+                url=reverse('tasks'),
+                status=self.status.pk,
+                label=self.label.pk,
+            ),
+        ))
+        self.assertEqual([], self.get_lookup_queries(
+            reverse('detail_task', args=[self.task.pk]),
+        ))
+
+    def test_detail_shows_cached_lookups(self):
+        """Test the detail page shows the status and labels of the task."""
+        self.client.login(**self.credentials)
+        response = self.client.get(reverse('detail_task', args=[self.task.pk]))
+        self.assertContains(response, self.status.name)
+        self.assertContains(response, self.label.name)
+
+    def test_filter_rejects_unknown_status(self):
+        """Test the filter validates values against the table."""
+        filterset = TasksFilter({'status': self.status.pk + 100})
+        self.assertFalse(filterset.is_valid())
+        filterset = TasksFilter({'status': self.status.pk})
+        self.assertTrue(filterset.is_valid())
+        self.assertEqual([self.task], list(filterset.qs))
+
+    def test_hits_and_misses_are_counted(self):
+        """Test reads with a current stamp are hits, table reads misses."""
+        lookup_cache.stats.reset()
+        self.addCleanup(lookup_cache.stats.reset)
+        self.statuses.get(self.status.pk)
+        self.statuses.get(self.status.pk)
+        self.assertEqual(
+            {'hits': 1, 'misses': 1, 'hit_ratio': 0.5},
+            lookup_cache.stats.as_dict(),
+        )
@@ -0,0 +1,116 @@
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.http.response import HttpResponseBase
+from django.test import override_settings
+from django.urls import reverse
+from task_manager import lookup_cache, metrics
+from task_manager.mixins import TestCaseWithoutRollbar
+from task_manager.tasks import row_cache
+
+
+@override_settings(METRICS={'ALLOWED_IPS': {'127.0.0.1'}, 'TOKEN': ''})
+class TestMetricsCase(TestCaseWithoutRollbar):
+    """Test metrics endpoint."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.credentials = {'username': 'test', 'password': 'test'}
+        get_user_model().objects.create_user(**cls.credentials)
+
+    def assertSample(self, content: str, name: str, **labels):  # noqa: N802
+        """
+        Check the metrics have a sample with the labels.
+        Args:
+            content: metrics page
+            name: sample name
+            labels: label values
+        """
+        expected = {
+            '{label}="{value}"'.format(label=label, value=value)
+            for label, value in labels.items()
+        }
+        samples = [
+            line for line in content.splitlines()
+            if line.startswith(name + '{')
+        ]
+        self.assertTrue(any(
+            expected <= set(line.split('{')[1].split('}')[0].split(','))
+            for line in samples
+        ), samples)
+
+    def get_metrics(self) -> str:
+        """
+        Get metrics page.
+        Returns:
+            str:
+        """
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, HttpResponseBase.status_code)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        return response.content.decode()
+
+    def test_access(self):
+        """Test metrics are served to allowed addresses, token and staff."""
+        url = reverse('metrics')
+        with override_settings(METRICS={'ALLOWED_IPS': (), 'TOKEN': 'key'}):
+            self.assertEqual(403, self.client.get(url).status_code)
+            self.assertEqual(403, self.client.get(
+                url, HTTP_AUTHORIZATION='Bearer other',
+            ).status_code)
+            self.assertEqual(200, self.client.get(
+                url, HTTP_AUTHORIZATION='Bearer key',
+            ).status_code)
+            self.client.login(**self.credentials)
+            self.assertEqual(403, self.client.get(url).status_code)
+            get_user_model().objects.filter(
+                username=self.credentials['username'],
+            ).update(is_staff=True)
+            self.assertEqual(200, self.client.get(url).status_code)
+
+    def test_request_metrics_by_url_name(self):
+        """Test requests are observed with their url name and method."""
+        self.client.login(**self.credentials)
+        self.client.get(reverse('tasks'))
+        content = self.get_metrics()
+        for name in (
+            'task_manager_request_duration_seconds_count',
+            'task_manager_request_db_duration_seconds_count',
+            'task_manager_request_queries_count',
+            'task_manager_response_size_bytes_count',
+        ):
+            self.assertSample(content, name, url_name='tasks', method='GET')
+        self.assertSample(
+            content,
+            'task_manager_template_render_duration_seconds_count',
+            url_name='tasks',
+        )
+
+    @override_settings(SHARED_CACHE=True)
+    def test_cache_hit_ratios(self):
+        """Test hit ratios of the task row and lookup caches are exposed."""
+        for stats in (row_cache.stats, lookup_cache.stats):
+            stats.reset()
+            self.addCleanup(stats.reset)
+        row_cache.stats.record(hits=3, misses=1)
+        lookup_cache.stats.record(hits=1, misses=1)
+        content = self.get_metrics()
+        self.assertIn('task_manager_task_row_cache_hit_ratio 0.75', content)
+        self.assertIn('task_manager_lookup_cache_hit_ratio 0.5', content)
+
+    def test_local_cache_reports_no_ratio(self):
+        """Test caches unused without a shared cache are not reported."""
+        self.assertNotIn('_cache_hit_ratio', self.get_metrics())
+
+    @override_settings(SHARED_CACHE=True)
+    def test_multiprocess_registry(self):
+        """Test metrics are read from files of the multiprocess dir."""
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch.dict(
+                'os.environ', {metrics.MULTIPROC_DIR_ENV: directory},
+            ):
+                content = metrics.render_metrics().decode()
+        self.assertNotIn('task_manager_request_duration_seconds', content)
+        self.assertIn('task_manager_task_row_cache_hit_ratio', content)
@@ -0,0 +1,211 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from task_manager import query_budget
+from task_manager.labels.models import Label
+from task_manager.mixins import QueryBudgetTestMixin, TestCaseWithoutRollbar
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Tasks
+
+
+class TestQueryBudgetCase(QueryBudgetTestMixin, TestCaseWithoutRollbar):
+    """Test every view stays within its query budget."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        number_of_tasks = 15
+        cls.credentials = {'username': 'test', 'password': 'test'}
+        cls.user = get_user_model().objects.create_user(**cls.credentials)
+        cls.status = Status.objects.create(name='test_status')
+        cls.labels = [
+            Label.objects.create(name=f'label{postfix}')  # noqa: WPS305
+            for postfix in range(5)
+        ]
+        for postfix in range(number_of_tasks):
+            cls.task = Tasks.objects.create(
+                name=f'task{postfix}',  # noqa: WPS305
+                status=cls.status,
+                creator=cls.user,
+                executor=cls.user,
+            )
+            cls.task.labels.set(cls.labels)
+
+    def setUp(self):
+        """Setup always when test executed."""
+        self.client.login(**self.credentials)
+
+    def get_requests(self) -> dict:
+        """
+        Get arguments of assertQueryBudget() by url name.
+        Returns:
+            dict:
+        """
+        user = {'kwargs': {'pk': self.user.pk}}
+        status = {'kwargs': {'pk': self.status.pk}}
+        task = {'kwargs': {'pk': self.task.pk}}
+        label = {'kwargs': {'pk': self.labels[0].pk}}
+        return {
+            'home': {},
+            'metrics': {},
+            'login': {},
+            'logout': {},
+            'users': {},
+            'create_user': {},
+            'autocomplete_users': {},
+            'update_user': user,
+            'delete_user': user,
+            'detail_user': user,
+            'statuses': {},
+            'create_status': {},
+            'autocomplete_statuses': {},
+            'update_status': status,
+            'delete_status': status,
+            'tasks': {},
+            'create_task': {},
+            'bulk_tasks': {'method': 'post', 'data': {
+                'tasks': [task.pk for task in Tasks.objects.all()],
+                'action': 'set_status',
+                'status': self.status.pk,
+            }},
+            'import_tasks': {},
+            'export_tasks': {'kwargs': {'export_format': 'csv'}},
+            'sync_tasks': {},
+            'task_events': {},
+            'update_task': task,
+            'delete_task': task,
+            'detail_task': task,
+            'labels': {},
+            'create_label': {},
+            'autocomplete_labels': {},
+            'update_label': label,
+            'delete_label': label,
+        }
+
+    def test_every_view_is_within_budget(self):
+        """Test every named url of the project has a checked request."""
+        requests = self.get_requests()
+        for url_name in query_budget.url_names():
+            with self.subTest(url_name=url_name):
+                self.assertIn(url_name, requests)
+                self.client.login(**self.credentials)
+                self.assertQueryBudget(url_name, **requests[url_name])
+
+    def get_posts(self) -> list:
+        """
+        Get url names, url arguments and data of valid form posts.
+
+        Posts are made in this order, the task is deleted after it is
+        updated and the client logs in as the user it deletes last.
+        Returns:
+            list:
+        """
+        task = {'pk': self.task.pk}
+        password = 'Other-password-1'
+        other = get_user_model().objects.create_user(
+            username='other', password=password,
+        )
+        user_data = {
+            'first_name': 'first',
+            'last_name': 'last',
+            'username': 'created',
+            'password1': password,
+            'password2': password,
+        }
+        return [
+            ('create_status', None, {'name': 'created'}),
+            ('update_status', {'pk': self.status.pk}, {'name': 'updated'}),
+            ('create_label', None, {'name': 'created'}),
+            ('update_label', {'pk': self.labels[0].pk}, {'name': 'updated'}),
+            ('create_task', None, {
+                'name': 'created',
+                'description': 'description',
+                'status': self.status.pk,
+                'executor': self.user.pk,
+                'labels': [label.pk for label in self.labels],
+            }),
+            ('update_task', task, {
+                'name': 'updated',
+                'description': 'description',
+                'status': self.status.pk,
+                'executor': self.user.pk,
+                'labels': [label.pk for label in self.labels[:2]],
+            }),
+            ('bulk_tasks', None, {
+                'tasks': [task.pk for task in Tasks.objects.all()],
+                'action': 'add_labels',
+                'labels': [label.pk for label in self.labels],
+            }),
+            ('delete_task', task, {}),
+            ('delete_label', {
+                'pk': Label.objects.create(name='unused').pk,
+            }, {}),
+            ('delete_status', {
+                'pk': Status.objects.create(name='unused').pk,
+            }, {}),
+            ('update_user', {'pk': self.user.pk}, {
+                **user_data, 'username': 'test',
+            }),
+            ('logout', None, {}),
+            ('create_user', None, user_data),
+            ('login', None, {'username': 'other', 'password': password}),
+            ('delete_user', {'pk': other.pk}, {}),
+        ]
+
+    def test_every_form_post_is_within_budget(self):
+        """Test valid posts of forms stay within their POST budgets."""
+        for url_name, kwargs, data in self.get_posts():
+            with self.subTest(url_name=url_name):
+                self.assertIsNotNone(
+                    query_budget.get_budget(url_name, 'post'),
+                )
+                response = self.assertQueryBudget(
+                    url_name, kwargs, method='post', data=data,
+                )
+                self.assertEqual(302, response.status_code)
+
+    @override_settings(QUERY_BUDGETS={'tasks': 1})
+    def test_over_budget_is_logged(self):
+        """Test middleware logs requests over budget."""
+        with self.assertLogs('task_manager.query_budget', 'WARNING') as logs:
+            self.client.get(reverse('tasks'))
+        self.assertIn('GET tasks: ', logs.output[0])
+        self.assertIn('budget 1', logs.output[0])
+
+    @override_settings(QUERY_BUDGETS={'tasks': 1}, QUERY_BUDGET_ACTION='raise')
+    def test_over_budget_raises(self):
+        """Test middleware raises when configured to."""
+        with self.assertRaises(query_budget.QueryBudgetExceeded):
+            self.client.get(reverse('tasks'))
+
+    @override_settings(
+        QUERY_BUDGETS={'tasks': {'POST': 1}}, QUERY_BUDGET_DEFAULT=None,
+    )
+    def test_budget_by_method(self):
+        """Test budget of another method does not apply."""
+        self.assertIsNone(query_budget.get_budget('tasks', 'get'))
+        self.assertEqual(1, query_budget.get_budget('tasks', 'post'))
+
+    def test_stats_are_recorded_by_url_name(self):
+        """Test middleware keeps counters by url name."""
+        query_budget.stats.reset()
+        self.client.get(reverse('tasks'))
+        self.client.get(reverse('tasks'))
+        view = query_budget.stats.as_dict()['tasks']
+        self.assertEqual(2, view['requests'])
+        self.assertGreater(view['max_queries'], 0)
+        self.assertTrue(view['slowest_sql'])
+
+    def test_streamed_queries_are_recorded(self):
+        """Test queries run while streaming count once the stream ends."""
+        query_budget.stats.reset()
+        response = self.client.get(reverse('export_tasks', args=['csv']))
+        self.assertNotIn('export_tasks', query_budget.stats.as_dict())
+        with CaptureQueriesContext(connection) as queries:
+            b''.join(response.streaming_content)
+        self.assertTrue(queries.captured_queries)
+        view = query_budget.stats.as_dict()['export_tasks']
+        self.assertEqual(1, view['requests'])
+        self.assertGreater(view['queries'], len(queries))
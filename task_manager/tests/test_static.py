@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+
+from django import test
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+from task_manager.mixins import TestCaseWithoutRollbar
+
+
+class TestVendoredStaticCase(TestCaseWithoutRollbar):
+    """Test pages load Bootstrap and jQuery from this server."""
+
+    def test_layout_links_own_static(self):
+        """Test the layout has no third party assets."""
+        response = self.client.get(reverse('login'))
+        content = response.content.decode()
+        self.assertNotIn('cdn.jsdelivr.net', content)
+        self.assertNotIn('code.jquery.com', content)
+        self.assertIn('/static/vendor/bootstrap/css/bootstrap.min.css', content)
+        self.assertIn('/static/vendor/jquery/jquery.min.js', content)
+
+
+class TestCollectedStaticCase(TestCaseWithoutRollbar):
+    """Test collected files are hashed, compressed and cached for long."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Collect static files of the project once."""
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.settings_override = test.override_settings(
+            STATIC_ROOT=cls.static_root,
+        )
+        cls.settings_override.enable()
+        call_command(
+            'collectstatic',
+            interactive=False,
+            verbosity=0,
+            ignore_patterns=['admin'],
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove collected files."""
+        cls.settings_override.disable()
+        shutil.rmtree(cls.static_root)
+        super().tearDownClass()
+
+    def test_hashed_and_compressed(self):
+        """Test urls carry hashes and gzip and brotli variants exist."""
+        url = staticfiles_storage.url('vendor/bootstrap/css/bootstrap.min.css')
+        self.assertRegex(url, r'bootstrap\.min\.[0-9a-f]{12}\.css$')
+        path = os.path.join(
+            self.static_root, url[len('/static/'):],
+        )
+        for suffix in ('', '.gz', '.br'):
+            self.assertTrue(os.path.exists(path + suffix), suffix)
+
+    def test_served_immutable(self):
+        """Test WhiteNoise serves hashed names compressed and immutable."""
+        url = staticfiles_storage.url('vendor/jquery/jquery.min.js')
+        response = Client().get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('br', response['Content-Encoding'])
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=315360000', response['Cache-Control'])
+        response.close()
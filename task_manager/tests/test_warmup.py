@@ -0,0 +1,101 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.template import engines
+from django.test import TestCase, override_settings
+from task_manager import warmup
+from task_manager.statuses.models import Status
+
+CACHED_TEMPLATES = [{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'DIRS': [],
+    'OPTIONS': {
+        'loaders': [(
+            'django.template.loaders.cached.Loader',
+            ['django.template.loaders.app_directories.Loader'],
+        )],
+        'context_processors': [],
+    },
+}]
+
+
+class TestWarmUpCase(TestCase):
+    """Warm-up before requests."""
+
+    def test_warm_up_runs_steps(self):
+        """Every step runs and is timed."""
+        timings = warmup.warm_up()
+        self.assertEqual(list(timings), list(warmup.STEPS))
+        self.assertTrue(all(seconds >= 0 for seconds in timings.values()))
+
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_templates_compiled(self):
+        """Templates land in the cached loader."""
+        count = warmup.compile_templates()
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertGreater(count, 0)
+        self.assertEqual(len(loader.get_template_cache), count)
+
+    def test_urls_resolved(self):
+        """Every named URL is reversed."""
+        self.assertGreater(warmup.resolve_urls(), 0)
+
+    @override_settings(WARMUP=False)
+    def test_disabled(self):
+        """Nothing runs with WARMUP off."""
+        with mock.patch.object(warmup, 'compile_templates') as compile_all:
+            self.assertEqual(warmup.warm_up(), {})
+            self.assertEqual(warmup.warm_worker(), {})
+        compile_all.assert_not_called()
+
+    def test_failing_step_skipped(self):
+        """A failing step is logged, the others still run."""
+        def fail():  # noqa: WPS430
+            raise RuntimeError('failure')
+
+        with self.assertLogs('task_manager.warmup', 'ERROR'):
+            timings = warmup.run_steps({
+                'failing': fail, 'catalogs': warmup.load_catalogs,
+            })
+        self.assertEqual(list(timings), ['catalogs'])
+
+    @override_settings(SHARED_CACHE=True)
+    def test_warm_worker_loads_lookups(self):
+        """Lookup caches are read before the first request."""
+        Status.objects.create(name='warm')
+        self.assertEqual(list(warmup.warm_worker()), ['connections'])
+        with self.assertNumQueries(0):
+            warmup.open_connections()
+
+
+class TestWarmUpCommandCase(TestCase):
+    """Warm-up command."""
+
+    def test_prints_steps(self):
+        """Time of every step is printed."""
+        out = io.StringIO()
+        call_command('warmup', stdout=out)
+        for step in (*warmup.STEPS, *warmup.WORKER_STEPS):
+            self.assertIn('{step}: '.format(step=step), out.getvalue())
+
+    def test_measure(self):
+        """First requests are timed without and with warm-up."""
+        out = io.StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'warmup.json')
+            call_command('warmup', measure=True, output=output, stdout=out)
+            with open(output) as report_file:
+                report = json.load(report_file)
+        self.assertEqual(
+            [run['warmup'] for run in report['runs']], [False, True],
+        )
+        for run in report['runs']:
+            self.assertGreater(
+                run['first_request_ms'], run['listening_ms'],
+            )
+            self.assertIn('login', run['requests_ms'])
+        self.assertIn('WARMUP=1: listening after', out.getvalue())
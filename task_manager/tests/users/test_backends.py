@@ -0,0 +1,145 @@
+import json
+import os
+import subprocess  # noqa: S404
+import sys
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.http.response import HttpResponseBase
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from task_manager.mixins import TestCaseWithoutRollbar
+from task_manager.users.backends import user_cache_key
+from task_manager.utils import is_shared_cache
+
+AUTH_TABLES = ('"django_session"', '"users_customuser"')
+CACHED_BACKEND = 'task_manager.users.backends.CachedModelBackend'
+MODEL_BACKEND = 'django.contrib.auth.backends.ModelBackend'
+CACHED_SESSIONS = 'django.contrib.sessions.backends.cached_db'
+DB_SESSIONS = 'django.contrib.sessions.backends.db'
+READ_AUTH_SETTINGS = (
+    'import json, django; django.setup(); '
+    'from django.conf import settings; '
+    'print(json.dumps([settings.SESSION_ENGINE, '
+    'settings.AUTHENTICATION_BACKENDS]))'
+)
+
+
+def read_auth_settings(cache_backend: str) -> list:
+    """
+    Read session engine and auth backends of a fresh process.
+    Args:
+        cache_backend: CACHE_BACKEND of the process
+    Returns:
+        list:
+    """
+    env = {
+        key: value for key, value in os.environ.items()
+        if key != 'SESSION_ENGINE'
+    }
+    env.update({
+        'CACHE_BACKEND': cache_backend,
+        'DJANGO_SETTINGS_MODULE': 'task_manager.settings',
+    })
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, '-c', READ_AUTH_SETTINGS],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+class TestAuthSettingsCase(SimpleTestCase):
+    """Test sessions and users are cached only in a shared cache."""
+
+    def test_shared_backends(self):
+        """Test memcached and redis are shared, local caches are not."""
+        self.assertTrue(is_shared_cache(
+            'django.core.cache.backends.memcached.PyMemcacheCache',
+        ))
+        self.assertTrue(is_shared_cache('django_redis.cache.RedisCache'))
+        self.assertFalse(is_shared_cache(
+            'django.core.cache.backends.locmem.LocMemCache',
+        ))
+        self.assertFalse(is_shared_cache(
+            'django.core.cache.backends.filebased.FileBasedCache',
+        ))
+
+    def test_local_cache_uses_database(self):
+        """Test a local cache falls back to database sessions and users."""
+        self.assertEqual(
+            [DB_SESSIONS, [MODEL_BACKEND]],
+            read_auth_settings(
+                'django.core.cache.backends.locmem.LocMemCache',
+            ),
+        )
+
+    def test_shared_cache_caches_auth(self):
+        """Test a shared cache keeps sessions and users."""
+        self.assertEqual(
+            [CACHED_SESSIONS, [CACHED_BACKEND]],
+            read_auth_settings(
+                'django.core.cache.backends.memcached.PyMemcacheCache',
+            ),
+        )
+
+
+@override_settings(
+    SHARED_CACHE=True,
+    SESSION_ENGINE=CACHED_SESSIONS,
+    AUTHENTICATION_BACKENDS=[CACHED_BACKEND],
+)
+class TestCachedAuthCase(TestCaseWithoutRollbar):
+    """Test sessions and users of requests are read from the cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.credentials = {'username': 'test', 'password': 'test'}
+        cls.user = get_user_model().objects.create_user(**cls.credentials)
+
+    def setUp(self):
+        """Setup always when test executed."""
+        self.client.login(**self.credentials)
+
+    def get_auth_queries(self, url_name: str) -> list:
+        """
+        Request a page and collect its session and user queries.
+        Args:
+            url_name:
+        Returns:
+            list:
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, HttpResponseBase.status_code)
+        return [
+            query['sql'] for query in queries.captured_queries
+            if any(table in query['sql'] for table in AUTH_TABLES)
+        ]
+
+    def test_login_protected_view_reads_no_session_or_user(self):
+        """Test the task list runs no auth queries after login."""
+        self.assertEqual([], self.get_auth_queries('tasks'))
+
+    def test_user_is_read_again_after_save(self):
+        """Test a saved user is read from the database once."""
+        self.user.first_name = 'Changed'
+        self.user.save()
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        self.assertEqual(1, len(self.get_auth_queries('tasks')))
+        self.assertEqual([], self.get_auth_queries('tasks'))
+        self.assertEqual(
+            'Changed', cache.get(user_cache_key(self.user.pk)).first_name,
+        )
+
+    def test_logout_forgets_user(self):
+        """Test logout drops the cached user."""
+        self.client.post(reverse('logout'))
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
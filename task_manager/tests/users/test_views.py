@@ -1,7 +1,12 @@
+from unittest import mock
+
 from django.contrib.auth import get_user_model
 from django.http.response import HttpResponseBase
 from django.urls import reverse
+from django.views.generic.detail import SingleObjectMixin
 from task_manager.mixins import TestCaseWithoutRollbar
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Tasks
 from task_manager.utils import load_file_from_fixture
 
 
@@ -52,6 +57,80 @@ class TestListViewCase(TestCaseWithoutRollbar):
         self.assertTrue(len(response.context['users_list']) == 5)
 
 
+class TestAutocompleteViewCase(TestCaseWithoutRollbar):
+    """Test user choices endpoint."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.user_model = get_user_model()
+        cls.credentials = {'username': 'test', 'password': 'test'}
+        cls.user_model.objects.create_user(**cls.credentials)
+        for postfix in range(25):
+            cls.user_model.objects.create(
+                username='member{postfix}'.format(postfix=postfix),
+                first_name='Member',
+                last_name=str(postfix),
+            )
+
+    def setUp(self):
+        """Setup always when test executed."""
+        self.client.login(**self.credentials)
+
+    def test_prefix_search_and_paging(self):
+        """Test prefix matching pages through results."""
+        url = reverse('autocomplete_users')
+        first = self.client.get(url, {'q': 'mem'}).json()
+        self.assertEqual(len(first['results']), 20)
+        self.assertTrue(first['more'])
+        second = self.client.get(url, {'q': 'MEM', 'page': 2}).json()
+        self.assertEqual(len(second['results']), 5)
+        self.assertFalse(second['more'])
+        found = self.client.get(url, {'q': 'member12'}).json()
+        self.assertEqual(['Member 12'], [
+            choice['text'] for choice in found['results']
+        ])
+
+    def test_not_auth_users_cannot_view(self):
+        """Test not authenticated users not allowed view."""
+        self.client.logout()
+        response = self.client.get(reverse('autocomplete_users'))
+        self.assertRedirects(response, reverse('login'))
+
+
+class TestDetailViewCase(TestCaseWithoutRollbar):
+    """Test detail view."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Setup once test data."""
+        cls.user_model = get_user_model()
+        cls.credentials = {'username': 'test', 'password': 'test'}
+        cls.user = cls.user_model.objects.create_user(**cls.credentials)
+        another_user = cls.user_model.objects.create_user(username='another')
+        status = Status.objects.create(name='new')
+        Tasks.objects.create(
+            name='created', status=status, creator=cls.user,
+        )
+        Tasks.objects.create(
+            name='assigned',
+            status=status,
+            creator=another_user,
+            executor=cls.user,
+        )
+
+    def setUp(self):
+        """Setup always when test executed."""
+        self.client.login(**self.credentials)
+
+    def test_task_counters(self):
+        """Test counts of created and assigned tasks."""
+        response = self.client.get(reverse('detail_user', args=[self.user.pk]))
+        self.assertEqual(response.status_code, HttpResponseBase.status_code)
+        self.assertEqual(response.context['count_tasks_by_user'], 1)
+        self.assertEqual(response.context['count_tasks_to_user'], 1)
+
+
 class TestCreateViewCase(TestCaseWithoutRollbar):
     """Test create view."""
 
@@ -152,6 +231,31 @@ class TestUpdateDeleteCase(TestCaseWithoutRollbar):
             self.user_model.objects.get(pk=self.user.pk).username,
         )
 
+    def test_update_fetches_user_once(self):
+        """Test the permission check and the update share one fetch."""
+        with mock.patch.object(
+            SingleObjectMixin,
+            'get_object',
+            autospec=True,
+            side_effect=SingleObjectMixin.get_object,
+        ) as get_object:
+            self.client.post(
+                path=reverse('update_user', args=[self.user.pk]),
+                data=self.users_data['user_update'],
+            )
+        get_object.assert_called_once()
+
+    def test_not_auth_users_redirected_without_queries(self):
+        """Test anonymous users are sent to login before any query."""
+        self.client.logout()
+        for url_name in ('update_user', 'delete_user', 'detail_user'):
+            with self.subTest(url_name=url_name):
+                with self.assertNumQueries(0):
+                    response = self.client.get(
+                        reverse(url_name, args=[self.user.pk]),
+                    )
+                self.assertRedirects(response, reverse('login'))
+
     def test_try_update_another_user(self):
         """Test cannot update data another user."""
         user2 = self.user_model.objects.create(
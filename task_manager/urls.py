@@ -6,6 +6,7 @@ from task_manager import views
 urlpatterns = [
     #    path('admin/', admin.site.urls),
     path('', views.index, name='home'),
+    path('metrics', views.metrics, name='metrics'),
     path('login/', UserLoginView.as_view(), name='login'),
     path('logout/', UserLogoutView.as_view(), name='logout'),
     path('users/', include('task_manager.users.urls')),
@@ -6,3 +6,7 @@ class UsersConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'task_manager.users'
+
+    def ready(self):
+        """Connect signal receivers."""
+        from task_manager.users import receivers  # noqa: F401, WPS433
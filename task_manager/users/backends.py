@@ -0,0 +1,62 @@
+"""
+Authentication backend reading request.user from the cache.
+
+The user of a session is kept under its id for AUTH_USER_CACHE_SECONDS.
+Receivers drop it when the user is saved or deleted and on logout, and
+store it on login, so requests of a logged in user read no user row.
+"""
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_cache_key(user_id) -> str:
+    """
+    Get cache key of a user.
+    Args:
+        user_id:
+    Returns:
+        str:
+    """
+    return 'auth:user:{user_id}'.format(user_id=user_id)
+
+
+def cache_user(user) -> None:
+    """
+    Store a user for later requests.
+    Args:
+        user:
+    """
+    cache.set(
+        user_cache_key(user.pk), user, settings.AUTH_USER_CACHE_SECONDS,
+    )
+
+
+def forget_user(user_id) -> None:
+    """
+    Drop a stored user.
+    Args:
+        user_id:
+    """
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend with users of sessions read from the cache."""
+
+    def get_user(self, user_id) -> Optional[object]:
+        """
+        Get the user of a session, from the database on a cache miss.
+        Args:
+            user_id:
+        Returns:
+            Optional:
+        """
+        user = cache.get(user_cache_key(user_id))
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache_user(user)
+        return user
@@ -7,9 +7,13 @@ from django.http import HttpResponsePermanentRedirect, HttpResponseRedirect
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
+from task_manager.views_mixins import SingleObjectCacheMixin
 
 
-class CheckUserRightsTestMixin(UserPassesTestMixin):
+class CheckUserRightsTestMixin(
+    SingleObjectCacheMixin,
+    UserPassesTestMixin,
+):
     """Deny a request with a permission error if the test_func() == False."""
 
     redirect_url = settings.LOGIN_REDIRECT_URL
@@ -41,13 +45,11 @@ class CheckUserRightsTestMixin(UserPassesTestMixin):
         Returns:
             Any:
         """
-        user_test_result = self.get_test_func()()
-
         if not request.user.is_authenticated:
             self.redirect_url = reverse_lazy('login')  # noqa: WPS601
             messages.error(request, _('UserNotAuthentication'))
             return self.handle_no_permission()
-        if not user_test_result:
+        if not self.get_test_func()():
             messages.error(request, _('ErrorUserNotHaveRights'))
             return self.handle_no_permission()
         return super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from task_manager.users.backends import cache_user, forget_user
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def forget_changed_user(sender, instance, **kwargs):
+    """
+    Drop the cached copy of a saved or deleted user.
+    Args:
+        sender:
+        instance:
+        kwargs:
+    """
+    forget_user(instance.pk)
+
+
+@receiver(user_logged_in)
+def cache_logged_in_user(sender, request, user, **kwargs):
+    """
+    Store the user on login, after last_login is saved.
+    Args:
+        sender:
+        request:
+        user:
+        kwargs:
+    """
+    cache_user(user)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, request, user, **kwargs):
+    """
+    Drop the cached copy of a user on logout.
+    Args:
+        sender:
+        request:
+        user:
+        kwargs:
+    """
+    if user is not None:
+        forget_user(user.pk)
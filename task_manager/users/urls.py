@@ -1,5 +1,6 @@
 from django.urls import path
 from task_manager.users.views import (
+    UserAutocompleteView,
     UserCreateView,
     UserDeleteView,
     UserDetailView,
@@ -10,6 +11,11 @@ from task_manager.users.views import (
 urlpatterns = [
     path('', UserListView.as_view(), name='users'),
     path('create/', UserCreateView.as_view(), name='create_user'),
+    path(
+        'autocomplete/',
+        UserAutocompleteView.as_view(),
+        name='autocomplete_users',
+    ),
     path('<int:pk>/update/', UserUpdateView.as_view(), name='update_user'),
     path('<int:pk>/delete/', UserDeleteView.as_view(), name='delete_user'),
     path('<int:pk>/', UserDetailView.as_view(), name='detail_user'),
@@ -15,7 +15,8 @@ from django.utils.translation import gettext_lazy as _
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import CreateView, DeleteView, UpdateView
 from django.views.generic.list import ListView
-from task_manager.tasks.models import Tasks
+from task_manager.autocomplete import AutocompleteView
+from task_manager.tasks.models import UserTasksCounter
 from task_manager.users.forms import CustomUserCreationForm
 from task_manager.users.mixins import CheckUserRightsTestMixin
 
@@ -29,6 +30,14 @@ class UserListView(ListView):
     template_name = 'users/index.html'
 
 
+class UserAutocompleteView(AutocompleteView):
+    """User choices by username, first or last name prefix."""
+
+    model = get_user_model()
+    search_fields = ['username', 'first_name', 'last_name']
+    ordering = ['first_name', 'last_name', 'pk']
+
+
 class UserDetailView(CheckUserRightsTestMixin, DetailView):
     """User detail view."""
 
@@ -44,12 +53,9 @@ class UserDetailView(CheckUserRightsTestMixin, DetailView):
             Dict:
         """
         context = super().get_context_data(**kwargs)
-        context['count_tasks_by_user'] = Tasks.objects.filter(
-            creator=self.request.user.id,
-        ).count()
-        context['count_tasks_to_user'] = Tasks.objects.filter(
-            executor=self.request.user.id,
-        ).count()
+        counter = UserTasksCounter.objects.for_user(self.request.user.id)
+        context['count_tasks_by_user'] = counter.created_count
+        context['count_tasks_to_user'] = counter.assigned_count
         return context
 
 
@@ -37,3 +37,24 @@ def load_file_from_fixture(filename: str, add_paths: list = None) -> Optional[di
     file_data = read_file(path)
     if ext == '.json':
         return json.loads(file_data)
+
+
+SHARED_CACHE_BACKENDS = (
+    'django.core.cache.backends.memcached.',
+    'django.core.cache.backends.redis.',
+    'django_redis.',
+)
+
+
+def is_shared_cache(backend: str) -> bool:
+    """
+    Tell whether a cache backend is shared by processes and hosts.
+
+    Writes to a local cache, like LocMemCache, are seen by its own process
+    only, other workers would keep serving what they cached before.
+    Args:
+        backend: import path of the backend
+    Returns:
+        bool:
+    """
+    return backend.startswith(SHARED_CACHE_BACKENDS)
@@ -1,6 +1,8 @@
 from django.shortcuts import render
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseForbidden
 from django.utils.translation import gettext as _
+from prometheus_client import CONTENT_TYPE_LATEST
+from task_manager.metrics import can_read_metrics, render_metrics
 
 
 def index(request) -> HttpResponse:
@@ -14,3 +16,16 @@ def index(request) -> HttpResponse:
     return render(request, 'home.html', context={
         'BASE_APP_NAME': _('TaskManager'),
     })
+
+
+def metrics(request) -> HttpResponse:
+    """
+    Metrics of all workers in the Prometheus text format.
+    Args:
+        request: request
+    Returns:
+        HttpResponse:
+    """
+    if not can_read_metrics(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,24 @@
+from typing import Any
+
+
+class SingleObjectCacheMixin(object):
+    """Fetch the object of a single object view once per request."""
+
+    _cached_object = None
+
+    def get_object(self, queryset=None) -> Any:
+        """
+        Get the object, fetched on the first call of the request.
+
+        A view is instantiated for each request, permission checks and the
+        view itself share one fetch. Calls with a queryset are not cached.
+        Args:
+            queryset:
+        Returns:
+            Any:
+        """
+        if queryset is not None:
+            return super().get_object(queryset)
+        if self._cached_object is None:
+            self._cached_object = super().get_object()
+        return self._cached_object
@@ -0,0 +1,229 @@
+"""
+Warm-up of a process before it serves requests.
+
+A cold process pays on its first requests for compiling templates, importing
+form renderers, reading the static files manifest, loading gettext
+catalogs, populating the URL resolver and compiling its patterns per
+language, initializing error reporting and connecting to databases.
+warm_up() does all of it but connecting when the WSGI or ASGI application
+is loaded. Under gunicorn with preload_app that happens in the master, so
+forked workers share the warmed state copy-on-write. Connections must not
+be shared by processes: every worker opens its own in warm_worker(), called
+by post_worker_init of gunicorn.conf.py before it accepts requests.
+
+Templates are kept compiled by the cached loader, which Django uses when
+DEBUG is off. A connection opened here serves the first request when
+CONN_MAX_AGE keeps it open. Steps failing are logged and skipped, a worker
+starts cold rather than not at all.
+"""
+import logging
+import os
+import time
+from typing import Callable, Dict
+
+from bootstrap4.bootstrap import (
+    get_field_renderer,
+    get_form_renderer,
+    get_formset_renderer,
+)
+from django import forms
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.db import connections
+from django.forms.renderers import get_default_renderer
+from django.template.loader import get_template
+from django.urls import get_resolver, resolve, reverse
+from django.utils import translation
+from task_manager import lookup_cache
+from task_manager.error_reporting import get_reporter
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+
+
+def compile_templates() -> int:
+    """
+    Compile every template of the project.
+    Returns:
+        int: number of templates
+    """
+    count = 0
+    for root, _dirs, files in os.walk(TEMPLATE_DIR):
+        for filename in files:
+            if not filename.endswith('.html'):
+                continue
+            get_template(os.path.relpath(
+                os.path.join(root, filename), TEMPLATE_DIR,
+            ).replace(os.sep, '/'))
+            count += 1
+    return count
+
+
+def widget_classes(base=forms.Widget):
+    """
+    Get a widget class and all its subclasses.
+    Args:
+        base: widget class
+    Yields:
+        type:
+    """
+    yield base
+    for subclass in base.__subclasses__():
+        yield from widget_classes(subclass)
+
+
+def prepare_forms() -> int:
+    """
+    Compile widget templates and import the renderers of bootstrap4.
+
+    bootstrap4 imports its renderers, and BeautifulSoup with them, the
+    first time a form is rendered.
+    Returns:
+        int: number of widget templates
+    """
+    renderer = get_default_renderer()
+    names = set()
+    for widget in widget_classes():
+        for attribute in ('template_name', 'option_template_name'):
+            name = getattr(widget, attribute, None)
+            if name:
+                names.add(name)
+    for name in names:
+        renderer.get_template(name)
+    get_form_renderer()
+    get_field_renderer()
+    get_formset_renderer()
+    return len(names)
+
+
+def load_static_manifest() -> int:
+    """
+    Set up the static files storage, reading its manifest.
+    Returns:
+        int: number of hashed files
+    """
+    return len(getattr(staticfiles_storage, 'hashed_files', {}))
+
+
+def resolve_urls() -> int:
+    """
+    Reverse and resolve every named URL in every language.
+    Returns:
+        int: number of names
+    """
+    resolver = get_resolver()
+    names = [name for name in resolver.reverse_dict if isinstance(name, str)]
+    for code, _language in settings.LANGUAGES:
+        with translation.override(code):
+            for name in names:
+                params = resolver.reverse_dict.getlist(name)[0][0][0][1]
+                resolve(reverse(name, kwargs={param: '1' for param in params}))
+    return len(names)
+
+
+def load_catalogs() -> int:
+    """
+    Load translation catalogs of every language.
+    Returns:
+        int: number of languages
+    """
+    for code, _language in settings.LANGUAGES:
+        with translation.override(code):
+            translation.gettext('NameProject')
+    return len(settings.LANGUAGES)
+
+
+def init_error_reporting() -> int:
+    """
+    Build the error reporter and initialize its sink.
+
+    The thread sending reports starts with the first of them, in the
+    process reporting it.
+    Returns:
+        int: 1
+    """
+    sink = get_reporter().sink
+    if hasattr(sink, 'init'):
+        sink.init()
+    return 1
+
+
+def open_connections() -> int:
+    """
+    Connect to databases keeping connections open and load lookup caches.
+
+    Django closes a connection when a request starts once CONN_MAX_AGE
+    has passed, a connection without it would not serve the first request.
+    Connections are per thread, only a worker serving requests from its
+    main thread, like the sync worker, reuses them.
+    Returns:
+        int: number of connections opened
+    """
+    persistent = [
+        connection for connection in connections.all()
+        if connection.settings_dict['CONN_MAX_AGE'] != 0
+    ]
+    for connection in persistent:
+        connection.ensure_connection()
+    if settings.SHARED_CACHE:
+        for model_label in lookup_cache.LOOKUP_MODELS:
+            lookup_cache.for_model(apps.get_model(model_label)).rows()
+    return len(persistent)
+
+
+def run_steps(steps: Dict[str, Callable[[], int]]) -> Dict[str, float]:
+    """
+    Run warm-up steps, logging the ones failing.
+    Args:
+        steps: functions by name
+    Returns:
+        Dict: seconds of every step which succeeded
+    """
+    timings = {}
+    for name, step in steps.items():
+        started = time.perf_counter()
+        try:
+            count = step()
+        except Exception:  # noqa: B902
+            logger.exception('Warm-up step %s failed', name)
+            continue
+        timings[name] = time.perf_counter() - started
+        logger.debug(
+            'Warm-up step %s: %s in %.3f s', name, count, timings[name],
+        )
+    return timings
+
+
+STEPS = {
+    'templates': compile_templates,
+    'forms': prepare_forms,
+    'static': load_static_manifest,
+    'urls': resolve_urls,
+    'catalogs': load_catalogs,
+    'error_reporting': init_error_reporting,
+}
+WORKER_STEPS = {'connections': open_connections}
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Warm what forked processes can share, when WARMUP is on.
+    Returns:
+        Dict: seconds of every step
+    """
+    if not settings.WARMUP:
+        return {}
+    return run_steps(STEPS)
+
+
+def warm_worker() -> Dict[str, float]:
+    """
+    Open connections of a worker, when WARMUP is on.
+    Returns:
+        Dict: seconds of every step
+    """
+    if not settings.WARMUP:
+        return {}
+    return run_steps(WORKER_STEPS)
@@ -2,6 +2,8 @@
 WSGI config for templates project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
+The process is warmed up once the application is loaded, see
+task_manager.warmup.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/wsgi/
@@ -14,3 +16,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
 
 application = get_wsgi_application()
+
+from task_manager import warmup  # noqa: E402, I001
+
+warmup.warm_up()